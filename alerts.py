@@ -0,0 +1,126 @@
+"""
+Agreement expiry alerts.
+
+Agreements are indexed by expiry date (as date ordinals in a sorted list), so
+each alert window is a contiguous slice found with two bisects: answering
+"which agreements are in one_month today" costs O(log n + k). An AlertSnapshot
+materializes every bucket for one calendar day; the application rebuilds it
+only when the day rolls over or the agreement store changes.
+"""
+
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from dates import to_iso
+
+# Alert statuses from least to most urgent
+ALERT_STATUSES = ["three_months", "two_months", "one_month", "expired"]
+
+# Days before expiry at which each window opens
+WINDOW_DAYS = {"three_months": 90, "two_months": 60, "one_month": 30}
+
+def alert_thresholds(today=None):
+    """ISO cut-off dates for each alert window, computed once per request."""
+    today = today or date.today()
+    return {
+        "today": today.isoformat(),
+        "one_month": (today + timedelta(days=30)).isoformat(),
+        "two_months": (today + timedelta(days=60)).isoformat(),
+        "three_months": (today + timedelta(days=90)).isoformat(),
+    }
+
+def alert_status_from_iso(expiry_iso, thresholds):
+    """Alert status for an ISO expiry date (ISO strings sort like dates)."""
+    if not expiry_iso:
+        return ""
+    if expiry_iso > thresholds["three_months"]:
+        return ""  # No alert if more than 3 months away
+    elif expiry_iso > thresholds["two_months"]:
+        return "three_months"  # Amber yellow: 3 months before
+    elif expiry_iso > thresholds["one_month"]:
+        return "two_months"  # Light red: 2 months before
+    elif expiry_iso > thresholds["today"]:
+        return "one_month"  # Dark red: 1 month before
+    else:
+        return "expired"  # Dark red: After deadline
+
+def alert_expiry_filter(status, thresholds):
+    """Expiry-date constraints selecting one alert bucket.
+
+    Returns (constraints, include_missing_expiry), where constraints is a list
+    of (operator, ISO date) pairs that an indexed store can turn into a range
+    scan. "none" selects agreements with no alert.
+    """
+    if status == "expired":
+        return [("<=", thresholds["today"])], False
+    if status == "one_month":
+        return [(">", thresholds["today"]), ("<=", thresholds["one_month"])], False
+    if status == "two_months":
+        return [(">", thresholds["one_month"]), ("<=", thresholds["two_months"])], False
+    if status == "three_months":
+        return [(">", thresholds["two_months"]), ("<=", thresholds["three_months"])], False
+    if status == "none":
+        return [(">", thresholds["three_months"])], True
+    raise ValueError(f"Unknown alert status: {status}")
+
+def expiry_iso(agreement):
+    """The agreement's expiry date as YYYY-MM-DD, preferring the stored parse."""
+    parsed_dates = agreement.get("parsed_dates")
+    if parsed_dates is not None:
+        return parsed_dates.get("agreement_expiry_date", "")
+    return to_iso(agreement.get("agreement_expiry_date", ""))
+
+def agreement_alert_status(agreement, thresholds):
+    """Alert status using the expiry date parsed when the agreement was stored."""
+    return alert_status_from_iso(expiry_iso(agreement), thresholds)
+
+class ExpiryIndex:
+    """Agreement ids sorted by expiry date."""
+
+    def __init__(self, agreements):
+        entries = []
+        for agreement in agreements:
+            iso = expiry_iso(agreement)
+            if iso and agreement.get("id"):
+                entries.append((date.fromisoformat(iso).toordinal(), agreement["id"]))
+        entries.sort()
+        self.ordinals = [ordinal for ordinal, _ in entries]
+        self.ids = [agreement_id for _, agreement_id in entries]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def expiring_between(self, after, upto):
+        """Ids expiring after `after` and on or before `upto` (date ordinals)."""
+        lo = 0 if after is None else bisect_right(self.ordinals, after)
+        hi = bisect_right(self.ordinals, upto)
+        return self.ids[lo:hi]
+
+    def bucket(self, status, today):
+        """Ids of the agreements in one alert bucket on the given day."""
+        day = today.toordinal()
+        if status == "expired":
+            return self.expiring_between(None, day)
+        if status == "one_month":
+            return self.expiring_between(day, day + WINDOW_DAYS["one_month"])
+        if status == "two_months":
+            return self.expiring_between(day + WINDOW_DAYS["one_month"], day + WINDOW_DAYS["two_months"])
+        if status == "three_months":
+            return self.expiring_between(day + WINDOW_DAYS["two_months"], day + WINDOW_DAYS["three_months"])
+        raise ValueError(f"Unknown alert status: {status}")
+
+class AlertSnapshot:
+    """Alert buckets for every agreement, materialized for one day."""
+
+    def __init__(self, agreements, today=None):
+        self.today = today or date.today()
+        self.index = ExpiryIndex(agreements)
+        self.buckets = {status: self.index.bucket(status, self.today) for status in ALERT_STATUSES}
+        self.status_by_id = {
+            agreement_id: status
+            for status, agreement_ids in self.buckets.items()
+            for agreement_id in agreement_ids
+        }
+
+    def status(self, agreement_id):
+        return self.status_by_id.get(agreement_id, "")
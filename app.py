@@ -1,25 +1,45 @@
 import os
 import re
 import json
+import time
+import asyncio
 import logging
 import csv
 import io
 import smtplib
+import zipfile
 import secrets
 import bcrypt
+import click
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, Response, flash, session, url_for
+from flask import Flask, render_template, request, redirect, Response, flash, session, url_for, jsonify
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
-import pytesseract
-from pdf2image import convert_from_path
 from PIL import Image
 import openai
+from jobs import JobQueue, new_job_id
+from ocr import extract_pages, ocr_settings_key, pages_text
+from ocr_artifacts import OCRArtifactStore
+from search import SEARCH_STATUSES, SearchIndex
+from tenants import TenantIndex, duplicate_summary, likely_duplicates
+from content_cache import ContentCache, sha256_file, sha256_text
+from local_extraction import extract_fields_locally
+from backfill import AgreementMatcher, Checkpoint, diff_fields, list_uploads, match_upload
+from passages import PROMPT_TOKEN_BUDGET, estimate_tokens, select_passages
+from model_client import AsyncModelClient
+from dates import DATE_FIELDS
+from storage import SORT_KEYS, create_agreement_store, create_archive_store, file_lock, write_json_file
+import cache
+from cache import CachedValue, copy_records, file_token
+from alerts import ALERT_STATUSES, AlertSnapshot, alert_expiry_filter, alert_status_from_iso, alert_thresholds
+from dates import to_iso
+from normalization import BUILDING_RULES, SCHEMA_VERSION, is_current_schema, normalize_agreement, normalize_agreements
 
 # Load environment variables
 load_dotenv()
@@ -45,7 +65,37 @@ DATA_FILE = "agreements_data.json"
 ARCHIVE_FILE = "archived_agreements.json"
 SETTINGS_FILE = "settings.json"
 USERS_FILE = "users.json"
+AGREEMENTS_DB = os.getenv('AGREEMENTS_DB', "agreements.db")
+AGREEMENT_STORE = os.getenv('AGREEMENT_STORE', "sqlite")  # "sqlite" or "json"
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', "archive")
+JOBS_DB = os.getenv('JOBS_DB', "jobs.db")
+EXTRACTION_CACHE_DB = os.getenv('EXTRACTION_CACHE_DB', "extraction_cache.db")
+EXTRACTION_CACHE_MAX_MB = int(os.getenv('EXTRACTION_CACHE_MAX_MB', "256"))
+OCR_ARTIFACTS_DB = os.getenv('OCR_ARTIFACTS_DB', "ocr_artifacts.db")
+REEXTRACT_CHECKPOINT = os.getenv('REEXTRACT_CHECKPOINT', "reextract_checkpoint.json")
+# Bump whenever the extraction prompt or local rules change so cached fields are not reused
+PROMPT_VERSION = 4
+# Locally extracted fields below this confidence are asked from GPT-4o
+LOCAL_CONFIDENCE_THRESHOLD = float(os.getenv('LOCAL_CONFIDENCE_THRESHOLD', "0.6"))
+# Bulk uploads: files per request, request size, and PDFs OCRed at once
+BULK_MAX_FILES = int(os.getenv('BULK_MAX_FILES', "200"))
+BULK_MAX_CONTENT_MB = int(os.getenv('BULK_MAX_CONTENT_MB', "512"))
+# ZIP uploads: uncompressed size of the whole archive and of each PDF in it
+BULK_MAX_UNZIPPED_MB = int(os.getenv('BULK_MAX_UNZIPPED_MB', "1024"))
+BULK_MAX_PDF_MB = int(os.getenv('BULK_MAX_PDF_MB', "64"))
+BULK_OCR_CONCURRENCY = int(os.getenv('BULK_OCR_CONCURRENCY', "2"))
+ARCHIVE_PAGE_SIZE = 25
+AGREEMENTS_PAGE_SIZE = 50
+AGREEMENTS_MAX_PAGE_SIZE = 500
 ALLOWED_EXTENSIONS = {"pdf"}
+# Fields extracted from every agreement
+EXTRACTED_FIELDS = [
+    "tenant_name", "area_sqft", "floor", "building", "period_of_rent", "rent_amount", "maintenance", "rent_escalation",
+    "agreement_start_date", "agreement_expiry_date", "lock_in_period", "lock_in_period_end_date",
+    "rental_period_greater_than_lock_in_period", "next_rent_escalation"
+]
+# Computed on read from the expiry date and today's alert thresholds, never stored
+DERIVED_FIELDS = ("alert_status",)
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -99,12 +149,20 @@ def load_user(user_id):
     return None
 
 def load_users():
+    """Load users, re-reading users.json only when it has changed."""
+    return users_cache.get()
+
+def _read_users():
     """Load users from JSON file."""
     try:
         if os.path.exists(USERS_FILE):
             with open(USERS_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        else:
+        with file_lock(USERS_FILE):
+            # Another worker may have created the file while we waited
+            if os.path.exists(USERS_FILE):
+                with open(USERS_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f)
             # Create default admin user if no users file exists
             default_users = create_default_admin()
             save_users(default_users)
@@ -116,8 +174,8 @@ def load_users():
 def save_users(users):
     """Save users to JSON file."""
     try:
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(users, f, indent=2, ensure_ascii=False)
+        write_json_file(USERS_FILE, users)
+        users_cache.invalidate()
         logging.debug(f"Saved {len(users)} users")
     except Exception as e:
         logging.error(f"Error saving users: {e}")
@@ -135,57 +193,99 @@ def create_default_admin():
         'created_at': datetime.now().isoformat()
     }]
 
+users_cache = CachedValue("users", _read_users, lambda: file_token(USERS_FILE))
+
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# Agreement persistence (JSON files stay the import/export format)
+agreement_store = create_agreement_store(AGREEMENT_STORE, DATA_FILE, AGREEMENTS_DB)
+archive_store = create_archive_store(ARCHIVE_DIR, ARCHIVE_FILE)
+
+# Uploads are processed by worker.py through a durable job queue
+job_queue = JobQueue(JOBS_DB)
+
+# OCR text and extracted fields are cached by content hash, so re-uploading
+# the same lease skips both OCR and the GPT-4o call
+extraction_cache = ContentCache(EXTRACTION_CACHE_DB, EXTRACTION_CACHE_MAX_MB * 1024 * 1024)
+
+# Per-page OCR text, word boxes and confidences of every stored agreement
+ocr_artifacts = OCRArtifactStore(OCR_ARTIFACTS_DB)
+
+# Full-text index of the same pages for /search, active and archived agreements alike
+search_index = SearchIndex(ocr_artifacts)
+
+# Active agreements are cached per worker and revalidated against the store
+# version counter, so unchanged data is never re-read
+agreements_cache = CachedValue("agreements", agreement_store.all, agreement_store.version, copy_records)
+
+# Alert buckets are materialized per worker and rebuilt only when the calendar
+# day rolls over or the agreement store changes
+alerts_cache = CachedValue(
+    "alerts",
+    lambda: AlertSnapshot(agreement_store.all()),
+    lambda: (agreement_store.version(), datetime.today().date()),
+    copier=lambda snapshot: snapshot,
+)
+
+# Tenant names of the active agreements, for flagging likely duplicate uploads
+agreement_tenant_index = CachedValue(
+    "agreement_tenants",
+    lambda: TenantIndex((a.get("tenant_name", ""), duplicate_summary(a)) for a in agreement_store.all()),
+    agreement_store.version,
+    copier=lambda index: index,
+)
+
+# Upload file name -> id of the active agreement stored from it, so a job
+# that runs again does not store its agreement twice
+agreement_sources = CachedValue(
+    "agreement_sources",
+    lambda: {a["source_file"]: a["id"] for a in agreement_store.all() if a.get("source_file")},
+    agreement_store.version,
+    copier=lambda sources: sources,
+)
+
 def load_agreements():
-    """Load existing agreements from JSON file."""
+    """Load existing agreements from the agreement store."""
     try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                agreements = json.load(f)
-                logging.debug(f"Loaded {len(agreements)} existing agreements")
-                return agreements
-        else:
-            logging.debug("No existing data file found, starting fresh")
-            return []
+        agreements = agreements_cache.get()
+        logging.debug(f"Loaded {len(agreements)} existing agreements")
+        return agreements
     except Exception as e:
         logging.error(f"Error loading agreements: {e}")
         return []
 
 def save_agreements(agreements):
-    """Save agreements to JSON file."""
+    """Replace all stored agreements (bulk operations only)."""
     try:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(agreements, f, indent=2, ensure_ascii=False)
-            logging.debug(f"Saved {len(agreements)} agreements to {DATA_FILE}")
+        agreement_store.replace_all(agreements)
+        agreements_cache.invalidate()
+        logging.debug(f"Saved {len(agreements)} agreements")
     except Exception as e:
         logging.error(f"Error saving agreements: {e}")
 
 def load_archived_agreements():
-    """Load archived agreements from JSON file."""
+    """Load archived agreements from the archive store."""
     try:
-        if os.path.exists(ARCHIVE_FILE):
-            with open(ARCHIVE_FILE, 'r', encoding='utf-8') as f:
-                archived = json.load(f)
-                logging.debug(f"Loaded {len(archived)} archived agreements")
-                return archived
-        else:
-            logging.debug("No archived data file found")
-            return []
+        archived = archive_store.all()
+        logging.debug(f"Loaded {len(archived)} archived agreements")
+        return archived
     except Exception as e:
         logging.error(f"Error loading archived agreements: {e}")
         return []
 
 def save_archived_agreements(archived):
-    """Save archived agreements to JSON file."""
+    """Replace all archived agreements (bulk operations only)."""
     try:
-        with open(ARCHIVE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(archived, f, indent=2, ensure_ascii=False)
-            logging.debug(f"Saved {len(archived)} archived agreements to {ARCHIVE_FILE}")
+        archive_store.replace_all(archived)
+        logging.debug(f"Saved {len(archived)} archived agreements")
     except Exception as e:
         logging.error(f"Error saving archived agreements: {e}")
 
 def load_settings():
+    """Load settings, re-reading settings.json only when it has changed."""
+    return settings_cache.get()
+
+def _read_settings():
     """Load settings from JSON file."""
     try:
         if os.path.exists(SETTINGS_FILE):
@@ -227,12 +327,25 @@ def load_settings():
 def save_settings(settings):
     """Save settings to JSON file."""
     try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2, ensure_ascii=False)
-            logging.debug(f"Saved settings: {settings}")
+        write_json_file(SETTINGS_FILE, settings)
+        settings_cache.invalidate()
+        logging.debug(f"Saved settings: {settings}")
     except Exception as e:
         logging.error(f"Error saving settings: {e}")
 
+settings_cache = CachedValue("settings", _read_settings, lambda: file_token(SETTINGS_FILE))
+
+# Tenant name -> Gmail address, rebuilt only when settings.json changes
+tenant_email_index = CachedValue(
+    "tenant_emails",
+    lambda: TenantIndex(
+        (pair.get("tenant_name", ""), pair.get("gmail_address", ""))
+        for pair in load_settings().get("tenant_gmail_pairs", [])
+    ),
+    lambda: file_token(SETTINGS_FILE),
+    copier=lambda index: index,
+)
+
 def get_email_config():
     """Get email configuration from environment variables and saved settings."""
     # Load saved tenant-Gmail pairs to get sender information
@@ -364,12 +477,25 @@ def create_alert_email_content(tenant_name, agreement_data, alert_type):
     
     return alert_info['subject'], html_content
 
-def find_tenant_gmail(tenant_name, tenant_gmail_pairs):
-    """Find Gmail address for a tenant by matching names."""
-    for pair in tenant_gmail_pairs:
-        if pair.get('tenant_name', '').strip().lower() == tenant_name.strip().lower():
-            return pair.get('gmail_address', '')
-    return None
+def find_tenant_gmail(tenant_name, tenant_index):
+    """Find the Gmail address saved for a tenant's name once normalized (see tenants.py).
+
+    Only an exact match of the normalized name is returned, so an alert is
+    never sent to a merely similar company.
+    """
+    addresses = set(tenant_index.get(tenant_name))
+    if len(addresses) > 1:
+        logging.warning(f"Tenant {tenant_name!r} matches several Gmail entries; not sending")
+        return None
+    return addresses.pop() if addresses else None
+
+def suggest_tenant_gmail(tenant_name, tenant_index):
+    """(saved name, score) of a Gmail entry similar to a tenant's name, or None.
+
+    Used to tell the user which entry to check; nothing is sent to it.
+    """
+    matches = tenant_index.search(tenant_name, limit=1)
+    return (matches[0][1], matches[0][0]) if matches else None
 
 def send_email_notification(recipient_email, subject, html_content):
     """Send email notification using SMTP."""
@@ -451,271 +577,423 @@ def send_email_notification(recipient_email, subject, html_content):
 
 def archive_agreement(agreement):
     """Move an agreement to the archive."""
-    archived = load_archived_agreements()
     # Add deletion timestamp
     agreement["archived_timestamp"] = datetime.now().isoformat()
-    archived.append(agreement)
-    save_archived_agreements(archived)
+    archive_store.insert(agreement)
 
-def normalize_period_of_rent(period_value):
-    """Convert period of rent to standardized months format."""
-    if not period_value or period_value.strip() == "":
-        return ""
-    
-    period_str = str(period_value).lower().strip()
+def migrate_store(store):
+    """Normalize every stale record in a store with a single batched write."""
+    agreements = store.all()
+    stale = normalize_agreements([a for a in agreements if not is_current_schema(a)])
+    if stale:
+        store.replace_all(agreements)
+    return len(stale), len(agreements)
+
+def without_derived_fields(agreement):
+    """Copy of an agreement without the fields computed on read, for storing."""
+    return {key: value for key, value in agreement.items() if key not in DERIVED_FIELDS}
+
+def add_unique_id(agreement):
+    """Add a unique ID to an agreement based on timestamp."""
+    agreement["id"] = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
+    agreement["upload_timestamp"] = datetime.now().isoformat()
+    return agreement
+
+def prepare_for_display(agreements):
+    """Normalize records from an older schema and attach today's alert status."""
+    # Only records from an older schema need normalizing
+    normalize_agreements([a for a in agreements if not is_current_schema(a)])
+    alerts = alerts_cache.get()
+    for agreement in agreements:
+        agreement["alert_status"] = alerts.status(agreement.get("id"))
+    return agreements
+
+def parse_agreement_query(args):
+    """Translate request arguments into AgreementStore.query() keyword arguments.
+
+    Supported arguments: building, floor, tenant (name prefix), alert_status,
+    expiry_from / expiry_to (YYYY-MM-DD, inclusive), sort (prefix with '-' for
+    descending), limit and cursor. Raises ValueError for invalid values.
+    """
+    filters = {"expiry": []}
+    for field in ("building", "floor"):
+        if args.get(field):
+            filters[field] = args[field].strip()
+    if args.get("tenant"):
+        filters["tenant_prefix"] = args["tenant"]
     
-    # Extract numbers from the string
-    import re
-    numbers = re.findall(r'\d+', period_str)
+    if args.get("alert_status"):
+        constraints, include_missing = alert_expiry_filter(args["alert_status"], alert_thresholds())
+        filters["expiry"].extend(constraints)
+        filters["include_missing_expiry"] = include_missing
+    for arg, op in (("expiry_from", ">="), ("expiry_to", "<=")):
+        if args.get(arg):
+            try:
+                value = datetime.strptime(args[arg], "%Y-%m-%d").date().isoformat()
+            except ValueError:
+                raise ValueError(f"{arg} must be a YYYY-MM-DD date")
+            filters["expiry"].append((op, value))
+            # An explicit range never matches agreements without an expiry date
+            filters["include_missing_expiry"] = False
     
-    if not numbers:
-        return ""
+    sort = args.get("sort", "upload")
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
     
-    num = int(numbers[0])
+    try:
+        limit = int(args.get("limit", AGREEMENTS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be a number")
+    limit = max(1, min(limit, AGREEMENTS_MAX_PAGE_SIZE))
     
-    # Convert based on units mentioned
-    if 'year' in period_str:
-        months = num * 12
-    elif 'month' in period_str:
-        months = num
-    elif 'quarter' in period_str:
-        months = num * 3
-    else:
-        # Default assumption: if only a number, assume months
-        months = num
+    return {
+        "filters": filters,
+        "sort": sort,
+        "descending": descending,
+        "limit": limit,
+        "cursor": args.get("cursor") or None,
+    }
+
+def extract_pages_from_pdf(pdf_path):
+    """Pages of a PDF (text, word boxes, confidences) as ocr.extract_pages() returns them."""
+    logging.debug(f"Extracting text from: {pdf_path}")
+    cache_key = f"{sha256_file(pdf_path)}:{ocr_settings_key()}"
+    pages = extraction_cache.get("pages", cache_key)
+    if pages is not None:
+        logging.debug(f"OCR cache hit for {pdf_path}")
+        return pages
     
-    return str(months)
+    # Pages are OCRed in parallel; see ocr.py for the worker settings
+    pages = extract_pages(pdf_path)
+    extraction_cache.put("pages", cache_key, pages)
+    logging.debug(f"Extracted {len(pages)} pages, {len(pages_text(pages))} characters from {pdf_path}")
+    return pages
+
+def flag_duplicates(data, batch_index=None):
+    """Record active agreements that look like the same lease in possible_duplicate_of.
+
+    `batch_index` is a TenantIndex of agreements stored in the same write.
+    """
+    indexes = [agreement_tenant_index.get()] + ([batch_index] if batch_index is not None else [])
+    duplicates = likely_duplicates(data, indexes)
+    if duplicates:
+        data["possible_duplicate_of"] = duplicates
+        logging.warning(f"Agreement {data['id']} for {data.get('tenant_name')!r} may duplicate {', '.join(duplicates)}")
+    return duplicates
+
+def stored_upload(filepath):
+    """The active agreement already stored from an upload file, or None.
+
+    Upload jobs can run more than once (an expired lease, a failure after
+    the insert), so the handlers check this before and after the pipeline.
+    """
+    agreement_id = agreement_sources.get().get(os.path.basename(filepath))
+    return agreement_store.get(agreement_id) if agreement_id else None
 
-def normalize_rent_amount(rent_value):
-    """Extract numeric rent amount per sqft per month."""
-    if not rent_value or str(rent_value).strip() == "":
-        return ""
+def process_upload(filepath):
+    """Run the upload pipeline for a saved PDF and store the new agreement."""
+    existing = stored_upload(filepath)
+    if existing:
+        logging.info(f"{filepath} is already stored as agreement {existing['id']}")
+        return existing
     
-    rent_str = str(rent_value).strip()
+    pages = extract_pages_from_pdf(filepath)
+    data = extract_information_with_gpt4o(pages_text(pages))
     
-    # Extract numbers (including decimals) from the string
-    import re
-    # Look for decimal numbers first, then integers
-    numbers = re.findall(r'\d+\.?\d*', rent_str)
+    # Add unique ID and timestamp
+    data = add_unique_id(data)
+    # Lets `flask reextract` find the agreement an upload produced
+    data["source_file"] = os.path.basename(filepath)
+    flag_duplicates(data)
     
-    if not numbers:
-        return ""
+    # Debug: Print the final data being stored
+    logging.debug(f"Final data being stored: {data}")
     
-    # Return the first number found (should be the rent amount)
-    return numbers[0]
+    # Another run of the same job may have stored it while this one was OCRing
+    existing = stored_upload(filepath)
+    if existing:
+        logging.info(f"{filepath} was stored as agreement {existing['id']} by another run")
+        return existing
+    agreement_store.insert(without_derived_fields(data))
+    agreements_cache.invalidate()
+    ocr_artifacts.put(data["id"], pages, ocr_settings_key())
+    search_index.add(data)
+    return data
 
-def normalize_maintenance_amount(maintenance_value):
-    """Extract total numeric maintenance amount per sqft per month."""
-    if not maintenance_value or str(maintenance_value).strip() == "":
-        return ""
-    
-    maintenance_str = str(maintenance_value).strip()
-    
-    # Extract all numbers (including decimals) from the string
-    import re
-    numbers = re.findall(r'\d+\.?\d*', maintenance_str)
-    
-    if not numbers:
-        return ""
+def process_upload_job(payload):
+    """Job handler for queued uploads; returns the job result."""
+    data = process_upload(payload["filepath"])
+    return {
+        "agreement_id": data["id"],
+        "tenant_name": data.get("tenant_name", ""),
+        "possible_duplicate_of": data.get("possible_duplicate_of", []),
+    }
+
+def stored_report(filename, data):
+    """Bulk upload report entry of a stored agreement."""
+    return {
+        "filename": filename,
+        "status": "done",
+        "agreement_id": data["id"],
+        "tenant_name": data.get("tenant_name", ""),
+        "possible_duplicate_of": data.get("possible_duplicate_of", []),
+    }
+
+def process_bulk_upload(files):
+    """Run the upload pipeline for many saved PDFs and store them in one write.
+
+    `files` is a list of {"filepath", "filename"}. Up to BULK_OCR_CONCURRENCY
+    PDFs are OCRed at a time while the GPT-4o requests of PDFs already OCRed
+    are in flight. Returns a per-file report in upload order. Files a
+    previous run of the job already stored are reported, not stored again.
+    """
+    stored = {entry["filepath"]: stored_upload(entry["filepath"]) for entry in files}
+    pending = [entry["filepath"] for entry in files if not stored[entry["filepath"]]]
+    results = dict(zip(pending, asyncio.run(pipeline_bulk_upload(pending)))) if pending else {}
     
-    # Sum all numbers found (to handle cases like "Rs.11 + Rs. 2")
-    total = 0
-    for num_str in numbers:
-        try:
-            total += float(num_str)
-        except ValueError:
+    records = []
+    artifacts = {}
+    report = []
+    used_ids = set()
+    batch_tenants = TenantIndex()
+    for entry in files:
+        # Another run of the same job may have stored it while this one was OCRing
+        existing = stored[entry["filepath"]] or stored_upload(entry["filepath"])
+        if existing:
+            report.append(stored_report(entry["filename"], existing))
+            continue
+        result = results[entry["filepath"]]
+        if isinstance(result, Exception):
+            logging.error(f"Bulk upload of {entry['filename']} failed: {result}")
+            report.append({"filename": entry["filename"], "status": "failed", "error": str(result)})
             continue
+        pages, fields = result
+        data = add_unique_id(fields)
+        data["source_file"] = os.path.basename(entry["filepath"])
+        # Timestamp ids can repeat within a millisecond in a batch
+        if data["id"] in used_ids:
+            data["id"] = f"{data['id']}_{len(records)}"
+        used_ids.add(data["id"])
+        flag_duplicates(data, batch_tenants)
+        batch_tenants.add(data.get("tenant_name", ""), duplicate_summary(data))
+        records.append(without_derived_fields(data))
+        artifacts[data["id"]] = pages
+        report.append(stored_report(entry["filename"], data))
     
-    # Return as string, removing unnecessary decimal places
-    if total == int(total):
-        return str(int(total))
-    else:
-        return str(total)
+    # All agreements of the batch are committed together
+    if records:
+        agreement_store.insert_many(records)
+        agreements_cache.invalidate()
+        ocr_artifacts.put_many(artifacts, ocr_settings_key())
+        search_index.add_many(records)
+    return report
 
-def normalize_rent_escalation(escalation_value):
-    """Extract percentage value from rent escalation."""
-    if not escalation_value or str(escalation_value).strip() == "":
-        return ""
-    
-    escalation_str = str(escalation_value).strip()
-    
-    # Extract percentage value
-    import re
-    # Look for number followed by % or number by itself
-    percentage_match = re.search(r'(\d+\.?\d*)%?', escalation_str)
-    
-    if percentage_match:
-        number = percentage_match.group(1)
-        # Always return with % sign
-        return f"{number}%"
-    
-    return ""
+async def pipeline_bulk_upload(filepaths, ocr_concurrency=BULK_OCR_CONCURRENCY, known_pages=None):
+    """(pages, fields) of each PDF, or the exception it failed with, in order.
 
-def normalize_area_sqft(area_value):
-    """Extract numeric square footage value."""
-    if not area_value or str(area_value).strip() == "":
-        return ""
-    
-    area_str = str(area_value).strip()
-    
-    # Extract numeric value
-    import re
-    numbers = re.findall(r'\d+', area_str)
-    
-    if numbers:
-        return numbers[0]  # Return the first number found
-    
-    return ""
+    `known_pages` maps file paths to pages already extracted (stored OCR
+    artifacts); those files are not OCRed again.
+    """
+    known_pages = known_pages or {}
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=ocr_concurrency) as ocr_threads:
+        async with AsyncModelClient() as client:
+            async def pipeline(filepath):
+                pages = known_pages.get(filepath)
+                if pages is None:
+                    pages = await loop.run_in_executor(ocr_threads, extract_pages_from_pdf, filepath)
+                return pages, await extract_information_async(client, pages_text(pages))
+            return await asyncio.gather(*(pipeline(path) for path in filepaths), return_exceptions=True)
 
-def normalize_floor(floor_value):
-    """Standardize floor information."""
-    if not floor_value or str(floor_value).strip() == "":
-        return ""
-    
-    floor_str = str(floor_value).strip().lower()
-    
-    # Standardize common floor formats
-    if 'ground' in floor_str or 'g.f' in floor_str or floor_str in ['gf', '0']:
-        return "Ground Floor"
-    elif '1st' in floor_str or 'first' in floor_str or floor_str in ['1', 'f1']:
-        return "1st Floor"
-    elif '2nd' in floor_str or 'second' in floor_str or floor_str in ['2', 'f2']:
-        return "2nd Floor"
-    elif '3rd' in floor_str or 'third' in floor_str or floor_str in ['3', 'f3']:
-        return "3rd Floor"
-    elif '4th' in floor_str or 'fourth' in floor_str or floor_str in ['4', 'f4']:
-        return "4th Floor"
-    elif '5th' in floor_str or 'fifth' in floor_str or floor_str in ['5', 'f5']:
-        return "5th Floor"
-    else:
-        # Return as is if no standard format matches
-        return str(floor_value).strip()
+def process_bulk_upload_job(payload):
+    """Job handler for bulk uploads; the result holds the per-file report."""
+    report = process_bulk_upload(payload["files"])
+    return {
+        "stored": sum(entry["status"] == "done" for entry in report),
+        "failed": sum(entry["status"] == "failed" for entry in report),
+        "files": report,
+    }
+
+def save_zip_pdfs(zip_path, prefix, limit):
+    """Extract up to `limit` PDFs from a ZIP into the upload folder.
 
-def normalize_building(building_value):
-    """Standardize building names."""
-    if not building_value or str(building_value).strip() == "":
-        return ""
+    Returns (saved, skipped): saved is a list of {"filepath", "filename"},
+    skipped a list of member names that were not extracted. Raises
+    ValueError, leaving nothing extracted, if the PDFs would exceed
+    BULK_MAX_PDF_MB each or BULK_MAX_UNZIPPED_MB together.
+    """
+    max_pdf_bytes = BULK_MAX_PDF_MB * 1024 * 1024
+    max_total_bytes = BULK_MAX_UNZIPPED_MB * 1024 * 1024
+    saved, skipped = [], []
+    with zipfile.ZipFile(zip_path) as archive:
+        members = []
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            filename = secure_filename(os.path.basename(member.filename))
+            if not allowed_file(filename) or len(members) >= limit:
+                skipped.append(member.filename)
+                continue
+            members.append((member, filename))
+        
+        # Declared sizes are checked before anything is written...
+        for member, _ in members:
+            if member.file_size > max_pdf_bytes:
+                raise ValueError(f"{member.filename} is larger than {BULK_MAX_PDF_MB} MB uncompressed")
+        if sum(member.file_size for member, _ in members) > max_total_bytes:
+            raise ValueError(f"ZIP is larger than {BULK_MAX_UNZIPPED_MB} MB uncompressed")
+        
+        # ...and bytes are counted while copying, since the declared sizes come from the upload
+        total = 0
+        try:
+            for member, filename in members:
+                filepath = os.path.join(app.config["UPLOAD_FOLDER"], f"{prefix}_{len(saved):03d}_{filename}")
+                saved.append({"filepath": filepath, "filename": filename})
+                written = 0
+                with archive.open(member) as source, open(filepath, "wb") as target:
+                    while chunk := source.read(1024 * 1024):
+                        written += len(chunk)
+                        total += len(chunk)
+                        if written > max_pdf_bytes:
+                            raise ValueError(f"{member.filename} is larger than {BULK_MAX_PDF_MB} MB uncompressed")
+                        if total > max_total_bytes:
+                            raise ValueError(f"ZIP is larger than {BULK_MAX_UNZIPPED_MB} MB uncompressed")
+                        target.write(chunk)
+        except BaseException:
+            for entry in saved:
+                if os.path.exists(entry["filepath"]):
+                    os.remove(entry["filepath"])
+            raise
+    return saved, skipped
+
+# Job kind -> handler, used by worker.py
+JOB_HANDLERS = {"upload": process_upload_job, "bulk_upload": process_bulk_upload_job}
+
+def calculate_alert_status(agreement_expiry_date, thresholds=None):
+    """Calculate alert status based on agreement expiry date."""
+    return alert_status_from_iso(to_iso(agreement_expiry_date), thresholds or alert_thresholds())
+
+# Per-field instructions, included in the prompt only for the fields requested
+FIELD_INSTRUCTIONS = {
+    "period_of_rent": "For 'period_of_rent', convert to months as a number only (e.g., '12' for 1 year, '24' for 2 years, '6' for 6 months). ",
+    "rent_amount": "For 'rent_amount', extract only the numeric rent per sqft per month value (e.g., '72' from 'Rs 72 per sqft per month', '90.50' from 'Rs. 90.50 per square foot per month'). ",
+    "maintenance": "For 'maintenance', extract only the total numeric maintenance per sqft per month value (e.g., '13' from 'Rs.11 per square foot per month + Rs. 2 per square foot per month for canteen', '10' from 'Rs 10 per sqft per month'). ",
+    "rent_escalation": "For 'rent_escalation', extract only the percentage value (e.g., '7%' from '7%', '5%' from '5% annually'). ",
+    "lock_in_period": "For 'lock_in_period', convert to months as a number only (e.g., '24' for 24 months, '36' for 3 years, '6' for 6 months). ",
+    "area_sqft": "For 'area_sqft', extract only the numeric square footage value (e.g., '3200' from 'ad measuring 3200 sqft', '1500' from '1500 square feet'). ",
+    "floor": "For 'floor', extract the floor information (e.g., 'Ground Floor', '1st Floor', '2nd Floor'). ",
+    "building": "For 'building', extract the building name - should be either 'JP Classic' or 'Silver Software' (e.g., 'JP Classic' from '1st Floor of JP Classic', 'Silver Software' if mentioned). ",
+    "rental_period_greater_than_lock_in_period": "For 'rental_period_greater_than_lock_in_period', return ONLY 'True' or 'False' (not Yes/No or true/false). ",
+}
+
+def build_extraction_prompt(text, fields):
+    """Extraction prompt asking only for `fields`."""
+    keys = ", ".join(f'"{field}"' for field in fields)
+    prompt = f"Extract the following details from this rental agreement and return them as a single JSON object with these keys: {keys}. "
+    if any(field in DATE_FIELDS for field in fields):
+        prompt += "For dates, use YYYY-MM-DD format. "
+    for field in FIELD_INSTRUCTIONS:
+        if field in fields:
+            prompt += FIELD_INSTRUCTIONS[field]
+    prompt += "If a value is not found, use an empty string. Only return the JSON object, nothing else.\n\n"
+    return prompt + text
+
+def fields_cache_key(text):
+    # The same text with the same prompt, local rules, passages and
+    # normalizers yields the same fields
+    return (f"{sha256_text(text)}:prompt{PROMPT_VERSION}:schema{SCHEMA_VERSION}"
+            f":local{LOCAL_CONFIDENCE_THRESHOLD}:budget{PROMPT_TOKEN_BUDGET}")
+
+def cache_fields(cache_key, data):
+    # Don't cache a failed extraction
+    if any(data.get(key) for key in EXTRACTED_FIELDS):
+        extraction_cache.put("fields", cache_key, data)
+
+def add_alert_status(data):
+    """Add alert status based on agreement expiry date."""
+    expiry_date = data.get("agreement_expiry_date", "")
+    alert_status = calculate_alert_status(expiry_date)
+    data["alert_status"] = alert_status
     
-    building_str = str(building_value).strip().lower()
+    # Debug logging
+    logging.debug(f"Agreement expiry date: {expiry_date}")
+    logging.debug(f"Calculated alert status: {alert_status}")
     
-    # Standardize building names
-    if 'jp classic' in building_str or 'jp-classic' in building_str:
-        return "JP Classic"
-    elif 'silver software' in building_str or 'silver-software' in building_str:
-        return "Silver Software"
+    return data
+
+def extract_information_with_gpt4o(text):
+    cache_key = fields_cache_key(text)
+    data = extraction_cache.get("fields", cache_key)
+    if data is None:
+        data = extract_fields(text)
+        cache_fields(cache_key, data)
     else:
-        # Return as is if no standard building matches
-        return str(building_value).strip()
+        logging.debug("Extraction cache hit")
+    return add_alert_status(data)
 
-def add_unique_id(agreement):
-    """Add a unique ID to an agreement based on timestamp."""
-    agreement["id"] = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
-    agreement["upload_timestamp"] = datetime.now().isoformat()
-    return agreement
+async def extract_information_async(client, text):
+    """extract_information_with_gpt4o() using an AsyncModelClient."""
+    cache_key = fields_cache_key(text)
+    data = extraction_cache.get("fields", cache_key)
+    if data is None:
+        data = await extract_fields_async(client, text)
+        cache_fields(cache_key, data)
+    return add_alert_status(data)
 
-def extract_text_from_pdf(pdf_path):
-    logging.debug(f"Extracting text from: {pdf_path}")
-    images = convert_from_path(pdf_path)
-    extracted_text = ""
-    for image in images:
-        text = pytesseract.image_to_string(image)
-        extracted_text += text + "\n"
-    logging.debug(f"Extracted text: {extracted_text}")
-    return extracted_text
-
-def calculate_alert_status(agreement_expiry_date):
-    """Calculate alert status based on agreement expiry date."""
-    if not agreement_expiry_date or agreement_expiry_date.strip() == "":
-        logging.debug("No agreement expiry date provided")
-        return ""
-    
-    try:
-        # Clean the date string
-        date_str = agreement_expiry_date.strip()
-        logging.debug(f"Trying to parse date: '{date_str}'")
-        
-        # Try different date formats
-        date_formats = [
-            "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y",
-            "%Y/%m/%d", "%m-%d-%Y", "%d.%m.%Y", "%Y.%m.%d",
-            "%B %d, %Y", "%d %B %Y", "%b %d, %Y", "%d %b %Y"
-        ]
-        expiry_date = None
-        
-        for fmt in date_formats:
-            try:
-                expiry_date = datetime.strptime(date_str, fmt).date()
-                logging.debug(f"Successfully parsed date with format {fmt}: {expiry_date}")
-                break
-            except ValueError:
-                continue
-        
-        if not expiry_date:
-            logging.debug(f"Could not parse date: {date_str}")
-            return ""
-        
-        today = datetime.today().date()
-        three_months_before = expiry_date - timedelta(days=90)
-        two_months_before = expiry_date - timedelta(days=60)
-        one_month_before = expiry_date - timedelta(days=30)
-        
-        logging.debug(f"Today: {today}")
-        logging.debug(f"Agreement expiry date: {expiry_date}")
-        logging.debug(f"Three months before: {three_months_before}")
-        logging.debug(f"Two months before: {two_months_before}")
-        logging.debug(f"One month before: {one_month_before}")
-        
-        if today < three_months_before:
-            logging.debug("Status: No alert (more than 3 months away)")
-            return ""  # No alert if more than 3 months away
-        elif three_months_before <= today < two_months_before:
-            logging.debug("Status: three_months (amber yellow)")
-            return "three_months"  # Amber yellow: 3 months before
-        elif two_months_before <= today < one_month_before:
-            logging.debug("Status: two_months (light red)")
-            return "two_months"  # Light red: 2 months before
-        elif one_month_before <= today < expiry_date:
-            logging.debug("Status: one_month (dark red)")
-            return "one_month"  # Dark red: 1 month before
-        elif today >= expiry_date:
-            logging.debug("Status: expired (dark red)")
-            return "expired"  # Dark red: After deadline
+def split_local_fields(text):
+    """Locally extracted fields at or above the threshold, and the fields left for GPT-4o."""
+    local = extract_fields_locally(text)
+    data = {}
+    uncertain = []
+    for field in EXTRACTED_FIELDS:
+        value, confidence = local.get(field, ("", 0.0))
+        if confidence >= LOCAL_CONFIDENCE_THRESHOLD:
+            data[field] = value
         else:
-            return ""
-    except Exception as e:
-        logging.error(f"Error calculating alert status: {e}")
-        return ""
+            uncertain.append(field)
+    logging.info(f"Local extraction found {len(data)} of {len(EXTRACTED_FIELDS)} fields; asking GPT-4o for {uncertain}")
+    logging.debug(f"Local extraction confidence: {local}")
+    return data, uncertain
 
-def extract_information_with_gpt4o(text):
-    prompt = (
-        "Extract the following details from this rental agreement and return them as a single JSON object with these keys: "
-        '"tenant_name", "area_sqft", "floor", "building", "period_of_rent", "rent_amount", "maintenance", "rent_escalation", '
-        '"agreement_start_date", "agreement_expiry_date", "lock_in_period", "lock_in_period_end_date", '
-        '"rental_period_greater_than_lock_in_period", "next_rent_escalation". '
-        "For dates, use YYYY-MM-DD format. "
-        "For 'period_of_rent', convert to months as a number only (e.g., '12' for 1 year, '24' for 2 years, '6' for 6 months). "
-        "For 'rent_amount', extract only the numeric rent per sqft per month value (e.g., '72' from 'Rs 72 per sqft per month', '90.50' from 'Rs. 90.50 per square foot per month'). "
-        "For 'maintenance', extract only the total numeric maintenance per sqft per month value (e.g., '13' from 'Rs.11 per square foot per month + Rs. 2 per square foot per month for canteen', '10' from 'Rs 10 per sqft per month'). "
-        "For 'rent_escalation', extract only the percentage value (e.g., '7%' from '7%', '5%' from '5% annually'). "
-        "For 'lock_in_period', convert to months as a number only (e.g., '24' for 24 months, '36' for 3 years, '6' for 6 months). "
-        "For 'area_sqft', extract only the numeric square footage value (e.g., '3200' from 'ad measuring 3200 sqft', '1500' from '1500 square feet'). "
-        "For 'floor', extract the floor information (e.g., 'Ground Floor', '1st Floor', '2nd Floor'). "
-        "For 'building', extract the building name - should be either 'JP Classic' or 'Silver Software' (e.g., 'JP Classic' from '1st Floor of JP Classic', 'Silver Software' if mentioned). "
-        "For 'rental_period_greater_than_lock_in_period', return ONLY 'True' or 'False' (not Yes/No or true/false). "
-        "If a value is not found, use an empty string. Only return the JSON object, nothing else.\n\n"
-        f"{text}"
-    )
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are an OCR and information extraction assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=1024,
-    )
-    content = response.choices[0].message.content
+def extract_fields(text):
+    """Extract fields with local rules, asking GPT-4o only for the uncertain ones."""
+    data, uncertain = split_local_fields(text)
+    if uncertain:
+        remote = request_fields_from_gpt4o(text, uncertain)
+        for field in uncertain:
+            data[field] = remote.get(field, "")
+    
+    # Normalize once at ingest; stored records are not re-normalized on read
+    normalize_agreement(data)
+    return data
+
+async def extract_fields_async(client, text):
+    """extract_fields() with the GPT-4o request made through `client`."""
+    data, uncertain = split_local_fields(text)
+    if uncertain:
+        content = await client.chat(extraction_messages(text, uncertain), max_tokens=1024)
+        remote = parse_fields_response(content, uncertain)
+        for field in uncertain:
+            data[field] = remote.get(field, "")
+    normalize_agreement(data)
+    return data
+
+def extraction_messages(text, fields):
+    """Chat messages asking for `fields` from the relevant passages of `text`."""
+    # Send only the passages that mention these fields, within the token budget
+    passages = select_passages(text, fields, PROMPT_TOKEN_BUDGET)
+    logging.info(f"Prompt text compacted from ~{estimate_tokens(text)} to ~{estimate_tokens(passages)} tokens")
+    return [
+        {"role": "system", "content": "You are an OCR and information extraction assistant."},
+        {"role": "user", "content": build_extraction_prompt(passages, fields)}
+    ]
+
+def parse_fields_response(content, fields):
+    """JSON object from a model reply; missing keys come back as ''."""
     logging.debug(f"GPT-4o raw response: {content}")
-    json_match = re.search(r'\{[\s\S]*\}', content)
+    json_match = re.search(r'\{[\s\S]*\}', content or "")
     if json_match:
         json_str = json_match.group(0)
         try:
@@ -725,75 +1003,20 @@ def extract_information_with_gpt4o(text):
             data = {}
     else:
         data = {}
-    keys = [
-        "tenant_name", "area_sqft", "floor", "building", "period_of_rent", "rent_amount", "maintenance", "rent_escalation",
-        "agreement_start_date", "agreement_expiry_date", "lock_in_period", "lock_in_period_end_date",
-        "rental_period_greater_than_lock_in_period", "next_rent_escalation"
-    ]
-    for key in keys:
+    for key in fields:
         if key not in data:
             data[key] = ""
-    
-    # Normalize area_sqft to numeric value
-    area_value = data.get("area_sqft", "")
-    data["area_sqft"] = normalize_area_sqft(area_value)
-    
-    # Normalize floor to standard format
-    floor_value = data.get("floor", "")
-    data["floor"] = normalize_floor(floor_value)
-    
-    # Normalize building to standard names
-    building_value = data.get("building", "")
-    data["building"] = normalize_building(building_value)
-    
-    # Normalize period_of_rent to months
-    period_value = data.get("period_of_rent", "")
-    data["period_of_rent"] = normalize_period_of_rent(period_value)
-    
-    # Normalize rent_amount to numeric value
-    rent_value = data.get("rent_amount", "")
-    data["rent_amount"] = normalize_rent_amount(rent_value)
-    
-    # Normalize maintenance to numeric value
-    maintenance_value = data.get("maintenance", "")
-    data["maintenance"] = normalize_maintenance_amount(maintenance_value)
-    
-    # Normalize rent_escalation to percentage value
-    escalation_value = data.get("rent_escalation", "")
-    data["rent_escalation"] = normalize_rent_escalation(escalation_value)
-    
-    # Normalize lock_in_period to months (using same logic as period_of_rent)
-    lock_in_value = data.get("lock_in_period", "")
-    data["lock_in_period"] = normalize_period_of_rent(lock_in_value)
-    
-    # Normalize rental_period_greater_than_lock_in_period to True/False
-    rental_period_value = data.get("rental_period_greater_than_lock_in_period", "")
-    
-    # Handle different data types (string, boolean, etc.)
-    if isinstance(rental_period_value, bool):
-        data["rental_period_greater_than_lock_in_period"] = "True" if rental_period_value else "False"
-    elif isinstance(rental_period_value, str):
-        rental_period_value = rental_period_value.strip()
-        if rental_period_value.lower() in ["yes", "true", "1"]:
-            data["rental_period_greater_than_lock_in_period"] = "True"
-        elif rental_period_value.lower() in ["no", "false", "0"]:
-            data["rental_period_greater_than_lock_in_period"] = "False"
-        else:
-            data["rental_period_greater_than_lock_in_period"] = "False"  # Default to False if unclear
-    else:
-        data["rental_period_greater_than_lock_in_period"] = "False"  # Default to False if unclear
-    
-    # Add alert status based on agreement expiry date
-    expiry_date = data.get("agreement_expiry_date", "")
-    alert_status = calculate_alert_status(expiry_date)
-    data["alert_status"] = alert_status
-    
-    # Debug logging
-    logging.debug(f"Agreement expiry date: {expiry_date}")
-    logging.debug(f"Calculated alert status: {alert_status}")
-    
     return data
 
+def request_fields_from_gpt4o(text, fields=EXTRACTED_FIELDS):
+    """Ask GPT-4o for the given fields; missing keys come back as ''."""
+    response = openai.chat.completions.create(
+        model="gpt-4o",
+        messages=extraction_messages(text, fields),
+        max_tokens=1024,
+    )
+    return parse_fields_response(response.choices[0].message.content, fields)
+
 @app.route("/login", methods=["GET", "POST"])
 @limiter.limit("10 per minute")
 def login():
@@ -844,91 +1067,180 @@ def logout():
 @login_required
 @limiter.limit("50 per hour")
 def dashboard():
-    # Load existing agreements and settings
-    agreements = load_agreements()
     settings = load_settings()
     
-    # Update alert status and normalize values for all existing agreements
-    for agreement in agreements:
-        agreement["alert_status"] = calculate_alert_status(agreement.get("agreement_expiry_date", ""))
-        
-        # Handle legacy data - convert place_occupied to new fields if needed
-        if "place_occupied" in agreement and not agreement.get("area_sqft"):
-            place = agreement.get("place_occupied", "")
-            # Extract area, floor, and building from place_occupied
-            agreement["area_sqft"] = normalize_area_sqft(place)
-            agreement["floor"] = normalize_floor(place)
-            agreement["building"] = normalize_building(place)
-        
-        # Normalize new fields for existing data
-        area_value = agreement.get("area_sqft", "")
-        agreement["area_sqft"] = normalize_area_sqft(area_value)
-        
-        floor_value = agreement.get("floor", "")
-        agreement["floor"] = normalize_floor(floor_value)
-        
-        building_value = agreement.get("building", "")
-        agreement["building"] = normalize_building(building_value)
-        
-        # Normalize period_of_rent for existing data
-        period_value = agreement.get("period_of_rent", "")
-        agreement["period_of_rent"] = normalize_period_of_rent(period_value)
-        
-        # Normalize rent_amount for existing data
-        rent_value = agreement.get("rent_amount", "")
-        agreement["rent_amount"] = normalize_rent_amount(rent_value)
-        
-        # Normalize maintenance for existing data
-        maintenance_value = agreement.get("maintenance", "")
-        agreement["maintenance"] = normalize_maintenance_amount(maintenance_value)
-        
-        # Normalize rent_escalation for existing data
-        escalation_value = agreement.get("rent_escalation", "")
-        agreement["rent_escalation"] = normalize_rent_escalation(escalation_value)
-        
-        # Normalize lock_in_period for existing data (using same logic as period_of_rent)
-        lock_in_value = agreement.get("lock_in_period", "")
-        agreement["lock_in_period"] = normalize_period_of_rent(lock_in_value)
-        
-        # Normalize rental_period_greater_than_lock_in_period for existing data
-        rental_period_value = agreement.get("rental_period_greater_than_lock_in_period", "")
-        
-        # Handle different data types (string, boolean, etc.)
-        if isinstance(rental_period_value, bool):
-            agreement["rental_period_greater_than_lock_in_period"] = "True" if rental_period_value else "False"
-        elif isinstance(rental_period_value, str):
-            rental_period_value = rental_period_value.strip()
-            if rental_period_value.lower() in ["yes", "true", "1"]:
-                agreement["rental_period_greater_than_lock_in_period"] = "True"
-            elif rental_period_value.lower() in ["no", "false", "0"]:
-                agreement["rental_period_greater_than_lock_in_period"] = "False"
-            else:
-                agreement["rental_period_greater_than_lock_in_period"] = "False"
-        else:
-            agreement["rental_period_greater_than_lock_in_period"] = "False"
-    
     if request.method == "POST":
         file = request.files["file"]
         if file and allowed_file(file.filename):
+            # Save the upload and queue it; worker.py does the OCR and extraction
+            job_id = new_job_id()
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+            filepath = os.path.join(app.config["UPLOAD_FOLDER"], f"{job_id}_{filename}")
             file.save(filepath)
-            full_text = extract_text_from_pdf(filepath)
-            data = extract_information_with_gpt4o(full_text)
+            job_queue.enqueue("upload", {"filepath": filepath, "filename": filename}, job_id=job_id)
+            logging.debug(f"Queued upload job {job_id} for {filename}")
             
-            # Add unique ID and timestamp
-            data = add_unique_id(data)
-            
-            # Debug: Print the final data being sent to template
-            logging.debug(f"Final data being sent to template: {data}")
-            
-            # Add new agreement to the list
-            agreements.append(data)
-            
-            # Save all agreements to file
-            save_agreements(agreements)
-            
-    return render_template("dashboard.html", agreements=agreements, settings=settings)
+            if request.accept_mimetypes.best == "application/json":
+                return jsonify(job_id=job_id, status_url=url_for("job_status", job_id=job_id)), 202
+            flash(f"{filename} uploaded and queued for processing.", "info")
+        else:
+            flash("Please upload a PDF file.", "error")
+        return redirect(url_for("dashboard"))
+    
+    # Render one page of agreements through the same query as /api/agreements
+    filters = {k: v for k, v in request.args.items() if k != "cursor"}
+    try:
+        agreements, next_cursor = agreement_store.query(**parse_agreement_query(request.args))
+    except ValueError as e:
+        flash(f"Invalid filter: {e}", "error")
+        filters = {}
+        agreements, next_cursor = agreement_store.query(limit=AGREEMENTS_PAGE_SIZE)
+    prepare_for_display(agreements)
+    
+    return render_template(
+        "dashboard.html",
+        agreements=agreements,
+        settings=settings,
+        next_cursor=next_cursor,
+        filters=filters,
+        is_first_page=not request.args.get("cursor"),
+        total_agreements=agreement_store.count(),
+        buildings=[label for label, _ in BUILDING_RULES],
+        alert_statuses=ALERT_STATUSES,
+        recent_jobs=job_queue.recent(5)
+    )
+
+@app.route("/bulk_upload", methods=["POST"])
+@login_required
+@limiter.limit("10 per hour")
+def bulk_upload():
+    """Queue several PDFs, or one ZIP of PDFs, as a single bulk upload job."""
+    # Larger than the single-upload limit; files are spooled to disk, not memory
+    request.max_content_length = BULK_MAX_CONTENT_MB * 1024 * 1024
+    job_id = new_job_id()
+    files, skipped = [], []
+    for upload in request.files.getlist("files"):
+        filename = secure_filename(upload.filename or "")
+        if filename.lower().endswith(".zip"):
+            zip_path = os.path.join(app.config["UPLOAD_FOLDER"], f"{job_id}_{filename}")
+            upload.save(zip_path)
+            try:
+                saved, zip_skipped = save_zip_pdfs(zip_path, job_id, BULK_MAX_FILES - len(files))
+                files.extend(saved)
+                skipped.extend(zip_skipped)
+            except zipfile.BadZipFile:
+                skipped.append(upload.filename)
+            except ValueError as e:
+                # A ZIP over the size limits rejects the whole upload
+                logging.warning(f"Rejected bulk upload ZIP {upload.filename}: {e}")
+                for entry in files:
+                    os.remove(entry["filepath"])
+                if request.accept_mimetypes.best == "application/json":
+                    return jsonify(error=str(e)), 413
+                flash(f"ZIP rejected: {e}", "error")
+                return redirect(url_for("dashboard"))
+            finally:
+                os.remove(zip_path)
+        elif allowed_file(filename) and len(files) < BULK_MAX_FILES:
+            filepath = os.path.join(app.config["UPLOAD_FOLDER"], f"{job_id}_{len(files):03d}_{filename}")
+            upload.save(filepath)
+            files.append({"filepath": filepath, "filename": filename})
+        elif upload.filename:
+            skipped.append(upload.filename)
+    
+    wants_json = request.accept_mimetypes.best == "application/json"
+    if not files:
+        if wants_json:
+            return jsonify(error="No PDF files found in the upload", skipped=skipped), 400
+        flash("Please upload PDF files or a ZIP of PDFs.", "error")
+        return redirect(url_for("dashboard"))
+    
+    job_queue.enqueue("bulk_upload", {"files": files, "filename": f"{len(files)} files"}, job_id=job_id)
+    logging.debug(f"Queued bulk upload job {job_id} for {len(files)} files")
+    
+    if wants_json:
+        return jsonify(
+            job_id=job_id,
+            status_url=url_for("job_status", job_id=job_id),
+            files=[entry["filename"] for entry in files],
+            skipped=skipped
+        ), 202
+    message = f"{len(files)} files uploaded and queued for processing."
+    if skipped:
+        message += f" Skipped {len(skipped)} non-PDF or excess files."
+    flash(message, "info")
+    return redirect(url_for("dashboard"))
+
+@app.route("/api/agreements")
+@login_required
+@limiter.limit("600 per hour")
+def api_agreements():
+    """JSON listing of agreements with filtering, sorting, projection and cursor pagination."""
+    try:
+        query = parse_agreement_query(request.args)
+        agreements, next_cursor = agreement_store.query(**query)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    prepare_for_display(agreements)
+    
+    # fields=tenant_name,building projects each record; "id" is always included
+    if request.args.get("fields"):
+        fields = ["id"] + [f.strip() for f in request.args["fields"].split(",") if f.strip() and f.strip() != "id"]
+        agreements = [{field: agreement.get(field) for field in fields} for agreement in agreements]
+    
+    return jsonify(agreements=agreements, next_cursor=next_cursor, count=len(agreements))
+
+@app.route("/api/agreements/<agreement_id>/ocr")
+@login_required
+@limiter.limit("600 per hour")
+def api_agreement_ocr(agreement_id):
+    """Stored per-page OCR text and confidences of an agreement; words=1 adds the word boxes."""
+    artifact = ocr_artifacts.get(agreement_id, words=request.args.get("words") == "1")
+    if artifact is None:
+        return jsonify(error="No OCR artifacts for this agreement"), 404
+    return jsonify(artifact)
+
+@app.route("/search")
+@login_required
+@limiter.limit("600 per hour")
+def search_agreements():
+    """Agreements whose OCR text matches a query, ranked, with highlighted snippets."""
+    query = request.args.get("q", "").strip()
+    status = request.args.get("status") or None
+    if not query:
+        return jsonify(error="Missing search query (q)"), 400
+    if status is not None and status not in SEARCH_STATUSES:
+        return jsonify(error=f"status must be one of {', '.join(SEARCH_STATUSES)}"), 400
+    try:
+        limit = min(int(request.args.get("limit", 20)), AGREEMENTS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify(error="limit must be a number"), 400
+    
+    started = time.perf_counter()
+    results = search_index.search(query, max(1, limit), status)
+    took_ms = (time.perf_counter() - started) * 1000
+    return jsonify(query=query, results=results, count=len(results), took_ms=round(took_ms, 2))
+
+@app.route("/jobs/<job_id>")
+@login_required
+@limiter.limit("600 per hour")
+def job_status(job_id):
+    """Status of a queued upload job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(
+        id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        filename=job["payload"].get("filename"),
+        attempts=job["attempts"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        result=job["result"],
+        error=job["error"]
+    )
 
 @app.route("/test_alert")
 @login_required
@@ -1018,37 +1330,46 @@ def test_alert():
 def delete_agreement(agreement_id):
     """Archive a specific agreement by ID."""
     try:
-        agreements = load_agreements()
-        # Find the agreement to archive
-        agreement_to_archive = None
-        for agreement in agreements:
-            if agreement.get("id") == agreement_id:
-                agreement_to_archive = agreement
-                break
+        # Remove from active agreements; only one concurrent request can win
+        agreement_to_archive = agreement_store.pop(agreement_id)
+        agreements_cache.invalidate()
         
         if agreement_to_archive:
-            # Archive the agreement
-            archive_agreement(agreement_to_archive)
-            # Remove from active agreements
-            agreements = [a for a in agreements if a.get("id") != agreement_id]
-            save_agreements(agreements)
+            try:
+                archive_agreement(agreement_to_archive)
+            except Exception:
+                # Put it back, so a failed archive write doesn't lose the agreement
+                agreement_to_archive.pop("archived_timestamp", None)
+                agreement_store.insert(agreement_to_archive)
+                agreements_cache.invalidate()
+                raise
+            search_index.set_status(agreement_id, "archived")
             logging.debug(f"Archived agreement with ID: {agreement_id}")
         else:
             logging.warning(f"Agreement with ID {agreement_id} not found")
         
         return redirect("/")
     except Exception as e:
-        logging.error(f"Error archiving agreement: {e}")
+        logging.error(f"Error archiving agreement {agreement_id}: {e}")
+        flash(f"Could not archive the agreement: {e}", "error")
         return redirect("/")
 
 @app.route("/archive")
 @login_required
 def archive():
-    """Display archived agreements."""
-    archived_agreements = load_archived_agreements()
-    # Sort by archived timestamp (most recent first)
-    archived_agreements.sort(key=lambda x: x.get("archived_timestamp", ""), reverse=True)
-    return render_template("archive.html", agreements=archived_agreements)
+    """Display archived agreements, most recently archived first."""
+    try:
+        agreements, next_cursor = archive_store.page(request.args.get("cursor"), ARCHIVE_PAGE_SIZE)
+    except ValueError as e:
+        logging.warning(f"Bad archive cursor: {e}")
+        return redirect("/archive")
+    return render_template(
+        "archive.html",
+        agreements=agreements,
+        next_cursor=next_cursor,
+        is_first_page=not request.args.get("cursor"),
+        total_archived=archive_store.count()
+    )
 
 @app.route("/restore_agreement/<agreement_id>", methods=["POST"])
 @login_required
@@ -1056,29 +1377,27 @@ def archive():
 def restore_agreement(agreement_id):
     """Restore an archived agreement back to active status."""
     try:
-        archived_agreements = load_archived_agreements()
-        active_agreements = load_agreements()
-        
-        # Find the agreement to restore
-        agreement_to_restore = None
-        for agreement in archived_agreements:
-            if agreement.get("id") == agreement_id:
-                agreement_to_restore = agreement
-                break
+        # Remove from archived agreements; only one concurrent request can win
+        agreement_to_restore = archive_store.pop(agreement_id)
         
         if agreement_to_restore:
+            archived = dict(agreement_to_restore)
             # Remove archived timestamp and add restore timestamp
             if "archived_timestamp" in agreement_to_restore:
                 del agreement_to_restore["archived_timestamp"]
             agreement_to_restore["restored_timestamp"] = datetime.now().isoformat()
             
             # Add back to active agreements
-            active_agreements.append(agreement_to_restore)
-            save_agreements(active_agreements)
-            
-            # Remove from archived agreements
-            archived_agreements = [a for a in archived_agreements if a.get("id") != agreement_id]
-            save_archived_agreements(archived_agreements)
+            try:
+                if not is_current_schema(agreement_to_restore):
+                    normalize_agreement(agreement_to_restore)
+                agreement_store.insert(agreement_to_restore)
+            except Exception:
+                # Put it back, so a failed insert doesn't lose the agreement
+                archive_store.insert(archived)
+                raise
+            agreements_cache.invalidate()
+            search_index.set_status(agreement_id, "active")
             
             logging.debug(f"Restored agreement with ID: {agreement_id}")
         else:
@@ -1086,7 +1405,8 @@ def restore_agreement(agreement_id):
         
         return redirect("/archive")
     except Exception as e:
-        logging.error(f"Error restoring agreement: {e}")
+        logging.error(f"Error restoring agreement {agreement_id}: {e}")
+        flash(f"Could not restore the agreement: {e}", "error")
         return redirect("/archive")
 
 @app.route("/gmail_settings")
@@ -1106,7 +1426,6 @@ def add_gmail():
         gmail_address = request.form.get("gmail_address", "").strip()
         
         # Basic email validation
-        import re
         email_pattern = r'^[a-zA-Z0-9._%+-]+@gmail\.com$'
         if not gmail_address:
             logging.warning("Empty Gmail address provided")
@@ -1116,24 +1435,26 @@ def add_gmail():
             logging.warning(f"Invalid Gmail address format: {gmail_address}")
             return redirect("/gmail_settings")
         
-        # Load current settings
-        settings = load_settings()
-        tenant_gmail_pairs = settings.get("tenant_gmail_pairs", [])
+        # Hold the settings lock so concurrent edits are not lost
+        with file_lock(SETTINGS_FILE):
+            # Load current settings
+            settings = load_settings()
+            tenant_gmail_pairs = settings.get("tenant_gmail_pairs", [])
         
-        # Check if email already exists
-        existing_gmail = any(pair.get("gmail_address") == gmail_address for pair in tenant_gmail_pairs)
-        if existing_gmail:
-            logging.warning(f"Gmail address already exists: {gmail_address}")
-            return redirect("/gmail_settings")
+            # Check if email already exists
+            existing_gmail = any(pair.get("gmail_address") == gmail_address for pair in tenant_gmail_pairs)
+            if existing_gmail:
+                logging.warning(f"Gmail address already exists: {gmail_address}")
+                return redirect("/gmail_settings")
         
-        # Add new tenant-Gmail pair
-        new_pair = {
-            "tenant_name": tenant_name,
-            "gmail_address": gmail_address
-        }
-        tenant_gmail_pairs.append(new_pair)
-        settings["tenant_gmail_pairs"] = tenant_gmail_pairs
-        save_settings(settings)
+            # Add new tenant-Gmail pair
+            new_pair = {
+                "tenant_name": tenant_name,
+                "gmail_address": gmail_address
+            }
+            tenant_gmail_pairs.append(new_pair)
+            settings["tenant_gmail_pairs"] = tenant_gmail_pairs
+            save_settings(settings)
         
         logging.debug(f"Added tenant-Gmail pair: {tenant_name} - {gmail_address}")
         return redirect("/gmail_settings")
@@ -1153,19 +1474,21 @@ def remove_gmail():
             logging.warning("Empty Gmail address provided for removal")
             return redirect("/gmail_settings")
         
-        # Load current settings
-        settings = load_settings()
-        tenant_gmail_pairs = settings.get("tenant_gmail_pairs", [])
+        # Hold the settings lock so concurrent edits are not lost
+        with file_lock(SETTINGS_FILE):
+            # Load current settings
+            settings = load_settings()
+            tenant_gmail_pairs = settings.get("tenant_gmail_pairs", [])
         
-        # Remove Gmail pair if it exists
-        updated_pairs = [pair for pair in tenant_gmail_pairs if pair.get("gmail_address") != gmail_address]
+            # Remove Gmail pair if it exists
+            updated_pairs = [pair for pair in tenant_gmail_pairs if pair.get("gmail_address") != gmail_address]
         
-        if len(updated_pairs) < len(tenant_gmail_pairs):
-            settings["tenant_gmail_pairs"] = updated_pairs
-            save_settings(settings)
-            logging.debug(f"Removed Gmail address: {gmail_address}")
-        else:
-            logging.warning(f"Gmail address not found for removal: {gmail_address}")
+            if len(updated_pairs) < len(tenant_gmail_pairs):
+                settings["tenant_gmail_pairs"] = updated_pairs
+                save_settings(settings)
+                logging.debug(f"Removed Gmail address: {gmail_address}")
+            else:
+                logging.warning(f"Gmail address not found for removal: {gmail_address}")
         
         return redirect("/gmail_settings")
     except Exception as e:
@@ -1178,32 +1501,35 @@ def remove_gmail():
 def send_email_alerts():
     """Send email alerts to tenants with expiry warnings."""
     try:
-        # Load agreements and settings
-        agreements = load_agreements()
+        # Load settings and today's alert buckets
+        alerts = alerts_cache.get()
         settings = load_settings()
         tenant_gmail_pairs = settings.get("tenant_gmail_pairs", [])
         
         if not tenant_gmail_pairs:
             flash("No tenant Gmail addresses found. Please add tenant Gmail addresses first.", "warning")
             return redirect("/")
+        tenant_index = tenant_email_index.get()
         
         sent_count = 0
         failed_count = 0
         no_email_count = 0
+        # Tenants whose name only resembles a saved Gmail entry; they are not emailed
+        unconfirmed = []
         
-        # Process each agreement
-        for agreement in agreements:
-            # Update alert status
-            alert_status = calculate_alert_status(agreement.get("agreement_expiry_date", ""))
-            agreement["alert_status"] = alert_status
-            
-            # Only send emails for agreements with alerts
-            if alert_status in ['three_months', 'two_months', 'one_month', 'expired']:
+        # Only agreements in an alert bucket are loaded and processed
+        for alert_status in ALERT_STATUSES:
+            for agreement_id in alerts.buckets[alert_status]:
+                agreement = agreement_store.get(agreement_id)
+                if not agreement:
+                    continue
+                agreement["alert_status"] = alert_status
+                
                 tenant_name = agreement.get("tenant_name", "")
                 
                 if tenant_name:
                     # Find Gmail address for this tenant
-                    gmail_address = find_tenant_gmail(tenant_name, tenant_gmail_pairs)
+                    gmail_address = find_tenant_gmail(tenant_name, tenant_index)
                     
                     if gmail_address:
                         # Create and send email
@@ -1218,7 +1544,12 @@ def send_email_alerts():
                             logging.error(f"Failed to send email to {tenant_name} ({gmail_address}): {error_msg}")
                     else:
                         no_email_count += 1
-                        logging.warning(f"No Gmail address found for tenant: {tenant_name}")
+                        suggestion = suggest_tenant_gmail(tenant_name, tenant_index)
+                        if suggestion:
+                            unconfirmed.append(f"{tenant_name} (similar to {suggestion[0]})")
+                            logging.warning(f"No exact Gmail entry for tenant {tenant_name!r}; similar entry {suggestion[0]!r} (score {suggestion[1]}) needs confirming")
+                        else:
+                            logging.warning(f"No Gmail address found for tenant: {tenant_name}")
                 else:
                     logging.warning(f"No tenant name found for agreement: {agreement.get('id', 'Unknown')}")
         
@@ -1229,6 +1560,12 @@ def send_email_alerts():
             flash(f"Failed to send {failed_count} email(s). Check logs for details.", "error")
         if no_email_count > 0:
             flash(f"{no_email_count} tenant(s) have alerts but no matching Gmail address found.", "warning")
+        if unconfirmed:
+            flash(
+                f"Not emailed, names only similar to a saved Gmail entry: {'; '.join(unconfirmed)}. "
+                "Add the tenant name exactly as in the agreement to Gmail settings to send to them.",
+                "warning",
+            )
         if sent_count == 0 and failed_count == 0 and no_email_count == 0:
             flash("No tenants currently have agreement expiry alerts requiring notifications.", "info")
         
@@ -1298,43 +1635,7 @@ def download_csv():
     """Download tenant agreements data as CSV file."""
     try:
         # Load agreements and update alert statuses
-        agreements = load_agreements()
-        
-        # Update alert status and normalize values for all agreements
-        for agreement in agreements:
-            agreement["alert_status"] = calculate_alert_status(agreement.get("agreement_expiry_date", ""))
-            
-            # Handle legacy data - convert place_occupied to new fields if needed
-            if "place_occupied" in agreement and not agreement.get("area_sqft"):
-                place = agreement.get("place_occupied", "")
-                agreement["area_sqft"] = normalize_area_sqft(place)
-                agreement["floor"] = normalize_floor(place)
-                agreement["building"] = normalize_building(place)
-            
-            # Normalize fields for existing data
-            agreement["area_sqft"] = normalize_area_sqft(agreement.get("area_sqft", ""))
-            agreement["floor"] = normalize_floor(agreement.get("floor", ""))
-            agreement["building"] = normalize_building(agreement.get("building", ""))
-            agreement["period_of_rent"] = normalize_period_of_rent(agreement.get("period_of_rent", ""))
-            agreement["rent_amount"] = normalize_rent_amount(agreement.get("rent_amount", ""))
-            agreement["maintenance"] = normalize_maintenance_amount(agreement.get("maintenance", ""))
-            agreement["rent_escalation"] = normalize_rent_escalation(agreement.get("rent_escalation", ""))
-            agreement["lock_in_period"] = normalize_period_of_rent(agreement.get("lock_in_period", ""))
-            
-            # Normalize rental_period_greater_than_lock_in_period
-            rental_period_value = agreement.get("rental_period_greater_than_lock_in_period", "")
-            if isinstance(rental_period_value, bool):
-                agreement["rental_period_greater_than_lock_in_period"] = "True" if rental_period_value else "False"
-            elif isinstance(rental_period_value, str):
-                rental_period_value = rental_period_value.strip()
-                if rental_period_value.lower() in ["yes", "true", "1"]:
-                    agreement["rental_period_greater_than_lock_in_period"] = "True"
-                elif rental_period_value.lower() in ["no", "false", "0"]:
-                    agreement["rental_period_greater_than_lock_in_period"] = "False"
-                else:
-                    agreement["rental_period_greater_than_lock_in_period"] = "False"
-            else:
-                agreement["rental_period_greater_than_lock_in_period"] = "False"
+        agreements = prepare_for_display(load_agreements())
         
         # Create CSV data
         output = io.StringIO()
@@ -1403,6 +1704,144 @@ def download_csv():
         logging.error(f"Error generating CSV: {e}")
         return redirect("/")
 
+@app.route("/cache_stats")
+@login_required
+def cache_stats():
+    """Report per-worker cache hit/miss counters, the shared extraction cache and the OCR artifact and search stores."""
+    return jsonify(
+        worker_pid=os.getpid(),
+        caches=cache.stats(),
+        extraction_cache=extraction_cache.stats(),
+        ocr_artifacts=ocr_artifacts.stats(),
+        search_index=search_index.stats(),
+    )
+
+@app.cli.command("migrate")
+def migrate_command():
+    """Normalize stored agreements to the current schema version."""
+    for name, store in [("active", agreement_store), ("archived", archive_store)]:
+        migrated, total = migrate_store(store)
+        print(f"Migrated {migrated} of {total} {name} agreements to schema version {SCHEMA_VERSION}")
+
+@app.cli.command("reindex")
+def reindex_command():
+    """Rebuild the full-text search index from the stored OCR artifacts."""
+    search_index.clear()
+    indexed = missing = 0
+    for status, store in (("active", agreement_store), ("archived", archive_store)):
+        agreements = []
+        for agreement in store.all():
+            if ocr_artifacts.get(agreement["id"], words=False) is None:
+                missing += 1
+                continue
+            agreements.append(agreement)
+        search_index.add_many(agreements, status)
+        indexed += len(agreements)
+    print(f"Indexed {indexed} agreements; {missing} have no OCR artifacts and are not searchable")
+    if missing:
+        print(f"flask --app app reextract stores them for agreements it can match to a PDF in {UPLOAD_FOLDER}/; "
+              "older agreements without a source_file and without a unique tenant name can't be matched")
+
+@app.cli.command("reextract")
+@click.option("--workers", default=BULK_OCR_CONCURRENCY, show_default=True, help="PDFs OCRed at the same time.")
+@click.option("--batch-size", default=20, show_default=True, help="PDFs per checkpoint.")
+@click.option("--checkpoint", default=REEXTRACT_CHECKPOINT, show_default=True, help="Progress file for resuming.")
+@click.option("--apply", "apply_updates", is_flag=True, help="Write changed fields to the stored agreements.")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint.")
+def reextract_command(workers, batch_size, checkpoint, apply_updates, restart):
+    """Re-run extraction over uploads/ and diff the results against stored agreements."""
+    ocr_settings = ocr_settings_key()
+    settings = {"prompt_version": PROMPT_VERSION, "schema_version": SCHEMA_VERSION, "ocr": ocr_settings}
+    progress = Checkpoint(checkpoint, settings, restart)
+    filenames = list_uploads(UPLOAD_FOLDER)
+    pending = progress.pending(filenames)
+    print(f"{len(filenames) - len(pending)} of {len(filenames)} uploads already re-extracted, {len(pending)} to go")
+    
+    stores = {"active": agreement_store, "archived": archive_store}
+    matchers = [(name, AgreementMatcher(store.all())) for name, store in stores.items()]
+    # Uploads whose agreement has OCR artifacts from the current settings skip
+    # OCR; legacy agreements are only matched once the upload's fields are known
+    uploaded = {filename: agreement for _, matcher in reversed(matchers) for filename, agreement in matcher.by_source.items()}
+    reused = backfilled = 0
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        known_pages = {}
+        for filename in batch:
+            pages = ocr_artifacts.pages(uploaded[filename]["id"], ocr_settings) if filename in uploaded else None
+            if pages is not None:
+                known_pages[os.path.join(UPLOAD_FOLDER, filename)] = pages
+        reused += len(known_pages)
+        results = asyncio.run(pipeline_bulk_upload(
+            [os.path.join(UPLOAD_FOLDER, name) for name in batch], workers, known_pages))
+        missing = {}
+        for filename, result in zip(batch, results):
+            if isinstance(result, Exception):
+                logging.error(f"Re-extraction of {filename} failed: {result}")
+                progress.record(filename, {"status": "failed", "error": str(result)})
+                continue
+            pages, fields = result
+            progress.record(filename, {"status": "done", "fields": fields})
+            # Artifacts describe the PDF, not the extracted fields, so they are kept even without --apply
+            if os.path.join(UPLOAD_FOLDER, filename) in known_pages:
+                continue
+            status, agreement, how = match_upload(matchers, filename, fields)
+            if agreement is None or agreement["id"] in missing:
+                continue
+            # A tenant-name match never replaces artifacts another upload already stored
+            if how == "tenant_name" and ocr_artifacts.pages(agreement["id"], ocr_settings) is not None:
+                continue
+            missing[agreement["id"]] = (pages, agreement, status)
+        if missing:
+            ocr_artifacts.put_many({agreement_id: pages for agreement_id, (pages, _, _) in missing.items()}, ocr_settings)
+            for _, agreement, status in missing.values():
+                search_index.add(agreement, status)
+            backfilled += len(missing)
+        progress.save()
+        print(f"Re-extracted {start + len(batch)} of {len(pending)} ({reused} from stored OCR artifacts)")
+    if backfilled:
+        print(f"Stored OCR artifacts for {backfilled} agreements")
+    
+    # Diff against both collections; each agreement is claimed by one upload at most
+    updates = {name: [] for name in stores}
+    claimed = set()
+    unmatched = failed = unchanged = 0
+    for filename in filenames:
+        entry = progress.files.get(filename)
+        if entry is None or entry["status"] != "done":
+            failed += 1
+            continue
+        name, agreement, how = match_upload(matchers, filename, entry["fields"])
+        if agreement is None or agreement["id"] in claimed:
+            unmatched += 1
+            continue
+        claimed.add(agreement["id"])
+        changes = diff_fields(agreement, entry["fields"], EXTRACTED_FIELDS)
+        if not changes:
+            unchanged += 1
+            continue
+        print(f"{filename} -> {name} agreement {agreement['id']} (matched by {how}):")
+        for field, (old, new) in changes.items():
+            print(f"    {field}: {old!r} -> {new!r}")
+        updated = without_derived_fields(dict(agreement, **entry["fields"]))
+        updated["source_file"] = filename
+        updated["reextracted_timestamp"] = datetime.now().isoformat()
+        updates[name].append(updated)
+    
+    changed = sum(len(records) for records in updates.values())
+    print(f"{changed} changed, {unchanged} unchanged, {unmatched} unmatched, {failed} failed")
+    if not apply_updates:
+        if changed:
+            print("Run again with --apply to store the changes.")
+        return
+    # One batched write per collection
+    for name, store in stores.items():
+        if updates[name]:
+            store.update_many(updates[name])
+            search_index.update_tenant_names(updates[name])
+    agreements_cache.invalidate()
+    progress.remove()
+    print(f"Updated {changed} agreements")
+
 # Error handlers for production
 @app.errorhandler(404)
 def not_found_error(error):
@@ -1419,7 +1858,12 @@ def internal_error(error):
 
 @app.errorhandler(413)
 def too_large(error):
-    flash("File too large. Maximum file size is 16MB.", "error")
+    # Bulk uploads raise the limit for their own request
+    limit = request.max_content_length or app.config['MAX_CONTENT_LENGTH']
+    message = f"Upload too large. Maximum upload size is {limit // (1024 * 1024)}MB."
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(error=message), 413
+    flash(message, "error")
     return redirect(url_for('dashboard'))
 
 @app.errorhandler(429)
@@ -1438,4 +1882,13 @@ if __name__ == "__main__":
     debug_mode = os.getenv('FLASK_ENV') != 'production'
     port = int(os.environ.get('PORT', 5000))
     
+    # The development server processes uploads in a background thread;
+    # under gunicorn, gunicorn.conf.py starts the job threads
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not debug_mode:
+        import threading
+        from jobs import run_worker
+        threading.Thread(
+            target=run_worker, args=(job_queue, JOB_HANDLERS, "dev-server"), daemon=True
+        ).start()
+    
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
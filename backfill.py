@@ -0,0 +1,94 @@
+"""
+Re-extraction of stored uploads (flask --app app reextract).
+
+After a prompt or normalizer change, the PDFs in uploads/ are run through
+the extraction pipeline again. Results are checkpointed to a JSON file after
+every batch, so an interrupted run picks up where it stopped; the checkpoint
+records the prompt, schema and OCR settings and is discarded when they no
+longer match.
+
+Each upload is matched to the agreement it produced by the agreement's
+source_file. Agreements stored before source_file was recorded are matched by
+tenant name when exactly one such agreement has that name; those that do not
+match any upload (their PDF is gone, or another legacy agreement has the same
+tenant name) can't be re-extracted and get no OCR artifacts.
+"""
+
+import os
+
+from storage import atomic_write_json, read_json_file
+
+class Checkpoint:
+    """Per-file results of a re-extraction run, saved after every batch."""
+
+    def __init__(self, path, settings, restart=False):
+        self.path = path
+        self.settings = settings
+        data = {} if restart else read_json_file(path, {})
+        # Results from another prompt, schema or OCR setup are stale
+        self.files = data.get("files", {}) if data.get("settings") == settings else {}
+
+    def pending(self, filenames):
+        """Files without a successful result yet (failed files are retried)."""
+        return [name for name in filenames if self.files.get(name, {}).get("status") != "done"]
+
+    def record(self, filename, result):
+        self.files[filename] = result
+
+    def save(self):
+        atomic_write_json(self.path, {"settings": self.settings, "files": self.files})
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def list_uploads(directory):
+    """PDF file names in the upload directory, sorted."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.lower().endswith(".pdf"))
+
+def _tenant_key(agreement):
+    return (agreement.get("tenant_name") or "").strip().lower()
+
+class AgreementMatcher:
+    """Finds the stored agreement an upload produced."""
+
+    def __init__(self, agreements):
+        self.by_source = {}
+        by_tenant = {}
+        for agreement in agreements:
+            if agreement.get("source_file"):
+                self.by_source[agreement["source_file"]] = agreement
+            elif _tenant_key(agreement):
+                by_tenant.setdefault(_tenant_key(agreement), []).append(agreement)
+        # Only unambiguous legacy matches are used
+        self.by_tenant = {key: matches[0] for key, matches in by_tenant.items() if len(matches) == 1}
+
+    def match(self, filename, fields):
+        """(agreement, how) for an upload and its new fields, or (None, None)."""
+        if filename in self.by_source:
+            return self.by_source[filename], "source_file"
+        agreement = self.by_tenant.get(_tenant_key(fields))
+        if agreement is not None:
+            return agreement, "tenant_name"
+        return None, None
+
+def match_upload(matchers, filename, fields):
+    """(status, agreement, how) from the first of `matchers` that matches, or (None, None, None).
+
+    `matchers` is a list of (status, AgreementMatcher) pairs, searched in order.
+    """
+    for status, matcher in matchers:
+        agreement, how = matcher.match(filename, fields)
+        if agreement is not None:
+            return status, agreement, how
+    return None, None, None
+
+def diff_fields(old, new, fields):
+    """{field: [old value, new value]} for the fields whose values differ."""
+    return {
+        field: [old.get(field, ""), new.get(field, "")]
+        for field in fields
+        if (old.get(field) or "") != (new.get(field) or "")
+    }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingest benchmark with a local model stand-in.
+
+Runs app.process_upload() -- extract_pages_from_pdf, local extraction, the
+GPT-4o request, normalization and the store insert -- over every PDF in
+--pdf-dir plus --synthetic generated leases (typeset lease text rendered to
+scanned-style pages). GPT-4o is replaced by benchmarks/model_stub.py on a
+local port with --latency seconds per completion, so no API key or network
+access is needed; tesseract and poppler are.
+
+The app runs in a temporary directory with its own databases, and the
+extraction cache is cleared before every document unless --cache is given.
+Prints JSON with p50/p95 latency per stage and per document, pages per
+second, and peak RSS of this process and of the largest child process
+(OCR workers, poppler).
+
+Usage:
+    python benchmarks/bench_ingest.py [--pdf-dir PDFs] [--synthetic 5] [--pages 4] [--latency 0.5]
+                                      [--error-rate 0] [--repeat 1] [--cache]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+import functools
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from PIL import Image, ImageDraw, ImageFont
+
+from bench_memory import peak_rss_mb
+from eval_passages import synthetic_lease
+from model_stub import start_stub
+
+STAGES = ["ocr", "local_extraction", "model", "normalize", "save"]
+LINES_PER_PAGE = 50
+
+def make_lease_pdf(path, pages, seed, degrade=None):
+    """A scanned-style PDF of a generated lease, about `pages` pages at 150 DPI.
+
+    `degrade(image, rng)` can return a worse copy of each rendered page.
+    Returns the expected local-extraction values.
+    """
+    rng = random.Random(seed)
+    text, truth = synthetic_lease(rng, clauses=pages * LINES_PER_PAGE * 2 // 3)
+    lines = text.splitlines()
+    font = ImageFont.load_default(size=20)
+    images = []
+    for first in range(0, len(lines), LINES_PER_PAGE):
+        image = Image.new("RGB", (1240, 1754), "white")
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[first:first + LINES_PER_PAGE]):
+            draw.text((90, 90 + row * 30), line, fill="black", font=font)
+        images.append(degrade(image, rng) if degrade else image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=150)
+    return truth
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.50), 4),
+        "p95": round(percentile(values, 0.95), 4),
+        "total": round(sum(values), 3),
+    }
+
+def instrument(app, record):
+    """Wrap each stage of app.process_upload() to add its time to `record`."""
+    def timed(stage, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record[stage] = record.get(stage, 0) + time.perf_counter() - started
+        return wrapper
+
+    app.extract_pages_from_pdf = timed("ocr", app.extract_pages_from_pdf)
+    app.extract_fields_locally = timed("local_extraction", app.extract_fields_locally)
+    app.request_fields_from_gpt4o = timed("model", app.request_fields_from_gpt4o)
+    app.normalize_agreement = timed("normalize", app.normalize_agreement)
+    app.agreement_store.insert = timed("save", app.agreement_store.insert)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="PDFs")
+    parser.add_argument("--synthetic", type=int, default=5, help="number of generated lease PDFs")
+    parser.add_argument("--pages", type=int, default=4, help="pages per generated lease")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- stub seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub replies that are 429/500")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--cache", action="store_true", help="keep the extraction cache between documents")
+    args = parser.parse_args()
+
+    pdf_dir = os.path.abspath(args.pdf_dir)
+    server, url = start_stub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    os.chdir(workdir)
+    os.environ.update(OPENAI_BASE_URL=url, OPENAI_API_KEY="stub", AGREEMENT_STORE="sqlite")
+
+    pdfs = sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf")) \
+        if os.path.isdir(pdf_dir) else []
+    for number in range(args.synthetic):
+        path = os.path.join(workdir, f"synthetic_{number + 1:03d}.pdf")
+        make_lease_pdf(path, args.pages, seed=number)
+        pdfs.append(path)
+    if not pdfs:
+        sys.exit("No PDFs to benchmark")
+
+    import app
+    import ocr
+    record = {}
+    instrument(app, record)
+
+    files = []
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for pdf in pdfs:
+            if not args.cache:
+                app.extraction_cache.clear()
+            record.clear()
+            pages = ocr.page_count(pdf)
+            document_started = time.perf_counter()
+            error = None
+            try:
+                app.process_upload(pdf)
+            except Exception as e:
+                error = str(e)
+            files.append(dict(
+                {stage: round(seconds, 4) for stage, seconds in record.items()},
+                file=os.path.basename(pdf),
+                pages=pages,
+                total=round(time.perf_counter() - document_started, 4),
+                error=error,
+            ))
+    wall = time.perf_counter() - started
+    ocr.shutdown_pool()
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    pages = sum(f["pages"] for f in files)
+    children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({
+        "benchmark": "ingest",
+        "documents": len(files),
+        "pages": pages,
+        "errors": sum(f["error"] is not None for f in files),
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "cache": args.cache,
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(pages / wall, 2),
+        "documents_per_second": round(len(files) / wall, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "children_peak_rss_mb": round(children_peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "model_requests": server.requests,
+        "stages": {stage: summarize([f[stage] for f in files if stage in f]) for stage in STAGES},
+        "document": summarize([f["total"] for f in files]),
+        "files": files,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Peak-memory benchmark for PDF rasterization and OCR.
+
+Builds synthetic scanned-style PDFs with a growing number of pages and
+extracts each one in a fresh process, recording that process's peak RSS:
+
+  eager   the old pipeline: convert_from_path() for the whole PDF, then OCR
+  stream  ocr.extract_text(): windowed rasterization to a temp dir
+
+With streaming, peak RSS should stay flat as the page count grows; eager
+grows with roughly one full-resolution page image per page. Needs poppler
+(and tesseract unless --no-ocr is given).
+
+Usage:
+    python benchmarks/bench_memory.py [--pages 5 20 60] [--modes eager stream] [--no-ocr]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+def make_pdf(path, pages, seed=0):
+    """A PDF of A4 pages at 100 DPI with some lines of text-like noise."""
+    rng = random.Random(seed)
+    images = []
+    for number in range(pages):
+        image = Image.new("RGB", (827, 1169), "white")
+        draw = ImageDraw.Draw(image)
+        draw.text((60, 40), f"RENTAL AGREEMENT - PAGE {number + 1}", fill="black")
+        for line in range(40):
+            words = " ".join("".join(rng.choice("abcdefghijklmnop") for _ in range(rng.randint(2, 9))) for _ in range(10))
+            draw.text((60, 80 + line * 26), words, fill="black")
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=100)
+
+def peak_rss_mb():
+    # Linux keeps ru_maxrss across fork/exec, so it would include the parent
+    # that built the PDFs; VmHWM belongs to this process image only
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run_child(mode, pdf_path, ocr_enabled):
+    """Extract one PDF in this process and print its peak RSS as JSON."""
+    import ocr
+    from pdf2image import convert_from_path
+
+    pages = 0
+    if mode == "eager":
+        images = convert_from_path(pdf_path, dpi=ocr.OCR_DPI)
+        pages = len(images)
+        if ocr_enabled:
+            # Every page image is held in memory while the pool OCRs them
+            list(ocr.get_pool().map(ocr.ocr_page, images))
+    elif ocr_enabled:
+        timings = {}
+        ocr.extract_text(pdf_path, timings=timings)
+        pages = timings["pages"]
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            for paths in ocr.iter_page_windows(pdf_path, directory):
+                # Load each page the way tesseract would, then drop it
+                for path in paths:
+                    with Image.open(path) as image:
+                        image.load()
+                    os.remove(path)
+                pages += len(paths)
+    ocr.shutdown_pool()
+    print(json.dumps({"pages": pages, "peak_rss_mb": peak_rss_mb()}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--modes", nargs="+", choices=["eager", "stream"], default=["eager", "stream"])
+    parser.add_argument("--no-ocr", action="store_true", help="only rasterize (no tesseract needed)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], not args.no_ocr)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            pdf_path = os.path.join(directory, f"synthetic_{pages}.pdf")
+            make_pdf(pdf_path, pages)
+            for mode in args.modes:
+                command = [sys.executable, os.path.abspath(__file__), "--child", mode, pdf_path]
+                if args.no_ocr:
+                    command.append("--no-ocr")
+                output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                results.append({"mode": mode, "pages": pages, "peak_rss_mb": result["peak_rss_mb"]})
+
+    print(json.dumps({"benchmark": "memory", "ocr": not args.no_ocr, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
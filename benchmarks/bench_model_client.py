@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Extraction request throughput: blocking calls vs model_client.AsyncModelClient.
+
+Starts benchmarks/model_stub.py in-process and sends --requests extraction
+prompts, first one at a time through the blocking openai client (what an
+upload does today), then through AsyncModelClient at each --concurrency.
+With --error-rate some requests fail with 429/500 and are retried. Prints
+requests per second, retries and failures as JSON. No API key or network
+access is needed.
+
+Usage:
+    python benchmarks/bench_model_client.py [--requests 40] [--latency 0.5] [--concurrency 1 4 8 16]
+                                            [--rate 0] [--error-rate 0]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+
+from model_client import AsyncModelClient
+from model_stub import start_stub
+
+PROMPT = ('Extract the following details from this rental agreement and return them as a single JSON object '
+          'with these keys: "area_sqft", "floor", "building". If a value is not found, use an empty string. '
+          'Only return the JSON object, nothing else.\n\n'
+          'The Licensor is the owner of office premises on the first floor of JP Classic, Baner, Pune.')
+MESSAGES = [
+    {"role": "system", "content": "You are an OCR and information extraction assistant."},
+    {"role": "user", "content": PROMPT},
+]
+
+def run_blocking(url, requests):
+    client = openai.OpenAI(api_key="stub", base_url=url)
+    started = time.perf_counter()
+    failures = 0
+    for _ in range(requests):
+        try:
+            client.chat.completions.create(model="gpt-4o", messages=MESSAGES, max_tokens=1024)
+        except openai.OpenAIError:
+            failures += 1
+    elapsed = time.perf_counter() - started
+    client.close()
+    return {"mode": "blocking", "concurrency": 1, "seconds": round(elapsed, 3),
+            "requests_per_second": round(requests / elapsed, 2), "retries": None, "failures": failures}
+
+async def run_async(url, requests, concurrency, rate):
+    async with AsyncModelClient(concurrency=concurrency, rate=rate, burst=concurrency,
+                                base_url=url, api_key="stub") as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(client.chat(MESSAGES) for _ in range(requests)), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+    return {"mode": "async", "concurrency": concurrency, "seconds": round(elapsed, 3),
+            "requests_per_second": round(requests / elapsed, 2), "retries": client.stats["retries"],
+            "failures": sum(isinstance(result, Exception) for result in results)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds per completion")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rate", type=float, default=0, help="client requests per second (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub replies that are 429/500")
+    args = parser.parse_args()
+
+    server, url = start_stub(latency=args.latency, error_rate=args.error_rate, retry_after=0.1)
+    results = [run_blocking(url, args.requests)]
+    for concurrency in args.concurrency:
+        results.append(asyncio.run(run_async(url, args.requests, concurrency, args.rate)))
+    server.shutdown()
+
+    print(json.dumps({
+        "benchmark": "model_client",
+        "requests": args.requests,
+        "latency": args.latency,
+        "rate": args.rate,
+        "error_rate": args.error_rate,
+        "stub_requests": server.requests,
+        "stub_rejected": server.rejected,
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the batched normalization engine.
+
+Generates synthetic agreements with the kind of raw values GPT-4o returns
+("Rs. 90.50 per square foot per month", "3 years", "G.F" ...) and reports the
+per-record cost of normalize_agreements() at several batch sizes.
+
+Usage:
+    python benchmarks/bench_normalization.py [--sizes 10000 100000] [--repeat 3]
+"""
+
+import os
+import sys
+import copy
+import json
+import random
+import argparse
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalization import normalize_agreements
+
+RAW_VALUES = {
+    "area_sqft": ["ad measuring 3200 sqft", "1500 square feet", "8005", "10700 sq. ft."],
+    "floor": ["Ground Floor", "G.F", "first floor", "2nd", "f3", "Fourth Floor", "Terrace"],
+    "building": ["1st Floor of JP Classic", "JP-Classic", "Silver Software", "Silver-Software Park", "Unknown Tower"],
+    "period_of_rent": ["3 years", "24 months", "36", "4 quarters", "11 Months"],
+    "rent_amount": ["Rs 72 per sqft per month", "Rs. 90.50 per square foot per month", "78"],
+    "maintenance": ["Rs.11 per square foot per month + Rs. 2 per square foot per month for canteen", "Rs 10 per sqft", "14"],
+    "rent_escalation": ["7%", "5% annually", "4.5 % every year", ""],
+    "lock_in_period": ["24 months", "3 years", "6", ""],
+    "rental_period_greater_than_lock_in_period": ["Yes", "no", "True", "false", True, False, ""],
+}
+
+def make_batch(size, seed=0):
+    rng = random.Random(seed)
+    return [{field: rng.choice(values) for field, values in RAW_VALUES.items()} for _ in range(size)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        template = make_batch(size)
+        timings = []
+        for _ in range(args.repeat):
+            batch = copy.deepcopy(template)
+            start = time.perf_counter()
+            normalize_agreements(batch)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.append({
+            "records": size,
+            "best_seconds": round(best, 4),
+            "us_per_record": round(best / size * 1e6, 2),
+            "records_per_second": int(size / best),
+        })
+
+    print(json.dumps({"benchmark": "normalization", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+OCR throughput benchmark for the sample leases.
+
+Runs ocr.extract_text() over every PDF in PDFs/ with each OCR engine and
+worker count and reports the text-layer/rasterize/OCR timing breakdown,
+pages per second and the speedup over the first engine with a single
+worker. Pass --no-text-layer to OCR every page even for born-digital PDFs
+(needed to compare engines on them). Needs tesseract and poppler installed,
+and the tesserocr package for --engines tesserocr; an engine that cannot be
+loaded is reported with its error.
+
+Usage:
+    python benchmarks/bench_ocr.py [--pdf-dir PDFs] [--engines pytesseract tesserocr] [--workers 1 2 4]
+                                   [--thread-limit 1] [--no-text-layer]
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="PDFs")
+    parser.add_argument("--engines", nargs="+", choices=list(ocr.OCR_ENGINES), default=[ocr.OCR_ENGINE])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--thread-limit", type=int, default=ocr.OCR_THREAD_LIMIT)
+    parser.add_argument("--no-text-layer", action="store_true", help="OCR every page")
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf")))
+    if not pdfs:
+        sys.exit(f"No PDFs found in {args.pdf_dir}")
+
+    results = []
+    baseline = None
+    for engine in args.engines:
+        try:
+            ocr.get_engine(engine)
+        except Exception as e:
+            results.append({"engine": engine, "error": str(e)})
+            continue
+        for workers in args.workers:
+            per_file = []
+            for pdf in pdfs:
+                timings = {}
+                ocr.extract_text(pdf, workers=workers, thread_limit=args.thread_limit, timings=timings,
+                                 text_layer=not args.no_text_layer, engine=engine)
+                per_file.append(dict(timings, file=os.path.basename(pdf)))
+            ocr.shutdown_pool()
+
+            pages = sum(t["pages"] for t in per_file)
+            ocr_seconds = sum(t["ocr_seconds"] for t in per_file)
+            total_seconds = sum(t["total_seconds"] for t in per_file)
+            baseline = baseline or total_seconds
+            results.append({
+                "engine": engine,
+                "workers": workers,
+                "pages": pages,
+                "text_layer_pages": sum(t["text_layer_pages"] for t in per_file),
+                "rasterize_seconds": round(sum(t["rasterize_seconds"] for t in per_file), 3),
+                "ocr_seconds": round(ocr_seconds, 3),
+                "total_seconds": round(total_seconds, 3),
+                "pages_per_second": round(pages / total_seconds, 2),
+                "speedup": round(baseline / total_seconds, 2),
+                "files": per_file,
+            })
+
+    print(json.dumps({
+        "benchmark": "ocr",
+        "thread_limit": args.thread_limit,
+        "text_layer": not args.no_text_layer,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+OCR preprocessing presets: speed and field accuracy.
+
+OCRs every PDF in --pdf-dir plus --synthetic generated lease scans with
+each preprocessing preset (preprocessing.PRESETS, which also set the
+rasterization DPI). The generated scans are rotated by up to --skew degrees
+and printed on a grey, noisy background, like a phone or copier scan. Every
+page is OCRed (the text layer is ignored).
+
+Field accuracy is the share of local-extraction fields that match the
+expected values: the generated values for synthetic scans, and local
+extraction on the PDF's own text layer for PDFs/ leases that have one.
+Prints JSON with rasterize + OCR seconds, pages per second and accuracy
+per preset. Needs tesseract and poppler installed.
+
+Usage:
+    python benchmarks/bench_preprocessing.py [--pdf-dir PDFs] [--presets none gray fast scan]
+                                             [--synthetic 3] [--pages 2] [--skew 3] [--noise 40]
+"""
+
+import os
+import sys
+import json
+import glob
+import shutil
+import argparse
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import numpy as np
+from PIL import Image
+
+import ocr
+from preprocessing import PRESETS, preset_dpi
+from bench_ingest import make_lease_pdf
+from eval_passages import FIELDS, local_values
+
+def scan_degrader(skew, noise):
+    """Page degrader for make_lease_pdf(): grey background, noise and a random rotation."""
+    def degrade(image, rng):
+        pixels = np.asarray(image.convert("L"), dtype=np.int16)
+        generator = np.random.default_rng(rng.randrange(2 ** 32))
+        # Paper is grey rather than white, with a light-to-dark gradient down the page
+        shade = np.linspace(215, 175, pixels.shape[0], dtype=np.float32)[:, None]
+        pixels = np.where(pixels > 128, shade, pixels + 30)
+        pixels = pixels + generator.normal(0, noise, pixels.shape)
+        page = Image.fromarray(pixels.clip(0, 255).astype(np.uint8))
+        angle = rng.uniform(-skew, skew)
+        return page.rotate(angle, resample=Image.BILINEAR, fillcolor=200).convert("RGB")
+    return degrade
+
+def accuracy(values, truth):
+    fields = [field for field in FIELDS if truth.get(field)]
+    if not fields:
+        return None
+    return round(sum(values[field] == truth[field] for field in fields) / len(fields), 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="PDFs")
+    parser.add_argument("--presets", nargs="+", choices=list(PRESETS), default=list(PRESETS))
+    parser.add_argument("--synthetic", type=int, default=3, help="number of generated lease scans")
+    parser.add_argument("--pages", type=int, default=2, help="pages per generated lease")
+    parser.add_argument("--skew", type=float, default=3.0, help="maximum rotation of generated pages, in degrees")
+    parser.add_argument("--noise", type=float, default=40.0, help="standard deviation of generated page noise")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-preprocessing-")
+    documents = []
+    for pdf in sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf"))):
+        text_layer = ocr.read_text_layer(pdf, ocr.page_count(pdf)) or []
+        truth = local_values("\n".join(text_layer)) if any(ocr.has_usable_text(page) for page in text_layer) else {}
+        documents.append((pdf, truth))
+    degrade = scan_degrader(args.skew, args.noise)
+    for number in range(args.synthetic):
+        path = os.path.join(workdir, f"synthetic_scan_{number + 1:03d}.pdf")
+        documents.append((path, make_lease_pdf(path, args.pages, seed=number, degrade=degrade)))
+    if not documents:
+        sys.exit("No PDFs to benchmark")
+
+    results = []
+    for preset in args.presets:
+        per_file = []
+        for pdf, truth in documents:
+            timings = {}
+            text = ocr.extract_text(pdf, timings=timings, text_layer=False, preprocess=preset)
+            per_file.append({
+                "file": os.path.basename(pdf),
+                "pages": timings["pages"],
+                "rasterize_seconds": timings["rasterize_seconds"],
+                "ocr_seconds": timings["ocr_seconds"],
+                "accuracy": accuracy(local_values(text), truth),
+            })
+        ocr.shutdown_pool()
+
+        pages = sum(f["pages"] for f in per_file)
+        # Rasterization is counted too, since presets change the DPI
+        seconds = sum(f["rasterize_seconds"] + f["ocr_seconds"] for f in per_file)
+        scored = [f["accuracy"] for f in per_file if f["accuracy"] is not None]
+        results.append({
+            "preset": preset,
+            "dpi": preset_dpi(preset, ocr.OCR_DPI),
+            "pages": pages,
+            "ocr_seconds": round(seconds, 3),
+            "pages_per_second": round(pages / seconds, 2) if seconds else None,
+            "accuracy": round(sum(scored) / len(scored), 3) if scored else None,
+            "files": per_file,
+        })
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "benchmark": "preprocessing",
+        "documents": len(documents),
+        "skew": args.skew,
+        "noise": args.noise,
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
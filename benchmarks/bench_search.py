@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark: index build time and query latency.
+
+Stores --agreements generated leases (--pages pages each, a fifth of them
+archived) as OCR artifacts and indexes them in a temporary
+search.SearchIndex, then runs each query in
+QUERIES --repeat times and reports p50/p95 latency per query, result counts
+and the database size (artifacts and index) as JSON. Needs no OCR or network access.
+
+Usage:
+    python benchmarks/bench_search.py [--agreements 2000] [--pages 6] [--repeat 20]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from search import SearchIndex
+from ocr_artifacts import OCRArtifactStore
+from bench_ingest import LINES_PER_PAGE, summarize
+from eval_passages import synthetic_lease
+
+QUERIES = [
+    "canteen",
+    "maintenance charges",
+    '"subject to escalation"',
+    "escalat*",
+    "arbitration conciliation",
+    "lock-in period terminate",
+    "hazardous inflammable material",
+    "nonexistentclause",
+]
+
+def lease_pages(rng, pages):
+    """Pages of a generated lease in the form ocr.extract_pages() returns."""
+    text, truth = synthetic_lease(rng, clauses=pages * LINES_PER_PAGE * 2 // 3)
+    lines = text.splitlines()
+    return truth, [
+        {"page": number + 1, "source": "ocr", "text": "\n".join(lines[first:first + LINES_PER_PAGE])}
+        for number, first in enumerate(range(0, len(lines), LINES_PER_PAGE))
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agreements", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=6, help="pages per generated lease")
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query")
+    parser.add_argument("--limit", type=int, default=20, help="results per query")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-search-")
+    artifacts = OCRArtifactStore(os.path.join(workdir, "ocr_artifacts.db"))
+    index = SearchIndex(artifacts)
+    rng = random.Random(0)
+
+    started = time.perf_counter()
+    pages_indexed = 0
+    for number in range(args.agreements):
+        truth, pages = lease_pages(rng, args.pages)
+        status = "archived" if number % 5 == 4 else "active"
+        agreement = {"id": f"agreement_{number:06d}", "tenant_name": truth["tenant_name"]}
+        # One write of each per agreement, as the upload path does
+        artifacts.put(agreement["id"], pages, "bench")
+        index.add(agreement, status)
+        pages_indexed += len(pages)
+    build_seconds = time.perf_counter() - started
+
+    queries = []
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            query_started = time.perf_counter()
+            results = index.search(query, args.limit)
+            timings.append((time.perf_counter() - query_started) * 1000)
+        queries.append(dict(summarize(timings), query=query, results=len(results)))
+    size_mb = sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir)) / (1024 * 1024)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "benchmark": "search",
+        "agreements": args.agreements,
+        "pages": pages_indexed,
+        "build_seconds": round(build_seconds, 3),
+        "agreements_per_second": round(args.agreements / build_seconds, 1),
+        "database_mb": round(size_mb, 1),
+        "query_ms": queries,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
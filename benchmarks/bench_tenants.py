@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tenant-name lookup: linear exact scan vs tenants.TenantIndex.
+
+Generates --tenants company names for the Gmail settings and looks up
+--lookups names as leases write them: the same name, or one with "M/s."
+in front, a legal suffix, upper case, "&" for "and" or a dropped letter.
+Compares the old linear, case-insensitive exact scan with the index:
+exact lookup of the normalized name (what email alerts send to) and the
+trigram fuzzy match (what alert suggestions and duplicate flags use).
+Prints microseconds per lookup and the share of names matched to the
+right address as JSON.
+
+Usage:
+    python benchmarks/bench_tenants.py [--tenants 2000] [--lookups 2000] [--threshold 0.6]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tenants import TenantIndex
+
+WORDS = ["Mana", "Kias", "Silver", "Orbit", "Zenith", "Lotus", "Apex", "Nimbus", "Vertex", "Harbor", "Cedar",
+         "Quantum", "Sapphire", "Everest", "Pioneer", "Crescent", "Summit", "Horizon", "Falcon", "Meridian"]
+TRADES = ["Infrastructures", "Software", "Technologies", "Consultants", "Logistics", "Pharma", "Solutions",
+          "Engineering", "Foods", "Textiles"]
+SUFFIXES = [" Limited", " Pvt. Ltd.", " Private Limited", " LLP", " Ltd"]
+
+def company(rng):
+    first, second = rng.sample(WORDS, 2)
+    joiner = rng.choice([" and ", " "])
+    return f"{first}{joiner}{second} {rng.choice(TRADES)}"
+
+def lease_variant(rng, name):
+    """The name as a lease might write it."""
+    variant = rng.randrange(6)
+    if variant == 1:
+        return f"M/S. {name.upper()}{rng.choice(SUFFIXES).upper()}"
+    if variant == 2:
+        return f"M/s {name}{rng.choice(SUFFIXES)}"
+    if variant == 3:
+        return name.replace(" and ", " & ")
+    if variant == 4 and len(name) > 8:
+        position = rng.randrange(1, len(name) - 1)
+        return name[:position] + name[position + 1:]
+    if variant == 5:
+        return name.lower()
+    return name
+
+def linear_find(tenant_name, pairs):
+    """The lookup send_email_alerts() used before the index."""
+    for pair in pairs:
+        if pair.get("tenant_name", "").strip().lower() == tenant_name.strip().lower():
+            return pair.get("gmail_address", "")
+    return None
+
+def run(label, lookup, queries):
+    started = time.perf_counter()
+    found = [lookup(name) for name, _ in queries]
+    elapsed = time.perf_counter() - started
+    return {
+        "method": label,
+        "microseconds_per_lookup": round(elapsed / len(queries) * 1e6, 2),
+        "correct": round(sum(address == expected for address, (_, expected) in zip(found, queries)) / len(queries), 3),
+        "wrong": sum(address is not None and address != expected for address, (_, expected) in zip(found, queries)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = {}
+    while len(names) < args.tenants:
+        name = company(rng)
+        names.setdefault(name, f"tenant{len(names)}@example.com")
+    pairs = [{"tenant_name": name, "gmail_address": address} for name, address in names.items()]
+    queries = [(lease_variant(rng, name), names[name]) for name in rng.choices(list(names), k=args.lookups)]
+
+    started = time.perf_counter()
+    index = TenantIndex((pair["tenant_name"], pair["gmail_address"]) for pair in pairs)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        "benchmark": "tenants",
+        "tenants": args.tenants,
+        "lookups": args.lookups,
+        "threshold": args.threshold,
+        "index_build_ms": round(build_ms, 1),
+        "results": [
+            run("linear_exact", lambda name: linear_find(name, pairs), queries),
+            run("index_exact", lambda name: (index.get(name) or [None])[0], queries),
+            run("index_fuzzy", lambda name: index.match(name, args.threshold)[0], queries),
+        ],
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
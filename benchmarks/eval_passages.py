@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of prompt compaction (passages.select_passages).
+
+No model is called. For every lease the full text and the selected passages
+are both run through the local extractor, and the evaluation reports the
+token reduction and how many fields come out the same (and, for synthetic
+leases, correct) from the passages as from the full text. A field that the
+local rules can read from the passages is one the model can read too.
+
+The corpus is the PDFs in --pdf-dir (text via ocr.extract_text, so tesseract
+and poppler are needed; files that cannot be read are listed as skipped)
+plus --synthetic generated leases: the terms of a lease in prose and in a
+schedule, buried in pages of boilerplate clauses.
+
+Usage:
+    python benchmarks/eval_passages.py [--pdf-dir PDFs] [--synthetic 20] [--clauses 120] [--budget 1500]
+"""
+
+import os
+import sys
+import json
+import glob
+import random
+import argparse
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passages import FIELD_KEYWORDS, PROMPT_TOKEN_BUDGET, estimate_tokens, select_passages
+from local_extraction import extract_fields_locally
+
+FIELDS = list(FIELD_KEYWORDS)
+
+BOILERPLATE = [
+    "The Licensor shall be responsible for structural repairs to the building, and the Licensee shall carry out day to day repairs at its own cost.",
+    "The Licensee shall not sublet, assign or otherwise part with possession of the said premises or any portion thereof without prior written consent.",
+    "All notices under this agreement shall be in writing and delivered by hand or registered post at the addresses mentioned above.",
+    "The Licensee shall use the premises only for the purpose of running its office and for no other purpose whatsoever.",
+    "The Licensor shall pay all property taxes, cesses and other outgoings levied by the municipal corporation in respect of the said premises.",
+    "The Licensee shall be liable to pay electricity charges as per the separate meter installed for the premises.",
+    "The Licensee shall keep the premises in a clean and hygienic condition and shall not store any hazardous or inflammable material.",
+    "Any dispute arising out of this agreement shall be referred to arbitration under the Arbitration and Conciliation Act, 1996.",
+    "The courts at Pune alone shall have jurisdiction in all matters arising out of this agreement.",
+    "The Licensee shall allow the Licensor or its authorised representatives to inspect the premises at reasonable times after prior notice.",
+    "The stamp duty and registration charges on this agreement shall be borne equally by both the parties.",
+    "The Licensee shall not make any structural additions or alterations to the premises without the written permission of the Licensor.",
+    "The interest free security deposit shall be refunded to the Licensee on the termination of this agreement after deducting dues, if any.",
+    "The Licensee shall comply with all rules and regulations of the society and the local authorities in force from time to time.",
+    "Nothing contained herein shall be construed as creating any right, title or interest in favour of the Licensee in the said premises.",
+    "The Licensor hereby declares that the premises are free from all encumbrances and that it has full authority to enter into this agreement.",
+    "The Licensee shall obtain and maintain at its cost all licences and permissions required for carrying on its business in the premises.",
+    "In the event of any damage to the premises caused by the Licensee, the cost of repairs shall be recovered from the Licensee.",
+]
+
+TENANTS = ["Acme Traders Pvt Ltd", "Balaji Enterprises", "Orbit Infotech LLP", "Sai Logistics Pvt Ltd", "Nova Consultants"]
+FLOORS = ["Ground Floor", "1st Floor", "2nd Floor", "3rd Floor", "4th Floor"]
+BUILDINGS = ["JP Classic", "Silver Software"]
+
+def synthetic_lease(rng, clauses):
+    """(text, expected local-extraction values) for one generated lease."""
+    start_year = rng.randint(2022, 2025)
+    months = rng.choice([12, 24, 36, 60])
+    lock_in = rng.choice([6, 12, 24])
+    truth = {
+        "tenant_name": rng.choice(TENANTS),
+        "area_sqft": str(rng.randint(8, 60) * 100),
+        "floor": rng.choice(FLOORS),
+        "building": rng.choice(BUILDINGS),
+        "period_of_rent": f"{months} months",
+        "rent_amount": str(rng.randint(40, 110)),
+        "maintenance": str(rng.randint(5, 25)),
+        "rent_escalation": f"{rng.choice([3, 5, 7, 10])}%",
+        "agreement_start_date": f"{start_year}-01-01",
+        "agreement_expiry_date": f"{start_year + months // 12 - 1}-12-31",
+        "lock_in_period": f"{lock_in} months",
+        "lock_in_period_end_date": f"{start_year + (lock_in - 1) // 12}-{(lock_in - 1) % 12 + 1:02d}-28",
+        "next_rent_escalation": f"{start_year + 1}-01-01",
+    }
+    truth["rental_period_greater_than_lock_in_period"] = "True" if months > lock_in else "False"
+    expiry_year = start_year + months // 12 - 1
+    lock_in_end = truth["lock_in_period_end_date"].split("-")
+    terms = [
+        f"This agreement is made between the Licensor and M/s {truth['tenant_name']}, hereinafter called the Licensee.",
+        f"The Licensor is the owner of office premises admeasuring {truth['area_sqft']} sq. ft. on the {truth['floor']} of {truth['building']}, Baner, Pune.",
+        f"The licence is granted for a period of {months} months commencing from the commencement date stated in the schedule.",
+        f"The Licensee shall pay a monthly rent of Rs. {truth['rent_amount']} per sq. ft. per month on or before the fifth day of each month.",
+        f"In addition the Licensee shall pay maintenance charges of Rs. {truth['maintenance']} per sq. ft. per month.",
+        f"The rent shall be subject to escalation of {truth['rent_escalation']} every year on the anniversary of the commencement date.",
+        f"The agreement shall have a lock-in period of {lock_in} months during which neither party may terminate it.",
+    ]
+    schedule = [
+        "SCHEDULE",
+        f"Commencement Date: 1st January {start_year}",
+        f"Expiry Date: 31/12/{expiry_year}",
+        f"Lock-in End Date: {lock_in_end[2]}/{lock_in_end[1]}/{lock_in_end[0]}",
+        f"Next Escalation Date: 01/01/{start_year + 1}",
+    ]
+    body = [rng.choice(BOILERPLATE) for _ in range(clauses)]
+    for term in terms:
+        body.insert(rng.randrange(len(body) + 1), term)
+    lines = []
+    for number, clause in enumerate(body, 1):
+        lines.extend(textwrap.wrap(f"{number}. {clause}", 90))
+    return "\n".join(lines + schedule) + "\n", truth
+
+def local_values(text):
+    return {field: value for field, (value, _) in extract_fields_locally(text).items()}
+
+def evaluate(name, text, budget, truth=None):
+    compacted = select_passages(text, FIELDS, budget)
+    full_values = local_values(text)
+    compacted_values = local_values(compacted)
+    result = {
+        "name": name,
+        "full_tokens": estimate_tokens(text),
+        "compacted_tokens": estimate_tokens(compacted),
+        "fields_same_as_full": sum(full_values[f] == compacted_values[f] for f in FIELDS),
+        "differing_fields": [f for f in FIELDS if full_values[f] != compacted_values[f]],
+    }
+    if truth is not None:
+        result["correct_full"] = sum(full_values[f] == truth[f] for f in FIELDS)
+        result["correct_compacted"] = sum(compacted_values[f] == truth[f] for f in FIELDS)
+    return result
+
+def summarize(results):
+    if not results:
+        return {}
+    full = sum(r["full_tokens"] for r in results)
+    compacted = sum(r["compacted_tokens"] for r in results)
+    summary = {
+        "documents": len(results),
+        "full_tokens": full,
+        "compacted_tokens": compacted,
+        "token_reduction": round(1 - compacted / full, 3),
+        "field_parity": round(sum(r["fields_same_as_full"] for r in results) / (len(results) * len(FIELDS)), 3),
+    }
+    if "correct_full" in results[0]:
+        total = len(results) * len(FIELDS)
+        summary["accuracy_full"] = round(sum(r["correct_full"] for r in results) / total, 3)
+        summary["accuracy_compacted"] = round(sum(r["correct_compacted"] for r in results) / total, 3)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", default="PDFs")
+    parser.add_argument("--synthetic", type=int, default=20, help="number of generated leases")
+    parser.add_argument("--clauses", type=int, default=120, help="boilerplate clauses per generated lease")
+    parser.add_argument("--budget", type=int, default=PROMPT_TOKEN_BUDGET, help="token budget for the passages")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pdf_results, skipped = [], []
+    for pdf in sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf"))):
+        try:
+            import ocr
+            text = ocr.extract_text(pdf)
+        except Exception as e:
+            skipped.append({"file": os.path.basename(pdf), "error": str(e)})
+            continue
+        pdf_results.append(evaluate(os.path.basename(pdf), text, args.budget))
+
+    rng = random.Random(args.seed)
+    synthetic_results = []
+    for number in range(args.synthetic):
+        text, truth = synthetic_lease(rng, args.clauses)
+        synthetic_results.append(evaluate(f"synthetic-{number + 1:03d}", text, args.budget, truth))
+
+    print(json.dumps({
+        "benchmark": "passages",
+        "budget": args.budget,
+        "fields": len(FIELDS),
+        "pdfs": {"summary": summarize(pdf_results), "results": pdf_results, "skipped": skipped},
+        "synthetic": {"summary": summarize(synthetic_results), "results": synthetic_results},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
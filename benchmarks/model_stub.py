@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST .../chat/completions after a configurable latency with a JSON
+object holding every key the extraction prompt asks for, so extraction can be
+benchmarked without network access or an API key. It can also reject a
+fraction of requests with 429 (with Retry-After) or 500, and enforce its own
+requests-per-second limit, to exercise retries and backoff.
+
+Point the app or model_client.AsyncModelClient at it with
+OPENAI_BASE_URL=http://127.0.0.1:8089/v1 (any OPENAI_API_KEY will do).
+
+Usage:
+    python benchmarks/model_stub.py [--port 8089] [--latency 0.5] [--jitter 0.1] [--error-rate 0] [--rate-limit 0]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Plausible answers for the fields local extraction usually leaves to the model
+STUB_VALUES = {"area_sqft": "1200", "floor": "1st Floor", "building": "JP Classic"}
+
+_KEYS = re.compile(r'"(\w+)"')
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=()):
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            return self._reply(404, {"error": {"message": "not found"}})
+        with server.lock:
+            server.requests += 1
+            now = time.monotonic()
+            limited = server.rate_limit > 0 and now - server.last_accepted < 1 / server.rate_limit
+            if not limited:
+                server.last_accepted = now
+        if limited or random.random() < server.error_rate / 2:
+            with server.lock:
+                server.rejected += 1
+            return self._reply(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                               [("Retry-After", str(server.retry_after))])
+        if random.random() < server.error_rate / 2:
+            with server.lock:
+                server.rejected += 1
+            return self._reply(500, {"error": {"message": "stub server error", "type": "server_error"}})
+
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        keys = _KEYS.findall(prompt.split(". ", 1)[0])
+        content = json.dumps({key: STUB_VALUES.get(key, "") for key in keys})
+        self._reply(200, {
+            "id": f"chatcmpl-stub-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+def start_stub(port=0, latency=0.5, jitter=0.0, error_rate=0.0, rate_limit=0.0, retry_after=0.2):
+    """Serve the stub on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.rate_limit = rate_limit
+    server.retry_after = retry_after
+    server.lock = threading.Lock()
+    server.last_accepted = 0.0
+    server.requests = server.rejected = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed with 429 or 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429s (0 = none)")
+    args = parser.parse_args()
+
+    server, url = start_stub(args.port, args.latency, args.jitter, args.error_rate, args.rate_limit)
+    print(f"Model stub listening on {url}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Multi-process stress test for the agreement persistence layer.
+
+Several worker processes repeatedly archive and restore the same set of
+agreements at once, the way concurrent /delete_agreement and
+/restore_agreement requests do under gunicorn. At the end every agreement
+must exist exactly once across the active and archived collections, and every
+file must still parse.
+
+Usage:
+    python benchmarks/stress_persistence.py [--backend sqlite|json] [--workers 8] [--iterations 200]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import create_agreement_store, create_archive_store
+
+def open_stores(backend, directory):
+    active = create_agreement_store(
+        backend,
+        os.path.join(directory, "agreements_data.json"),
+        os.path.join(directory, "agreements.db"),
+    )
+    archive = create_archive_store(
+        os.path.join(directory, "archive"),
+        os.path.join(directory, "archived_agreements.json"),
+    )
+    return active, archive
+
+def worker(backend, directory, ids, iterations, seed):
+    """Hammer delete/restore the same way the Flask routes do."""
+    active, archive = open_stores(backend, directory)
+    rng = random.Random(seed)
+    moved = 0
+    for _ in range(iterations):
+        agreement_id = rng.choice(ids)
+        if rng.random() < 0.5:
+            agreement = active.pop(agreement_id)
+            if agreement:
+                agreement["archived_timestamp"] = datetime.now().isoformat()
+                archive.insert(agreement)
+                moved += 1
+        else:
+            agreement = archive.pop(agreement_id)
+            if agreement:
+                active.insert(agreement)
+                moved += 1
+    return moved
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--agreements", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ids = [f"stress_{i:04d}" for i in range(args.agreements)]
+        active, archive = open_stores(args.backend, directory)
+        active.replace_all([{"id": i, "tenant_name": f"Tenant {i}"} for i in ids])
+        archive.replace_all([])
+
+        with multiprocessing.Pool(args.workers) as pool:
+            moved = pool.starmap(
+                worker,
+                [(args.backend, directory, ids, args.iterations, seed) for seed in range(args.workers)],
+            )
+
+        # Every archive JSON document must still be complete and parseable
+        archive_dir = os.path.join(directory, "archive")
+        for name in os.listdir(archive_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(archive_dir, name), encoding="utf-8") as f:
+                    json.load(f)
+
+        counts = Counter(a["id"] for a in active.all() + archive.all())
+        lost = [i for i in ids if counts[i] == 0]
+        duplicated = [i for i, n in counts.items() if n > 1]
+
+        print(json.dumps({
+            "backend": args.backend,
+            "workers": args.workers,
+            "iterations_per_worker": args.iterations,
+            "moves": sum(moved),
+            "active": active.count(),
+            "archived": archive.count(),
+            "active_version": active.version(),
+            "archive_version": archive.version(),
+            "lost": lost,
+            "duplicated": duplicated,
+        }, indent=2))
+
+        if lost or duplicated:
+            print("FAILED: agreements were lost or duplicated", file=sys.stderr)
+            sys.exit(1)
+        print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-worker cache for parsed data files.
+
+Each cached value remembers a cheap validation token taken before it was
+loaded: os.stat() mtime/size/inode for plain files, or the store's version
+counter for agreement stores. A lookup only re-parses when the token has
+changed, so an unchanged dashboard render does no file parsing at all.
+"""
+
+import os
+import copy
+import logging
+import threading
+
+_registry = {}
+
+def file_token(path):
+    """Validation token for a file; changes whenever it is rewritten."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def copy_records(records):
+    """Shallow-copy a list of flat dicts so callers can modify them freely."""
+    return [dict(record) for record in records]
+
+class CachedValue:
+    """A parsed value that is reloaded only when its token changes."""
+
+    def __init__(self, name, loader, token, copier=copy.deepcopy):
+        self.name = name
+        self.loader = loader
+        self.token = token
+        self.copier = copier
+        self.hits = 0
+        self.misses = 0
+        # Re-entrant: a loader may save (and so invalidate) while reloading
+        self._lock = threading.RLock()
+        self._value = None
+        self._token = None
+        self._loaded = False
+        _registry[name] = self
+
+    def get(self):
+        """Return a private copy of the current value."""
+        # Take the token before loading: if the file changes mid-load we cache
+        # new data under an old token, which only costs one extra reload
+        token = self.token()
+        with self._lock:
+            if self._loaded and token == self._token:
+                self.hits += 1
+                value = self._value
+            else:
+                self.misses += 1
+                value = self.loader()
+                self._value = value
+                self._token = token
+                self._loaded = True
+                logging.debug(f"Cache miss for {self.name}, reloaded")
+        return self.copier(value)
+
+    def invalidate(self):
+        """Drop the cached value after one of our own writes."""
+        with self._lock:
+            self._loaded = False
+            self._value = None
+            self._token = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+def stats():
+    """Hit/miss counters for every cache in this worker."""
+    return {name: cached.stats() for name, cached in _registry.items()}
@@ -0,0 +1,131 @@
+"""
+Content-addressed cache for OCR text and extracted fields.
+
+Re-uploading a lease used to repeat the full OCR run and GPT-4o call. This
+cache stores results on disk in a small SQLite database, keyed by content:
+
+  pages   SHA-256 of the PDF bytes (plus OCR settings)  -> per-page text
+                                                           and word boxes
+  fields  SHA-256 of the text (plus prompt version)     -> extracted fields
+
+Entries are evicted least-recently-used once the stored values exceed
+max_bytes. Hit/miss counters are kept in the database, so they cover every
+web and job worker.
+"""
+
+import json
+import time
+import hashlib
+
+from storage import SQLiteConnections
+
+EXTRACTION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ContentCache:
+    """Size-bounded LRU cache of JSON values, shared across processes."""
+
+    def __init__(self, db_path, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._db = SQLiteConnections(db_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._db.write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_access REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "namespace TEXT PRIMARY KEY, "
+                "hits INTEGER NOT NULL DEFAULT 0, "
+                "misses INTEGER NOT NULL DEFAULT 0, "
+                "evictions INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    def _count(self, conn, namespace, column, amount=1):
+        conn.execute("INSERT OR IGNORE INTO counters (namespace) VALUES (?)", (namespace,))
+        conn.execute(f"UPDATE counters SET {column} = {column} + ? WHERE namespace = ?", (amount, namespace))
+
+    def get(self, namespace, key):
+        """Cached value, or None on a miss. A hit refreshes the entry's LRU position."""
+        with self._db.write() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                self._count(conn, namespace, "misses")
+                return None
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key),
+            )
+            self._count(conn, namespace, "hits")
+        return json.loads(row[0])
+
+    def put(self, namespace, key, value):
+        """Store a value, then evict least-recently-used entries over max_bytes."""
+        encoded = json.dumps(value)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._db.write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, encoded, size, time.time()),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = {}
+            for victim_namespace, victim_key, victim_size in conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", (victim_namespace, victim_key)
+                )
+                total -= victim_size
+                evicted[victim_namespace] = evicted.get(victim_namespace, 0) + 1
+            for victim_namespace, count in evicted.items():
+                self._count(conn, victim_namespace, "evictions", count)
+
+    def clear(self):
+        with self._db.write() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+
+    def stats(self):
+        """Per-namespace entries, bytes, hits, misses and evictions."""
+        conn = self._db.connect()
+        result = {}
+        for namespace, hits, misses, evictions in conn.execute(
+            "SELECT namespace, hits, misses, evictions FROM counters"
+        ):
+            result[namespace] = {"entries": 0, "bytes": 0, "hits": hits, "misses": misses, "evictions": evictions}
+        for namespace, entries, size in conn.execute(
+            "SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace"
+        ):
+            result.setdefault(namespace, {"hits": 0, "misses": 0, "evictions": 0})
+            result[namespace].update(entries=entries, bytes=size)
+        return {"max_bytes": self.max_bytes, "namespaces": result}
@@ -0,0 +1,85 @@
+"""
+Date parsing for agreement fields.
+
+Agreement dates arrive in whatever format the lease (or GPT-4o) used. Rather
+than trying every strptime format for every value, parse_date() first works
+out which formats can structurally match the string's shape ("9999-99-99",
+"aaaaa 9, 9999", ...) and remembers that per shape, then caches the parsed
+result per raw string. Formats are always tried in DATE_FORMATS order, so the
+result is the same as a plain try-each-format loop.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# Tried in this order; the first format that parses wins
+DATE_FORMATS = [
+    "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y",
+    "%Y/%m/%d", "%m-%d-%Y", "%d.%m.%Y", "%Y.%m.%d",
+    "%B %d, %Y", "%d %B %Y", "%b %d, %Y", "%d %b %Y"
+]
+
+# Agreement fields that hold dates
+DATE_FIELDS = [
+    "agreement_start_date", "agreement_expiry_date",
+    "lock_in_period_end_date", "next_rent_escalation"
+]
+
+# Structural pattern (over the shape string) for each format
+_NUM = r'9{1,2}'
+_YEAR = r'9{4}'
+_NAME = r'a+'
+FORMAT_SHAPES = {
+    "%Y-%m-%d": rf'{_YEAR}-{_NUM}-{_NUM}',
+    "%d/%m/%Y": rf'{_NUM}/{_NUM}/{_YEAR}',
+    "%m/%d/%Y": rf'{_NUM}/{_NUM}/{_YEAR}',
+    "%d-%m-%Y": rf'{_NUM}-{_NUM}-{_YEAR}',
+    "%Y/%m/%d": rf'{_YEAR}/{_NUM}/{_NUM}',
+    "%m-%d-%Y": rf'{_NUM}-{_NUM}-{_YEAR}',
+    "%d.%m.%Y": rf'{_NUM}\.{_NUM}\.{_YEAR}',
+    "%Y.%m.%d": rf'{_YEAR}\.{_NUM}\.{_NUM}',
+    "%B %d, %Y": rf'{_NAME} {_NUM}, {_YEAR}',
+    "%d %B %Y": rf'{_NUM} {_NAME} {_YEAR}',
+    "%b %d, %Y": rf'{_NAME} {_NUM}, {_YEAR}',
+    "%d %b %Y": rf'{_NUM} {_NAME} {_YEAR}',
+}
+_SHAPE_PATTERNS = [(fmt, re.compile(FORMAT_SHAPES[fmt] + r'\Z')) for fmt in DATE_FORMATS]
+
+# Maps ASCII digits to "9" and ASCII letters to "a"
+_SHAPE_TABLE = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "9" * 10 + "a" * 52
+)
+
+@lru_cache(maxsize=256)
+def formats_for_shape(shape):
+    """Formats (in priority order) whose structure matches a shape string."""
+    candidates = tuple(fmt for fmt, pattern in _SHAPE_PATTERNS if pattern.match(shape))
+    # Unusual shapes (extra spaces, non-ASCII digits) fall back to every format
+    return candidates or tuple(DATE_FORMATS)
+
+@lru_cache(maxsize=8192)
+def parse_date(value):
+    """Parse a date string in any supported format. Returns a date or None."""
+    if not value or not isinstance(value, str):
+        return None
+    date_str = value.strip()
+    if not date_str:
+        return None
+
+    for fmt in formats_for_shape(date_str.translate(_SHAPE_TABLE)):
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def to_iso(value):
+    """Return a date string as YYYY-MM-DD, or '' if it cannot be parsed."""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else ""
+
+def parse_agreement_dates(agreement):
+    """ISO versions of every date field, stored next to the raw values."""
+    return {field: to_iso(agreement.get(field, "")) for field in DATE_FIELDS}
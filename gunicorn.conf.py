@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for Tenant Dashboard.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Queued uploads live in jobs.db and uploads/, so whatever processes them
+must share the web server's disk. Heroku and Render give every process
+type its own filesystem, so each web worker runs JOB_WORKER_THREADS job
+worker threads itself. On a server where worker.py runs next to gunicorn
+set JOB_WORKER_THREADS=0.
+
+Before forking, the master runs `flask --app app migrate` once, so
+stored agreements are on the current schema on the same disk the web
+workers use.
+"""
+
+import os
+import sys
+import logging
+import threading
+import subprocess
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = 120
+
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "1"))
+
+# Set in each web worker when it exits, so its job threads stop claiming jobs
+_stop = threading.Event()
+
+def on_starting(server):
+    """Migrate stored agreements before any web worker reads them."""
+    result = subprocess.run([sys.executable, "-m", "flask", "--app", "app", "migrate"])
+    if result.returncode != 0:
+        logging.error(f"flask --app app migrate failed with exit code {result.returncode}")
+
+def post_worker_init(worker):
+    """Start the job worker threads of one web worker."""
+    if JOB_WORKER_THREADS <= 0:
+        return
+    import app
+    from jobs import run_worker
+    for index in range(JOB_WORKER_THREADS):
+        threading.Thread(
+            target=run_worker,
+            args=(app.job_queue, app.JOB_HANDLERS, f"web-{os.getpid()}-{index}"),
+            kwargs={"stop": _stop},
+            name=f"job-worker-{index}",
+            daemon=True,
+        ).start()
+
+def worker_exit(server, worker):
+    # A job cut short here is retried once its lease expires
+    _stop.set()
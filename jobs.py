@@ -0,0 +1,235 @@
+"""
+Durable background job queue for Tenant Dashboard.
+
+OCR and GPT-4o extraction take tens of seconds per lease, far too long to run
+inside a web request. Uploads are saved to disk and recorded as a job row in
+a local SQLite database (jobs.db); worker.py claims jobs and runs them in
+separate processes. No external broker is needed and queued jobs survive
+restarts.
+
+A claimed job holds a lease, which run_worker renews every
+HEARTBEAT_SECONDS while the handler runs, so a long bulk upload keeps its
+job. If a worker dies mid-job the lease expires and another worker picks
+the job up again, so handlers may run more than once and must be
+idempotent: the upload handlers skip files whose agreement is already
+stored. Only the worker holding the lease can record the outcome.
+Failed jobs, and jobs whose worker keeps dying, are retried with a growing
+delay until MAX_ATTEMPTS is reached.
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+from storage import SQLiteConnections
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 120
+HEARTBEAT_SECONDS = 30
+RETRY_DELAY_SECONDS = 30
+
+def new_job_id():
+    """Random job id, safe to use in URLs and file names."""
+    return uuid.uuid4().hex
+
+class JobQueue:
+    """SQLite-backed queue shared by web workers and job workers."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._db = SQLiteConnections(db_path, row_factory=sqlite3.Row)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._db.write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, "
+                "kind TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "result TEXT, "
+                "error TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "worker TEXT, "
+                "created_at REAL NOT NULL, "
+                "available_at REAL NOT NULL, "
+                "started_at REAL, "
+                "finished_at REAL, "
+                "lease_expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+
+    def enqueue(self, kind, payload, job_id=None):
+        """Add a job and return its id. This is a single-row insert."""
+        job_id = job_id or new_job_id()
+        now = time.time()
+        with self._db.write() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload), now, now),
+            )
+        return job_id
+
+    def claim(self, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """Claim the oldest runnable job, or return None if there is none.
+
+        Runnable means queued and past its retry delay, or running with an
+        expired lease (its worker died). An expired job that has already
+        used max_attempts is marked failed instead of being run again.
+        """
+        now = time.time()
+        with self._db.write() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs "
+                    "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["status"] == QUEUED:
+                    break
+                if row["attempts"] < max_attempts:
+                    logging.warning(f"Job {row['id']} lease expired on {row['worker']}; reclaiming")
+                    break
+                logging.error(f"Job {row['id']} lease expired on {row['worker']}; giving up after {row['attempts']} attempts")
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL WHERE id = ?",
+                    (FAILED, f"Worker stopped during attempt {row['attempts']} (lease expired)", now, row["id"]),
+                )
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                "started_at = ?, lease_expires_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now + lease_seconds, row["id"]),
+            )
+        job = self._to_dict(row)
+        job.update(status=RUNNING, worker=worker, attempts=row["attempts"] + 1, started_at=now)
+        return job
+
+    def renew(self, job_id, worker, lease_seconds=LEASE_SECONDS):
+        """Extend the lease of a running job. Returns False if `worker` no longer holds it."""
+        with self._db.write() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, worker, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        """Store the result of a job `worker` holds. Returns False if it lost the lease."""
+        with self._db.write() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, json.dumps(result), time.time(), job_id, worker, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, max_attempts=MAX_ATTEMPTS):
+        """Record a failure; requeue with a delay unless attempts are used up.
+
+        Returns False, recording nothing, if `worker` no longer holds the job.
+        """
+        now = time.time()
+        with self._db.write() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] < max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, available_at = ?, "
+                    "lease_expires_at = NULL WHERE id = ?",
+                    (QUEUED, error, now + RETRY_DELAY_SECONDS * row["attempts"], job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+                    "lease_expires_at = NULL WHERE id = ?",
+                    (FAILED, error, now, job_id),
+                )
+        return True
+
+    def get(self, job_id):
+        row = self._db.connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recent(self, limit=10):
+        """Most recently created jobs, newest first."""
+        rows = self._db.connect().execute(
+            "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self):
+        """Number of jobs per status."""
+        rows = self._db.connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def _to_dict(self, row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+@contextmanager
+def keep_lease(queue, job_id, worker, lease_seconds=LEASE_SECONDS, interval=HEARTBEAT_SECONDS):
+    """Renew a job's lease from a background thread while the block runs."""
+    done = threading.Event()
+
+    def heartbeat():
+        while not done.wait(interval):
+            if not queue.renew(job_id, worker, lease_seconds):
+                logging.warning(f"{worker}: lost the lease on job {job_id}; its result will be discarded")
+                return
+
+    thread = threading.Thread(target=heartbeat, name=f"lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+def run_worker(queue, handlers, worker, poll_interval=1.0, stop=None,
+               lease_seconds=LEASE_SECONDS, heartbeat_seconds=HEARTBEAT_SECONDS):
+    """Claim and run jobs until `stop` (a threading/multiprocessing Event) is set.
+
+    `handlers` maps a job kind to a function taking the payload and returning
+    a JSON-serializable result.
+    """
+    while stop is None or not stop.is_set():
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        started = time.perf_counter()
+        logging.info(f"{worker}: running {job['kind']} job {job['id']} (attempt {job['attempts']})")
+        try:
+            with keep_lease(queue, job["id"], worker, lease_seconds, heartbeat_seconds):
+                handler = handlers[job["kind"]]
+                result = handler(job["payload"])
+        except Exception as e:
+            logging.error(f"{worker}: job {job['id']} failed: {e}")
+            if not queue.fail(job["id"], worker, f"{type(e).__name__}: {e}"):
+                logging.warning(f"{worker}: job {job['id']} was reclaimed by another worker; failure not recorded")
+            continue
+        if queue.complete(job["id"], worker, result):
+            logging.info(f"{worker}: finished job {job['id']} in {time.perf_counter() - started:.1f}s")
+        else:
+            logging.warning(f"{worker}: job {job['id']} was reclaimed by another worker; result discarded")
@@ -0,0 +1,211 @@
+"""
+Rule-based extraction of agreement fields from OCR text.
+
+Most of our leases state their terms as "Label: value" lines ("Rent Amount:
+50 per square feet per month", "Agreement Expiry Date: 19/09/2025") or in a
+few stock phrases ("admeasuring 3200 sq. ft.", "Rs. 72 per sq. ft. per
+month"). extract_fields_locally() finds those with precompiled patterns and
+gives each field a confidence between 0 and 1:
+
+  0.9   labeled value that validates (parses as a date, contains a number, ...)
+  0.7   value from a stock phrase or derived from other confident fields
+  0.4   labeled value that does not validate, or a phrase that may belong
+        to another party (a floor or building outside the demised-premises
+        clause, an "M/s." name not designated as the lessee)
+  0.0   not found
+
+Only fields below the confidence threshold are sent to GPT-4o.
+"""
+
+import re
+
+from dates import DATE_FIELDS, parse_date
+from normalization import BUILDING_RULES, normalize_floor, normalize_period_of_rent
+
+LABELED = 0.9
+PHRASE = 0.7
+UNVALIDATED = 0.4
+
+# Field labels as they appear in leases, most specific first
+FIELD_LABELS = {
+    "tenant_name": ["tenant name", "name of the tenant", "lessee name", "name of the lessee", "tenant", "lessee"],
+    "area_sqft": ["area", "carpet area", "built-up area", "super built-up area", "area \\(sq\\.? ?ft\\.?\\)"],
+    "floor": ["floor"],
+    "building": ["building", "building name", "premises", "property"],
+    "period_of_rent": ["period of rent", "rent period", "lease period", "term of lease", "period of lease", "tenure"],
+    "rent_amount": ["rent amount", "monthly rent", "rent"],
+    "maintenance": ["maintenance", "maintenance charges", "cam charges"],
+    "rent_escalation": ["rent escalation", "escalation"],
+    "agreement_start_date": ["agreement start date", "start date", "commencement date", "date of commencement", "lease start date"],
+    "agreement_expiry_date": ["agreement expiry date", "expiry date", "date of expiry", "end date", "lease end date", "expiration date"],
+    "lock_in_period": ["lock in period", "lock-in period", "lockin period"],
+    "lock_in_period_end_date": ["lock in period end date", "lock-in period end date", "lock in end date", "lock-in end date"],
+    "next_rent_escalation": ["next rent escalation", "next escalation", "next escalation date", "next rent escalation date"],
+}
+
+def _label_pattern(labels):
+    # Longest labels first, so "lock in period end date" wins over "lock in period"
+    alternatives = "|".join(sorted(labels, key=len, reverse=True)).replace(" ", r"[\s_-]*")
+    return re.compile(rf'^[ \t]*(?:{alternatives})[ \t]*[:\-–][ \t]*(?P<value>\S.*?)[ \t]*$', re.IGNORECASE | re.MULTILINE)
+
+_LABEL_PATTERNS = {field: _label_pattern(labels) for field, labels in FIELD_LABELS.items()}
+
+_ORDINAL_DAY = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)\b', re.IGNORECASE)
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_PERCENT = re.compile(r'\d+(?:\.\d+)?\s*%')
+_AREA_PHRASE = re.compile(
+    r'(?:admeasuring|ad\s*measuring|measuring|carpet area of|area of)\s*(?:about\s*)?(\d[\d,]*)\s*'
+    r'(?:sq\.?\s*ft\.?|sqft|square\s+f(?:ee|oo)t)', re.IGNORECASE)
+_PER_SQFT = r'per\s*(?:sq\.?\s*ft\.?|sqft|square\s+f(?:ee|oo)t)\s*per\s*month'
+_RENT_PHRASE = re.compile(rf'rent[^.\n]{{0,80}}?(?:rs\.?|inr|₹)\s*(\d+(?:\.\d+)?)\s*(?:/-\s*)?{_PER_SQFT}', re.IGNORECASE)
+_MAINTENANCE_PHRASE = re.compile(rf'maintenance[^.\n]{{0,80}}?(?:rs\.?|inr|₹)\s*(\d+(?:\.\d+)?)\s*(?:/-\s*)?{_PER_SQFT}', re.IGNORECASE)
+_ESCALATION_PHRASE = re.compile(r'escalat\w*[^.\n]{0,60}?(\d+(?:\.\d+)?)\s*%|(\d+(?:\.\d+)?)\s*%[^.\n]{0,40}?escalat', re.IGNORECASE)
+_PERIOD_PHRASE = re.compile(r'(?:for a period of|period of|term of)\s*(\d+)\s*\(?[a-z ]*\)?\s*(years?|months?)', re.IGNORECASE)
+_LOCK_IN = re.compile(r'lock[\s-]*in', re.IGNORECASE)
+_LOCK_IN_PHRASE = re.compile(r'lock[\s-]*in[^.\n]{0,40}?(\d+)\s*\(?[a-z ]*\)?\s*(years?|months?)', re.IGNORECASE)
+_FLOOR_PHRASE = re.compile(r'\b(ground|first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th)\s+floor\b', re.IGNORECASE)
+_BUILDING_LABELS = {s: label for label, substrings in BUILDING_RULES for s in substrings}
+_BUILDING_PHRASE = re.compile("|".join(re.escape(s) for s in _BUILDING_LABELS), re.IGNORECASE)
+# The clause describing the let premises; floors and buildings elsewhere are
+# often the lessor's registered office
+_PREMISES_CLAUSE = re.compile(
+    r'(?:demised|leased|let|licensed|rented|schedule[d]?|said)\s+premises'
+    r'|premises\s+(?:situated|located|bearing|known\s+as|at|on)', re.IGNORECASE)
+PREMISES_WINDOW = 300
+_TENANT_PHRASE = re.compile(r'\bM/s\.?\s+([A-Z][\w&.,\' -]{2,80}?)\s*(?:,|\(|hereinafter)')
+# How a party is designated after its name: "(LESSEE)", "hereinafter called the Lessor"
+_PARTY_ROLE = re.compile(r'\b(lessee|tenant|licensee|lessor|landlord|licensor|owner)s?\b', re.IGNORECASE)
+TENANT_ROLES = frozenset(["lessee", "tenant", "licensee"])
+ROLE_WINDOW = 300
+
+def _parse_lease_date(value):
+    """parse_date() that also accepts "1st January 2024" style dates."""
+    return parse_date(_ORDINAL_DAY.sub(r"\1", value).strip(" .,"))
+
+def _validate(field, value):
+    """True if a labeled value looks like a real value for the field."""
+    if field in DATE_FIELDS:
+        return _parse_lease_date(value) is not None
+    if field in ("area_sqft", "rent_amount", "maintenance", "period_of_rent", "lock_in_period"):
+        return _NUMBER.search(value) is not None
+    if field == "rent_escalation":
+        return _PERCENT.search(value) is not None
+    if field == "floor":
+        return _FLOOR_PHRASE.search(value) is not None or normalize_floor(value) != value
+    if field == "building":
+        lowered = value.lower()
+        return any(s in lowered for _, substrings in BUILDING_RULES for s in substrings)
+    return len(value) >= 2
+
+def _labeled(text, field):
+    """First labeled value for a field, preferring one that validates."""
+    fallback = None
+    for match in _LABEL_PATTERNS[field].finditer(text):
+        value = match.group("value").strip()
+        if _validate(field, value):
+            return value, LABELED
+        fallback = fallback or (value, UNVALIDATED)
+    return fallback or ("", 0.0)
+
+def _in_lock_in_clause(text, position):
+    """True if the sentence containing `position` is about the lock-in period."""
+    start = max(text.rfind(".", 0, position), text.rfind("\n", 0, position)) + 1
+    return _LOCK_IN.search(text, start, position) is not None
+
+def _premises_phrase(pattern, text):
+    """(match, confidence) of the first match in the demised-premises clause.
+
+    Without one, the first match anywhere comes back at UNVALIDATED; None if
+    nothing matches.
+    """
+    spans = [(m.start(), m.end() + PREMISES_WINDOW) for m in _PREMISES_CLAUSE.finditer(text)]
+    first = None
+    for match in pattern.finditer(text):
+        if any(start <= match.start() < end for start, end in spans):
+            return match, PHRASE
+        first = first or match
+    return (first, UNVALIDATED) if first else None
+
+def _tenant_phrase(text):
+    """The "M/s." party designated as lessee or tenant.
+
+    An undesignated name is returned at UNVALIDATED confidence, since the
+    first party named is usually the lessor.
+    """
+    matches = list(_TENANT_PHRASE.finditer(text))
+    undesignated = None
+    for i, match in enumerate(matches):
+        # The designation follows the name, before the next party is named
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        role = _PARTY_ROLE.search(text, match.end(), min(end, match.end() + ROLE_WINDOW))
+        if role is None:
+            undesignated = undesignated or match
+        elif role.group(1).lower() in TENANT_ROLES:
+            return match.group(1).strip(), PHRASE
+    return (undesignated.group(1).strip(), UNVALIDATED) if undesignated else ("", 0.0)
+
+def _phrase(field, text):
+    """Value from a stock phrase, or ("", 0.0)."""
+    if field == "area_sqft":
+        match = _AREA_PHRASE.search(text)
+        return (match.group(1).replace(",", ""), PHRASE) if match else ("", 0.0)
+    if field == "rent_amount":
+        match = _RENT_PHRASE.search(text)
+        return (match.group(1), PHRASE) if match else ("", 0.0)
+    if field == "maintenance":
+        match = _MAINTENANCE_PHRASE.search(text)
+        return (match.group(1), PHRASE) if match else ("", 0.0)
+    if field == "rent_escalation":
+        match = _ESCALATION_PHRASE.search(text)
+        return (f"{match.group(1) or match.group(2)}%", PHRASE) if match else ("", 0.0)
+    if field == "period_of_rent":
+        for match in _PERIOD_PHRASE.finditer(text):
+            # "lock-in period of 12 months" is not the rent period
+            if not _in_lock_in_clause(text, match.start()):
+                return f"{match.group(1)} {match.group(2)}", PHRASE
+        return "", 0.0
+    if field == "lock_in_period":
+        match = _LOCK_IN_PHRASE.search(text)
+        return (f"{match.group(1)} {match.group(2)}", PHRASE) if match else ("", 0.0)
+    if field == "floor":
+        found = _premises_phrase(_FLOOR_PHRASE, text)
+        return (found[0].group(0), found[1]) if found else ("", 0.0)
+    if field == "building":
+        found = _premises_phrase(_BUILDING_PHRASE, text)
+        return (_BUILDING_LABELS[found[0].group(0).lower()], found[1]) if found else ("", 0.0)
+    if field == "tenant_name":
+        return _tenant_phrase(text)
+    return "", 0.0
+
+def extract_fields_locally(text):
+    """Extract agreement fields from text.
+
+    Returns {field: (value, confidence)} for every field in FIELD_LABELS plus
+    rental_period_greater_than_lock_in_period. Dates are returned as
+    YYYY-MM-DD, like the GPT-4o prompt asks for.
+    """
+    results = {}
+    for field in FIELD_LABELS:
+        value, confidence = _labeled(text, field)
+        if confidence < PHRASE:
+            phrase_value, phrase_confidence = _phrase(field, text)
+            if phrase_confidence > confidence:
+                value, confidence = phrase_value, phrase_confidence
+        if field in DATE_FIELDS and value:
+            parsed = _parse_lease_date(value)
+            value = parsed.isoformat() if parsed else value
+        results[field] = (value, confidence)
+
+    # Derived from the two periods once both are known well enough
+    period, period_confidence = results["period_of_rent"]
+    lock_in, lock_in_confidence = results["lock_in_period"]
+    period_months = normalize_period_of_rent(period)
+    lock_in_months = normalize_period_of_rent(lock_in)
+    if period_months and lock_in_months:
+        results["rental_period_greater_than_lock_in_period"] = (
+            "True" if int(period_months) > int(lock_in_months) else "False",
+            min(period_confidence, lock_in_confidence, PHRASE),
+        )
+    else:
+        results["rental_period_greater_than_lock_in_period"] = ("", 0.0)
+    return results
@@ -0,0 +1,139 @@
+"""
+Async GPT-4o client for bulk extraction.
+
+The module-level openai.chat.completions.create() call blocks, so every
+upload waits on its own request. AsyncModelClient makes many requests from
+one event loop instead:
+
+- at most `concurrency` requests are in flight (asyncio.Semaphore)
+- requests are started at no more than `rate` per second, with bursts of up
+  to `burst` (token bucket); every retry takes a token too
+- 429s, 5xx responses, timeouts and connection errors are retried with
+  exponential backoff and jitter, honouring Retry-After when the server
+  sends one
+- each attempt is cancelled after `timeout` seconds
+
+The client talks to OPENAI_BASE_URL when it is set, so it can be pointed at
+a local stand-in such as benchmarks/model_stub.py. A client belongs to the
+event loop it is first used in; create one per asyncio.run().
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+
+import openai
+
+MODEL_NAME = "gpt-4o"
+MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", "8"))
+# Requests started per second; 0 disables rate limiting
+MODEL_RATE_LIMIT = float(os.getenv("MODEL_RATE_LIMIT", "5"))
+MODEL_BURST = int(os.getenv("MODEL_BURST", "10"))
+MODEL_MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "5"))
+MODEL_TIMEOUT = float(os.getenv("MODEL_TIMEOUT", "60"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second, in bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def is_retryable(error):
+    """True for rate limiting, server errors, timeouts and connection failures."""
+    if isinstance(error, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+def retry_after(error):
+    """Seconds from a Retry-After header, or None."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class AsyncModelClient:
+    """Concurrency-limited, rate-limited chat completions client with retries."""
+
+    def __init__(self, model=MODEL_NAME, concurrency=MODEL_CONCURRENCY, rate=MODEL_RATE_LIMIT,
+                 burst=MODEL_BURST, max_retries=MODEL_MAX_RETRIES, timeout=MODEL_TIMEOUT,
+                 base_url=None, api_key=None, client=None):
+        self.model = model
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        # Retries are ours, so the SDK's own are turned off
+        self.client = client or openai.AsyncOpenAI(
+            api_key=api_key or openai.api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or os.getenv("OPENAI_BASE_URL") or None,
+            max_retries=0,
+            timeout=timeout,
+        )
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+    def _backoff(self, attempt, error):
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+        return delay
+
+    async def chat(self, messages, max_tokens=1024):
+        """Message content of one chat completion, retried as needed."""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                try:
+                    response = await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=self.model, messages=messages, max_tokens=max_tokens,
+                        ),
+                        self.timeout,
+                    )
+                    self.stats["requests"] += 1
+                    return response.choices[0].message.content
+                except Exception as e:
+                    if not is_retryable(e) or attempt == self.max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    error, delay = e, self._backoff(attempt, e)
+            # Back off outside the semaphore so other requests can use the slot
+            self.stats["retries"] += 1
+            logging.warning(f"Model request failed ({type(error).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,166 @@
+"""
+Field normalization for extracted rental agreements.
+
+All patterns are compiled once at import time and the floor/building rules
+are lookup tables, so normalizing a record costs a handful of regex scans.
+normalize_agreements() processes a whole batch in one pass.
+"""
+
+import re
+
+from dates import parse_agreement_dates
+
+# Bump when any normalizer changes so stored records get re-normalized
+SCHEMA_VERSION = 2
+
+_INTEGER = re.compile(r'\d+')
+_DECIMAL = re.compile(r'\d+\.?\d*')
+_PERCENTAGE = re.compile(r'(\d+\.?\d*)%?')
+
+# Period units in priority order: (substring, months per unit)
+PERIOD_UNITS = [
+    ("year", 12),
+    ("month", 1),
+    ("quarter", 3),
+]
+
+# Floor rules in priority order: (label, substrings, exact values)
+FLOOR_RULES = [
+    ("Ground Floor", ("ground", "g.f"), ("gf", "0")),
+    ("1st Floor", ("1st", "first"), ("1", "f1")),
+    ("2nd Floor", ("2nd", "second"), ("2", "f2")),
+    ("3rd Floor", ("3rd", "third"), ("3", "f3")),
+    ("4th Floor", ("4th", "fourth"), ("4", "f4")),
+    ("5th Floor", ("5th", "fifth"), ("5", "f5")),
+]
+
+# Building rules in priority order: (label, substrings)
+BUILDING_RULES = [
+    ("JP Classic", ("jp classic", "jp-classic")),
+    ("Silver Software", ("silver software", "silver-software")),
+]
+
+_TRUE_VALUES = frozenset(["yes", "true", "1"])
+
+def _clean(value):
+    """Return value as a stripped string ('' for missing values)."""
+    if not value:
+        return ""
+    return str(value).strip()
+
+def normalize_period_of_rent(period_value):
+    """Convert period of rent to standardized months format."""
+    period_str = _clean(period_value).lower()
+    match = _INTEGER.search(period_str)
+    if not match:
+        return ""
+
+    num = int(match.group())
+    for unit, months_per_unit in PERIOD_UNITS:
+        if unit in period_str:
+            return str(num * months_per_unit)
+    # Default assumption: if only a number, assume months
+    return str(num)
+
+def normalize_rent_amount(rent_value):
+    """Extract numeric rent amount per sqft per month."""
+    match = _DECIMAL.search(_clean(rent_value))
+    # Return the first number found (should be the rent amount)
+    return match.group() if match else ""
+
+def normalize_maintenance_amount(maintenance_value):
+    """Extract total numeric maintenance amount per sqft per month."""
+    numbers = _DECIMAL.findall(_clean(maintenance_value))
+    if not numbers:
+        return ""
+
+    # Sum all numbers found (to handle cases like "Rs.11 + Rs. 2")
+    total = sum(float(num_str) for num_str in numbers)
+
+    # Return as string, removing unnecessary decimal places
+    if total == int(total):
+        return str(int(total))
+    return str(total)
+
+def normalize_rent_escalation(escalation_value):
+    """Extract percentage value from rent escalation."""
+    match = _PERCENTAGE.search(_clean(escalation_value))
+    # Always return with % sign
+    return f"{match.group(1)}%" if match else ""
+
+def normalize_area_sqft(area_value):
+    """Extract numeric square footage value."""
+    match = _INTEGER.search(_clean(area_value))
+    return match.group() if match else ""
+
+def normalize_floor(floor_value):
+    """Standardize floor information."""
+    floor_clean = _clean(floor_value)
+    if not floor_clean:
+        return ""
+
+    floor_str = floor_clean.lower()
+    for label, substrings, exact in FLOOR_RULES:
+        if floor_str in exact or any(s in floor_str for s in substrings):
+            return label
+    # Return as is if no standard format matches
+    return floor_clean
+
+def normalize_building(building_value):
+    """Standardize building names."""
+    building_clean = _clean(building_value)
+    if not building_clean:
+        return ""
+
+    building_str = building_clean.lower()
+    for label, substrings in BUILDING_RULES:
+        if any(s in building_str for s in substrings):
+            return label
+    # Return as is if no standard building matches
+    return building_clean
+
+def normalize_rental_period_flag(value):
+    """Coerce rental_period_greater_than_lock_in_period to 'True' or 'False'."""
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, str) and value.strip().lower() in _TRUE_VALUES:
+        return "True"
+    return "False"  # Default to False if unclear
+
+def normalize_agreement(agreement):
+    """Normalize all agreement fields in place and stamp the schema version."""
+    get = agreement.get
+
+    # Handle legacy data - convert place_occupied to new fields if needed
+    if "place_occupied" in agreement and not get("area_sqft"):
+        place = get("place_occupied", "")
+        agreement["area_sqft"] = place
+        agreement["floor"] = place
+        agreement["building"] = place
+
+    agreement["area_sqft"] = normalize_area_sqft(get("area_sqft", ""))
+    agreement["floor"] = normalize_floor(get("floor", ""))
+    agreement["building"] = normalize_building(get("building", ""))
+    agreement["period_of_rent"] = normalize_period_of_rent(get("period_of_rent", ""))
+    agreement["rent_amount"] = normalize_rent_amount(get("rent_amount", ""))
+    agreement["maintenance"] = normalize_maintenance_amount(get("maintenance", ""))
+    agreement["rent_escalation"] = normalize_rent_escalation(get("rent_escalation", ""))
+    # Lock-in period uses the same month conversion as period_of_rent
+    agreement["lock_in_period"] = normalize_period_of_rent(get("lock_in_period", ""))
+    agreement["rental_period_greater_than_lock_in_period"] = normalize_rental_period_flag(
+        get("rental_period_greater_than_lock_in_period", "")
+    )
+    # Parsed ISO dates let alert computation skip date parsing entirely
+    agreement["parsed_dates"] = parse_agreement_dates(agreement)
+    agreement["schema_version"] = SCHEMA_VERSION
+    return agreement
+
+def normalize_agreements(batch):
+    """Normalize a list of agreements in place in a single pass."""
+    for agreement in batch:
+        normalize_agreement(agreement)
+    return batch
+
+def is_current_schema(agreement):
+    """True if the agreement was normalized by the current normalize_agreement."""
+    return agreement.get("schema_version") == SCHEMA_VERSION
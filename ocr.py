@@ -0,0 +1,362 @@
+"""
+PDF text extraction for uploaded agreements.
+
+Born-digital PDFs carry an embedded text layer. extract_text() first reads it
+with poppler's pdftotext (one call for the whole document, pages split on
+form feeds) and keeps every page with at least TEXT_LAYER_MIN_CHARS of
+text. Only the remaining pages (scans) are rasterized and OCRed.
+
+Pages are rasterized a window at a time (first_page/last_page) into a
+temporary directory rather than all at once into memory, so memory stays
+proportional to the window size instead of the page count. Each window's
+page images are handed to tesseract by file path and deleted as soon as
+their text is back; the next window is rasterized while the current one is
+being OCRed.
+
+A tesseract run is single-threaded work in a separate process, so pages are
+OCRed in parallel on a bounded ProcessPoolExecutor. Every tesseract process
+is limited to OCR_THREAD_LIMIT OpenMP threads so that N workers do not
+oversubscribe the cores. Texts are yielded in page order.
+
+Every page comes back as a dict (see iter_pages()) with its text and, for
+OCRed pages, each word's bounding box and confidence, taken from the same
+tesseract run as the text.
+
+The OCR engine is pluggable (OCR_ENGINE):
+
+  pytesseract  the default; starts a tesseract process per page, which
+               reloads the language model every time
+  tesserocr    keeps one tesseract API with the model loaded in each worker
+               and passes it the page as an in-memory image (pip install
+               tesserocr)
+"""
+
+import os
+import re
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import pytesseract
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from preprocessing import OCR_PREPROCESS, get_preset, preprocess_image, preset_dpi
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_THREAD_LIMIT = int(os.getenv("OCR_THREAD_LIMIT", "1"))
+# Pages rasterized per window; at most two windows are on disk at once
+RASTER_WINDOW = int(os.getenv("RASTER_WINDOW", str(max(2, OCR_WORKERS))))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+# Pages whose text layer has fewer non-whitespace characters are OCRed
+TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "40"))
+USE_TEXT_LAYER = os.getenv("USE_TEXT_LAYER", "true").lower() != "false"
+OCR_ENGINE = os.getenv("OCR_ENGINE", "pytesseract")
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+
+_WHITESPACE = re.compile(r'\s+')
+
+def parse_ocr_data(data):
+    """(text, words) from pytesseract image_to_data() output.
+
+    Words are [text, left, top, width, height, confidence] lists. The text
+    has one line per tesseract text line and a blank line between
+    paragraphs, as image_to_string() lays it out.
+    """
+    lines, words, previous = [], [], None
+    for index, text in enumerate(data["text"]):
+        # Block, paragraph and line rows carry no text and confidence -1
+        if not text.strip() or float(data["conf"][index]) < 0:
+            continue
+        words.append([text, data["left"][index], data["top"][index],
+                      data["width"][index], data["height"][index], round(float(data["conf"][index]))])
+        position = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        if position == previous:
+            lines[-1] += " " + text
+            continue
+        if previous is not None and position[:2] != previous[:2]:
+            lines.append("")
+        lines.append(text)
+        previous = position
+    return "".join(line + "\n" for line in lines), words
+
+def mean_confidence(words):
+    """Mean word confidence (0-100) of a page, or None without words."""
+    if not words:
+        return None
+    return round(sum(word[5] for word in words) / len(words), 1)
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+class PytesseractEngine:
+    """Runs the tesseract binary once per page through pytesseract."""
+
+    def __init__(self, lang=OCR_LANG):
+        self.lang = lang
+
+    def image_to_data(self, image):
+        """(text, words) of a page from a single tesseract run."""
+        return parse_ocr_data(pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT))
+
+class TesserocrEngine:
+    """In-process tesseract API that keeps the language model loaded."""
+
+    def __init__(self, lang=OCR_LANG):
+        try:
+            import tesserocr
+        except ImportError:
+            raise RuntimeError("OCR_ENGINE=tesserocr needs the tesserocr package (pip install tesserocr)")
+        self.tesserocr = tesserocr
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def _set_image(self, image):
+        if isinstance(image, str):
+            with Image.open(image) as page:
+                page.load()
+                self.api.SetImage(page)
+        else:
+            self.api.SetImage(image)
+
+    def image_to_data(self, image):
+        """(text, words) of a page; the words are read from the same recognition pass."""
+        self._set_image(image)
+        self.api.Recognize()
+        text = self.api.GetUTF8Text()
+        words = []
+        level = self.tesserocr.RIL.WORD
+        iterator = self.api.GetIterator()
+        if iterator is not None:
+            for word in self.tesserocr.iterate_level(iterator, level):
+                word_text = word.GetUTF8Text(level)
+                if not word_text or not word_text.strip():
+                    continue
+                left, top, right, bottom = word.BoundingBox(level)
+                words.append([word_text, left, top, right - left, bottom - top, round(word.Confidence(level))])
+        return text, words
+
+OCR_ENGINES = {"pytesseract": PytesseractEngine, "tesserocr": TesserocrEngine}
+
+_engines = threading.local()
+
+def get_engine(name=OCR_ENGINE):
+    """This thread's instance of an OCR engine, created on first use."""
+    # An engine is not thread-safe and must not cross a fork
+    cached = getattr(_engines, "cache", None)
+    if cached is None or _engines.pid != os.getpid():
+        cached = _engines.cache = {}
+        _engines.pid = os.getpid()
+    if name not in cached:
+        if name not in OCR_ENGINES:
+            raise ValueError(f"Unknown OCR engine {name!r}; choose from {', '.join(OCR_ENGINES)}")
+        cached[name] = OCR_ENGINES[name]()
+    return cached[name]
+
+def _init_ocr_process(thread_limit):
+    # tesseract reads this when the subprocess (or tesserocr's library) starts
+    os.environ["OMP_THREAD_LIMIT"] = str(thread_limit)
+
+def _prepare(image, preprocess):
+    if not get_preset(preprocess):
+        return image
+    if isinstance(image, str):
+        with Image.open(image) as page:
+            return preprocess_image(page, preprocess)
+    return preprocess_image(image, preprocess)
+
+def ocr_page(image, engine=OCR_ENGINE, preprocess=OCR_PREPROCESS):
+    """OCR one page with word boxes: {"text", "words", "confidence"}.
+
+    Boxes are in pixels of the (preprocessed) page image.
+    """
+    text, words = get_engine(engine).image_to_data(_prepare(image, preprocess))
+    return {"text": text, "words": words, "confidence": mean_confidence(words)}
+
+def get_pool(workers=OCR_WORKERS, thread_limit=OCR_THREAD_LIMIT):
+    """Process pool shared by every extraction in this process."""
+    global _pool, _pool_key
+    key = (workers, thread_limit, os.getpid())
+    # Bulk uploads extract several PDFs from threads that share the pool
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            # A pool inherited through fork belongs to the parent; never reuse it
+            shutdown_pool()
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_process,
+                initargs=(thread_limit,),
+            )
+            _pool_key = key
+        return _pool
+
+def shutdown_pool():
+    global _pool, _pool_key
+    if _pool is not None and _pool_key[2] == os.getpid():
+        _pool.shutdown()
+    _pool = _pool_key = None
+
+def ocr_settings_key():
+    """Settings that change extract_text() output, for cache keys."""
+    return (f"dpi={preset_dpi(OCR_PREPROCESS, OCR_DPI)};text_layer={USE_TEXT_LAYER};min_chars={TEXT_LAYER_MIN_CHARS};"
+            f"engine={OCR_ENGINE};lang={OCR_LANG};preprocess={OCR_PREPROCESS}")
+
+def page_count(pdf_path):
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+def read_text_layer(pdf_path, pages):
+    """Embedded text of each page via pdftotext, or None if unavailable."""
+    try:
+        result = subprocess.run(
+            ["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+            capture_output=True, timeout=60, check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.warning(f"Could not read text layer of {pdf_path}, using OCR: {e}")
+        return None
+    # pdftotext ends every page with a form feed
+    texts = result.stdout.decode("utf-8", errors="replace").split("\f")[:pages]
+    return texts + [""] * (pages - len(texts))
+
+def has_usable_text(text, min_chars=TEXT_LAYER_MIN_CHARS):
+    return len(_WHITESPACE.sub("", text)) >= min_chars
+
+def page_windows(page_numbers, window):
+    """Split sorted page numbers into runs of consecutive pages, at most `window` long."""
+    windows = []
+    for number in page_numbers:
+        if windows and len(windows[-1]) < window and windows[-1][-1] == number - 1:
+            windows[-1].append(number)
+        else:
+            windows.append([number])
+    return windows
+
+def iter_page_windows(pdf_path, directory, window=RASTER_WINDOW, dpi=OCR_DPI, timings=None, page_numbers=None):
+    """Rasterize a PDF `window` pages at a time, yielding lists of image paths.
+
+    `page_numbers` (1-based, sorted) limits rasterization to those pages.
+    """
+    if page_numbers is None:
+        page_numbers = range(1, page_count(pdf_path) + 1)
+    for numbers in page_windows(page_numbers, window):
+        started = time.perf_counter()
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=numbers[0],
+            last_page=numbers[-1],
+            output_folder=directory,
+            fmt="png",
+            paths_only=True,
+        )
+        if timings is not None:
+            timings["rasterize_seconds"] = timings.get("rasterize_seconds", 0) + time.perf_counter() - started
+        yield paths
+
+def _collect(paths, pending):
+    """Wait for one window's OCR, delete its images and return the results."""
+    results = [future.result() for future in pending] if pending is not None else None
+    for path in paths:
+        os.remove(path)
+    return results
+
+def iter_ocr_pages(pdf_path, workers=OCR_WORKERS, thread_limit=OCR_THREAD_LIMIT,
+                   window=RASTER_WINDOW, dpi=None, timings=None, page_numbers=None, engine=OCR_ENGINE,
+                   preprocess=OCR_PREPROCESS):
+    """Yield ocr_page() of each page (or of `page_numbers`), in page order.
+
+    `dpi` defaults to the preprocessing preset's resolution, else OCR_DPI.
+    """
+    dpi = dpi or preset_dpi(preprocess, OCR_DPI)
+    with tempfile.TemporaryDirectory(prefix="ocr-") as directory:
+        windows = iter_page_windows(pdf_path, directory, window, dpi, timings, page_numbers)
+        if workers <= 1:
+            _init_ocr_process(thread_limit)
+            for paths in windows:
+                results = [ocr_page(path, engine, preprocess) for path in paths]
+                _collect(paths, None)
+                yield from results
+            return
+
+        pool = get_pool(workers, thread_limit)
+        previous = None
+        for paths in windows:
+            # Queue this window, then finish the previous one while it runs
+            current = (paths, [pool.submit(ocr_page, path, engine, preprocess) for path in paths])
+            if previous is not None:
+                yield from _collect(*previous)
+            previous = current
+        if previous is not None:
+            yield from _collect(*previous)
+
+def iter_pages(pdf_path, workers=OCR_WORKERS, thread_limit=OCR_THREAD_LIMIT,
+               window=RASTER_WINDOW, dpi=None, timings=None, text_layer=USE_TEXT_LAYER, engine=OCR_ENGINE,
+               preprocess=OCR_PREPROCESS):
+    """Yield each page of a PDF in page order.
+
+    A page is {"page", "source", "text", "words", "confidence"}: pages with a
+    usable embedded text layer have source "text_layer" and no words; the
+    rest are OCRed (source "ocr"). If `timings` is a dict it also receives
+    the number of pages taken from each source.
+    """
+    started = time.perf_counter()
+    pages = page_count(pdf_path)
+    layer = read_text_layer(pdf_path, pages) if text_layer else None
+    if layer is None:
+        layer = [""] * pages
+    scanned = [number for number in range(1, pages + 1) if not has_usable_text(layer[number - 1])]
+    if timings is not None:
+        timings["text_layer_seconds"] = time.perf_counter() - started
+        timings["text_layer_pages"] = pages - len(scanned)
+        timings["ocr_pages"] = len(scanned)
+
+    ocr_results = iter_ocr_pages(pdf_path, workers, thread_limit, window, dpi, timings, scanned, engine, preprocess) \
+        if scanned else iter(())
+    for number in range(1, pages + 1):
+        if has_usable_text(layer[number - 1]):
+            yield {"page": number, "source": "text_layer", "text": layer[number - 1], "words": [], "confidence": None}
+        else:
+            result = next(ocr_results, None) or {"text": "", "words": [], "confidence": None}
+            yield dict(result, page=number, source="ocr")
+
+def pages_text(pages):
+    """Document text of iter_pages() results, as extract_text() returns it."""
+    return "".join(page["text"] + "\n" for page in pages)
+
+def extract_pages(pdf_path, workers=OCR_WORKERS, thread_limit=OCR_THREAD_LIMIT,
+                  window=RASTER_WINDOW, dpi=None, timings=None, text_layer=USE_TEXT_LAYER, engine=OCR_ENGINE,
+                  preprocess=OCR_PREPROCESS):
+    """Extract every page of a PDF as a list of iter_pages() dicts.
+
+    If `timings` is a dict it receives the page counts (total, from the text
+    layer, OCRed), worker count, mean OCR word confidence and seconds spent
+    reading the text layer, rasterizing, waiting on OCR and in total.
+    """
+    started = time.perf_counter()
+    breakdown = {"rasterize_seconds": 0}
+    pages = list(iter_pages(pdf_path, workers, thread_limit, window, dpi, breakdown, text_layer, engine, preprocess))
+    total = time.perf_counter() - started
+
+    breakdown.update(
+        pages=len(pages),
+        workers=workers,
+        window=window,
+        engine=engine,
+        preprocess=preprocess,
+        ocr_confidence=mean_confidence([word for page in pages for word in page["words"]]),
+        text_layer_seconds=round(breakdown["text_layer_seconds"], 3),
+        rasterize_seconds=round(breakdown["rasterize_seconds"], 3),
+        ocr_seconds=round(total - breakdown["text_layer_seconds"] - breakdown["rasterize_seconds"], 3),
+        total_seconds=round(total, 3),
+    )
+    if timings is not None:
+        timings.update(breakdown)
+    logging.info(f"Extracted {pdf_path}: {breakdown}")
+    return pages
+
+def extract_text(pdf_path, *args, **kwargs):
+    """Extract the text of every page of a PDF; takes the arguments of extract_pages()."""
+    return pages_text(extract_pages(pdf_path, *args, **kwargs))
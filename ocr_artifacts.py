@@ -0,0 +1,136 @@
+"""
+Per-page OCR artifacts of stored agreements.
+
+The upload pipeline keeps what ocr.extract_pages() produced for each
+agreement: every page's source (text layer or OCR), text, mean word
+confidence and, for OCRed pages, the word boxes. Re-extraction, passage
+selection and search read them back instead of running tesseract again.
+
+Artifacts live in a SQLite database next to the agreements, keyed by
+agreement id, and survive archiving. Word boxes are stored compactly as
+zlib-compressed JSON rows of [text, left, top, width, height, confidence];
+page text is stored as is so it can be read without decompressing, and
+is also the content of the search index (search.py).
+Artifacts record the OCR settings they were made with, so a caller can
+tell when they are stale.
+"""
+
+import json
+import zlib
+from datetime import datetime
+
+from ocr import mean_confidence
+from storage import SQLiteConnections
+
+def _pack_words(words):
+    return zlib.compress(json.dumps(words, separators=(",", ":")).encode("utf-8"), 6)
+
+def _unpack_words(blob):
+    return json.loads(zlib.decompress(blob)) if blob else []
+
+class OCRArtifactStore:
+    """Per-page OCR text, confidences and word boxes keyed by agreement id."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._db = SQLiteConnections(db_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._db.write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "agreement_id TEXT PRIMARY KEY, "
+                "ocr_settings TEXT NOT NULL, "
+                "pages INTEGER NOT NULL, "
+                "confidence REAL, "
+                "created TEXT NOT NULL)"
+            )
+            # "id" is a stable row key: search.py indexes page text by it
+            # (an implicit rowid may change on VACUUM)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+            if columns and "id" not in columns:
+                conn.execute("ALTER TABLE pages RENAME TO pages_without_id")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "id INTEGER PRIMARY KEY, "
+                "agreement_id TEXT NOT NULL, "
+                "page INTEGER NOT NULL, "
+                "source TEXT NOT NULL, "
+                "text TEXT NOT NULL, "
+                "confidence REAL, "
+                "words BLOB, "
+                "UNIQUE (agreement_id, page))"
+            )
+            if columns and "id" not in columns:
+                conn.execute(
+                    "INSERT INTO pages (agreement_id, page, source, text, confidence, words) "
+                    "SELECT agreement_id, page, source, text, confidence, words FROM pages_without_id"
+                )
+                conn.execute("DROP TABLE pages_without_id")
+
+    def _put(self, conn, agreement_id, pages, ocr_settings):
+        confidence = mean_confidence([word for page in pages for word in page.get("words") or []])
+        conn.execute("DELETE FROM pages WHERE agreement_id = ?", (agreement_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (agreement_id, ocr_settings, pages, confidence, created) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (agreement_id, ocr_settings, len(pages), confidence, datetime.now().isoformat()),
+        )
+        conn.executemany(
+            "INSERT INTO pages (agreement_id, page, source, text, confidence, words) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (agreement_id, page["page"], page["source"], page["text"], page.get("confidence"),
+                 _pack_words(page["words"]) if page.get("words") else None)
+                for page in pages
+            ],
+        )
+
+    def put(self, agreement_id, pages, ocr_settings):
+        """Store (or replace) the pages of one agreement."""
+        with self._db.write() as conn:
+            self._put(conn, agreement_id, pages, ocr_settings)
+
+    def put_many(self, artifacts, ocr_settings):
+        """Store {agreement_id: pages} in one transaction."""
+        with self._db.write() as conn:
+            for agreement_id, pages in artifacts.items():
+                self._put(conn, agreement_id, pages, ocr_settings)
+
+    def get(self, agreement_id, words=True):
+        """{"agreement_id", "ocr_settings", "confidence", "created", "pages"} or None.
+
+        With words=False the word boxes are not decompressed (pages get []).
+        """
+        conn = self._db.connect()
+        row = conn.execute(
+            "SELECT ocr_settings, confidence, created FROM documents WHERE agreement_id = ?", (agreement_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        pages = [
+            {"page": page, "source": source, "text": text, "confidence": confidence,
+             "words": _unpack_words(blob) if words else []}
+            for page, source, text, confidence, blob in conn.execute(
+                "SELECT page, source, text, confidence, words FROM pages WHERE agreement_id = ? ORDER BY page",
+                (agreement_id,),
+            )
+        ]
+        return {"agreement_id": agreement_id, "ocr_settings": row[0], "confidence": row[1],
+                "created": row[2], "pages": pages}
+
+    def pages(self, agreement_id, ocr_settings=None):
+        """Pages of an agreement, or None if missing or made with other OCR settings."""
+        artifact = self.get(agreement_id)
+        if artifact is None or (ocr_settings is not None and artifact["ocr_settings"] != ocr_settings):
+            return None
+        return artifact["pages"]
+
+    def stats(self):
+        """Documents, pages and stored bytes of text and compressed word boxes."""
+        conn = self._db.connect()
+        documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        pages, text_bytes, word_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(text AS BLOB))), 0), COALESCE(SUM(LENGTH(words)), 0) FROM pages"
+        ).fetchone()
+        return {"documents": documents, "pages": pages, "text_bytes": text_bytes, "word_bytes": word_bytes}
@@ -0,0 +1,113 @@
+"""
+Prompt compaction: pick the parts of a lease worth sending to the model.
+
+OCR transcripts are mostly boilerplate clauses; the terms we extract sit in a
+handful of places. The text is cut into overlapping windows of lines, and
+each window is scored per requested field by its keywords, with a keyword
+counting double when a value (a number, date or percentage) follows within
+a few words. select_passages() first takes the best window for each field,
+then fills the remaining token budget with the highest-scoring windows (the
+rest in document order), and returns the chosen lines in their original
+order.
+"""
+
+import os
+import re
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+WINDOW_LINES = 4
+WINDOW_STRIDE = 2
+# Characters of value-like text after a keyword that count as "near"
+PROXIMITY_CHARS = 60
+
+FIELD_KEYWORDS = {
+    "tenant_name": ["tenant", "lessee", "m/s", "hereinafter", "between"],
+    "area_sqft": ["sq. ft", "sq ft", "sqft", "square feet", "square foot", "admeasuring", "measuring", "carpet area", "area"],
+    "floor": ["floor"],
+    "building": ["building", "premises", "situated", "jp classic", "jp-classic", "silver software", "silver-software"],
+    "period_of_rent": ["period", "term", "tenure", "years", "months"],
+    "rent_amount": ["rent", "per sq", "per square", "per month", "rs."],
+    "maintenance": ["maintenance", "cam charges", "common area"],
+    "rent_escalation": ["escalation", "escalate", "increase", "enhance"],
+    "agreement_start_date": ["commencement", "commence", "start", "effective from", "with effect"],
+    "agreement_expiry_date": ["expiry", "expire", "expiration", "end date", "terminate", "until"],
+    "lock_in_period": ["lock-in", "lock in", "lockin"],
+    "lock_in_period_end_date": ["lock-in", "lock in", "lockin"],
+    "rental_period_greater_than_lock_in_period": ["lock-in", "lock in", "period"],
+    "next_rent_escalation": ["escalation", "next", "anniversary"],
+}
+
+_KEYWORD_PATTERNS = {
+    field: re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+    for field, keywords in FIELD_KEYWORDS.items()
+}
+_VALUE = re.compile(r'\d')
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+def score_window(window, field):
+    """Keyword score of one window for one field."""
+    pattern = _KEYWORD_PATTERNS.get(field)
+    if pattern is None:
+        return 0
+    score = 0
+    for match in pattern.finditer(window):
+        nearby = window[match.end():match.end() + PROXIMITY_CHARS]
+        score += 2 if _VALUE.search(nearby) else 1
+    return score
+
+def _windows(lines):
+    """(first line, last line + 1) of each overlapping window."""
+    if len(lines) <= WINDOW_LINES:
+        return [(0, len(lines))]
+    starts = list(range(0, len(lines) - WINDOW_LINES + 1, WINDOW_STRIDE))
+    if starts[-1] + WINDOW_LINES < len(lines):
+        starts.append(len(lines) - WINDOW_LINES)
+    return [(start, start + WINDOW_LINES) for start in starts]
+
+def select_passages(text, fields, token_budget=PROMPT_TOKEN_BUDGET):
+    """The parts of `text` most relevant to `fields`, within `token_budget`.
+
+    Returns the text unchanged if it already fits. Non-adjacent passages are
+    separated by a "..." line.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+    lines = [line for line in text.splitlines() if line.strip()]
+    windows = _windows(lines)
+    texts = ["\n".join(lines[start:end]) for start, end in windows]
+    scores = [[score_window(window, field) for field in fields] for window in texts]
+
+    chosen = set()
+    used = 0
+
+    def take(index):
+        nonlocal used
+        start, end = windows[index]
+        new_lines = [i for i in range(start, end) if i not in chosen]
+        cost = sum(estimate_tokens(lines[i]) for i in new_lines)
+        if used + cost > token_budget:
+            return
+        chosen.update(new_lines)
+        used += cost
+
+    # The best window for each field first, so every field gets some context
+    for position in range(len(fields)):
+        best = max(range(len(windows)), key=lambda i: scores[i][position])
+        if scores[best][position] > 0:
+            take(best)
+    # Then whatever else scores highest, and any budget left over goes to
+    # the rest of the text in document order
+    for index in sorted(range(len(windows)), key=lambda i: sum(scores[i]), reverse=True):
+        take(index)
+
+    passages = []
+    previous = None
+    for i in sorted(chosen):
+        if previous is not None and i != previous + 1:
+            passages.append("...")
+        passages.append(lines[i])
+        previous = i
+    return "\n".join(passages)
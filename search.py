@@ -0,0 +1,204 @@
+"""
+Full-text clause search over the OCR text of stored agreements.
+
+Each page of an agreement's OCR artifacts is a row of an SQLite FTS5 table
+(unicode61 tokens, case- and accent-insensitive), so "canteen maintenance"
+finds a lease whichever page the clause is on. The FTS5 table lives in the
+OCR artifacts database as an external-content index over its pages table:
+page text is stored once, and triggers update the index whenever artifacts
+are stored or replaced. Which agreements are searchable, and their status,
+is kept at ingest: the upload paths add new agreements, and archiving or
+restoring only changes a document's status, so archived agreements stay
+searchable. flask --app app reindex rebuilds it from the stored artifacts.
+
+Queries are user text, not FTS5 syntax: words are ANDed, "double quotes"
+make a phrase and a trailing * matches a prefix (escalat* finds escalation
+and escalations; words are not stemmed, so clause wording matches as
+written). Results are ranked by the BM25 score of an agreement's
+best-matching page and carry highlighted snippets of its matching pages.
+"""
+
+import re
+import html
+from datetime import datetime
+
+from storage import SQLiteConnections
+
+SEARCH_STATUSES = ("active", "archived")
+SNIPPET_TOKENS = 16
+SNIPPETS_PER_AGREEMENT = 3
+
+# Snippet highlight markers; private-use characters cannot occur in OCR text
+# and survive HTML escaping, so they are swapped for <mark> afterwards
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+_QUERY_TERMS = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+def fts_query(query):
+    """FTS5 MATCH expression for a user query, or "" if it has no words.
+
+    Every word or "phrase" becomes a quoted FTS5 string, so operators and
+    punctuation in the query are matched as text rather than parsed.
+    """
+    terms = []
+    for phrase, word in _QUERY_TERMS.findall(query):
+        words = _WORD.findall(phrase if phrase else word)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if word.endswith("*") and not phrase:
+            term += "*"
+        terms.append(term)
+    return " ".join(terms)
+
+def highlight(snippet):
+    """One-line HTML snippet with its match markers turned into <mark> tags."""
+    return html.escape(" ".join(snippet.split())).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+class SearchIndex:
+    """SQLite FTS5 index of OCR artifact pages with per-agreement status."""
+
+    def __init__(self, artifacts):
+        # The index reads page text from the artifact store's pages table
+        self.db_path = artifacts.db_path
+        self._db = SQLiteConnections(self.db_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._db.write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_documents ("
+                "agreement_id TEXT PRIMARY KEY, "
+                "tenant_name TEXT NOT NULL DEFAULT '', "
+                "status TEXT NOT NULL, "
+                "indexed_at TEXT NOT NULL)"
+            )
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'page_index'").fetchone()
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS page_index USING fts5("
+                "text, content='pages', content_rowid='id', tokenize='unicode61')"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS page_index_insert AFTER INSERT ON pages BEGIN "
+                "INSERT INTO page_index (rowid, text) VALUES (new.id, new.text); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS page_index_delete AFTER DELETE ON pages BEGIN "
+                "INSERT INTO page_index (page_index, rowid, text) VALUES ('delete', old.id, old.text); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS page_index_update AFTER UPDATE ON pages BEGIN "
+                "INSERT INTO page_index (page_index, rowid, text) VALUES ('delete', old.id, old.text); "
+                "INSERT INTO page_index (rowid, text) VALUES (new.id, new.text); END"
+            )
+            if not exists:
+                # Index the pages stored before the index was created
+                conn.execute("INSERT INTO page_index (page_index) VALUES ('rebuild')")
+
+    def _add(self, conn, agreement, status):
+        conn.execute(
+            "INSERT OR REPLACE INTO search_documents (agreement_id, tenant_name, status, indexed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (agreement["id"], agreement.get("tenant_name") or "", status, datetime.now().isoformat()),
+        )
+
+    def add(self, agreement, status="active"):
+        """Make an agreement's stored artifact pages searchable."""
+        with self._db.write() as conn:
+            self._add(conn, agreement, status)
+
+    def add_many(self, agreements, status="active"):
+        """add() for many agreements in one transaction."""
+        with self._db.write() as conn:
+            for agreement in agreements:
+                self._add(conn, agreement, status)
+
+    def set_status(self, agreement_id, status):
+        """Mark an indexed agreement active or archived; its pages stay indexed."""
+        with self._db.write() as conn:
+            conn.execute("UPDATE search_documents SET status = ? WHERE agreement_id = ?", (status, agreement_id))
+
+    def update_tenant_names(self, agreements):
+        """Refresh the tenant names shown in results after agreements were edited."""
+        with self._db.write() as conn:
+            conn.executemany(
+                "UPDATE search_documents SET tenant_name = ? WHERE agreement_id = ?",
+                [(agreement.get("tenant_name") or "", agreement["id"]) for agreement in agreements],
+            )
+
+    def clear(self):
+        """Forget every agreement and rebuild the page index from the artifacts."""
+        with self._db.write() as conn:
+            conn.execute("DELETE FROM search_documents")
+            conn.execute("INSERT INTO page_index (page_index) VALUES ('rebuild')")
+
+    def search(self, query, limit=20, status=None):
+        """Agreements matching `query`, best first.
+
+        Each result is {"agreement_id", "tenant_name", "status", "score",
+        "snippets": [{"page", "snippet"}]} with HTML snippets in which the
+        matched words are wrapped in <mark>. `status` limits results to
+        active or archived agreements.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        conn = self._db.connect()
+        results = {}
+        statuses = {}
+        # ORDER BY rank (the page's bm25() score, lower is better) is sorted
+        # inside FTS5, so snippets are only built for the pages fetched.
+        # Fetch best pages until `limit` agreements are found, widening the
+        # window when pages of the same or filtered-out agreements use it up.
+        fetch = limit * SNIPPETS_PER_AGREEMENT
+        offset = 0
+        while len(results) < limit:
+            # The subquery keeps ORDER BY rank LIMIT inside FTS5; pages then
+            # maps each hit back to its agreement and page number
+            rows = conn.execute(
+                "SELECT pages.agreement_id, pages.page, hits.rank, hits.snippet FROM ("
+                f"SELECT rowid, rank, snippet(page_index, 0, ?, ?, '...', {SNIPPET_TOKENS}) AS snippet "
+                "FROM page_index WHERE page_index MATCH ? ORDER BY rank LIMIT ? OFFSET ?"
+                ") AS hits JOIN pages ON pages.id = hits.rowid ORDER BY hits.rank",
+                (_MARK_START, _MARK_END, match, fetch, offset),
+            ).fetchall()
+            unknown = {row[0] for row in rows} - statuses.keys()
+            if unknown:
+                placeholders = ", ".join("?" * len(unknown))
+                for agreement_id, tenant_name, document_status in conn.execute(
+                    f"SELECT agreement_id, tenant_name, status FROM search_documents WHERE agreement_id IN ({placeholders})",
+                    list(unknown),
+                ):
+                    statuses[agreement_id] = (tenant_name, document_status)
+            for agreement_id, page, rank, snippet in rows:
+                tenant_name, document_status = statuses.get(agreement_id, ("", None))
+                if document_status is None or (status and document_status != status):
+                    continue
+                result = results.get(agreement_id)
+                if result is None:
+                    if len(results) >= limit:
+                        continue
+                    result = results[agreement_id] = {
+                        "agreement_id": agreement_id,
+                        "tenant_name": tenant_name,
+                        "status": document_status,
+                        "score": round(-rank, 3),
+                        "snippets": [],
+                    }
+                if len(result["snippets"]) < SNIPPETS_PER_AGREEMENT:
+                    result["snippets"].append({"page": page, "snippet": highlight(snippet)})
+            if len(rows) < fetch:
+                break
+            offset += fetch
+            fetch *= 2
+        return list(results.values())
+
+    def stats(self):
+        conn = self._db.connect()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM search_documents GROUP BY status").fetchall())
+        pages = conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE agreement_id IN (SELECT agreement_id FROM search_documents)"
+        ).fetchone()[0]
+        return {"documents": counts, "pages": pages}
@@ -0,0 +1,838 @@
+"""
+Agreement storage backends for Tenant Dashboard.
+
+Agreements used to live only in agreements_data.json, which was parsed and
+rewritten in full for every upload, archive and restore. The AgreementStore
+interface lets the application insert, update and delete single records
+without touching the rest of the portfolio. The JSON files remain the
+import/export format.
+
+Several gunicorn workers share these files, so every JSON write goes to a
+temporary file that is atomically renamed over the target while holding an
+fcntl advisory lock on a sidecar ".lock" file. Readers never take the lock:
+the rename guarantees they see either the old or the new document. Each
+write also bumps a version counter that callers can use to detect changes.
+"""
+
+import os
+import json
+import base64
+import logging
+import operator
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from alerts import expiry_iso
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+def _text(field):
+    return lambda agreement: str(agreement.get(field, "") or "")
+
+# Columns kept alongside the JSON record so lookups and ordering can use indexes
+INDEXED_COLUMNS = {
+    "tenant_name": _text("tenant_name"),
+    "tenant_key": lambda agreement: str(agreement.get("tenant_name", "") or "").strip().lower(),
+    "building": _text("building"),
+    "floor": _text("floor"),
+    "agreement_expiry_date": _text("agreement_expiry_date"),
+    "expiry_iso": expiry_iso,
+}
+
+# Comparisons allowed in expiry filters
+EXPIRY_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+# API sort keys and the column each one orders by
+SORT_KEYS = {
+    "upload": "seq",
+    "expiry": "expiry_iso",
+    "tenant_name": "tenant_key",
+    "building": "building",
+    "floor": "floor",
+}
+
+class _PathLock:
+    """Process-wide state for one lock file."""
+
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+def _get_path_lock(path):
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        if key not in _path_locks:
+            _path_locks[key] = _PathLock()
+        return _path_locks[key]
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path across threads and worker processes.
+
+    The lock is re-entrant within a thread, so a caller can wrap a whole
+    load-modify-save sequence around helpers that lock on their own.
+    """
+    state = _get_path_lock(path)
+    with state.rlock:
+        if state.depth == 0:
+            state.fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(state.fd, fcntl.LOCK_EX)
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(state.fd, fcntl.LOCK_UN)
+                os.close(state.fd)
+                state.fd = None
+
+def read_json_file(path, default):
+    """Read a JSON document, returning default if the file does not exist."""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def atomic_write_json(path, data):
+    """Write a JSON document to a temp file and rename it over path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def read_version(path):
+    """Return the write counter for a JSON file (0 if it was never written)."""
+    try:
+        with open(path + ".version", 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def write_json_file(path, data):
+    """Atomically write a JSON document and bump its version counter."""
+    with file_lock(path):
+        atomic_write_json(path, data)
+        version = read_version(path) + 1
+        atomic_write_json(path + ".version", version)
+    return version
+
+class AgreementStore:
+    """Interface shared by all agreement storage backends."""
+
+    def all(self):
+        """Return every agreement in insertion order."""
+        raise NotImplementedError
+
+    def get(self, agreement_id):
+        """Return the agreement with the given id, or None."""
+        raise NotImplementedError
+
+    def insert(self, agreement):
+        """Add a single agreement."""
+        raise NotImplementedError
+
+    def insert_many(self, agreements):
+        """Add several agreements in one write."""
+        raise NotImplementedError
+
+    def update(self, agreement):
+        """Replace the stored agreement that has the same id."""
+        raise NotImplementedError
+
+    def update_many(self, agreements):
+        """Replace several stored agreements (matched by id) in one write.
+
+        Returns the number of agreements updated.
+        """
+        raise NotImplementedError
+
+    def delete(self, agreement_id):
+        """Remove an agreement. Returns True if a record was removed."""
+        raise NotImplementedError
+
+    def pop(self, agreement_id):
+        """Atomically remove and return an agreement, or None if absent.
+
+        Only one of several concurrent callers can pop the same record, which
+        makes archive/restore safe across workers.
+        """
+        raise NotImplementedError
+
+    def version(self):
+        """Return a counter that changes whenever the collection is written."""
+        raise NotImplementedError
+
+    def replace_all(self, agreements):
+        """Replace the whole collection (bulk imports only)."""
+        raise NotImplementedError
+
+    def count(self):
+        return len(self.all())
+
+    def query(self, filters=None, sort="upload", descending=False, limit=50, cursor=None):
+        """Return (agreements, next_cursor) matching filters, in sort order.
+
+        filters may contain building, floor, tenant_prefix, "expiry" (a list
+        of (operator, ISO date) pairs) and include_missing_expiry. This
+        fallback scans every record; indexed backends override it.
+        """
+        filters = filters or {}
+        prefix = (filters.get("tenant_prefix") or "").strip().lower()
+        extract = INDEXED_COLUMNS.get(SORT_KEYS[sort])
+
+        rows = []
+        for seq, agreement in enumerate(self.all(), start=1):
+            if filters.get("building") and agreement.get("building") != filters["building"]:
+                continue
+            if filters.get("floor") and agreement.get("floor") != filters["floor"]:
+                continue
+            if prefix and not INDEXED_COLUMNS["tenant_key"](agreement).startswith(prefix):
+                continue
+            if filters.get("expiry"):
+                expiry = expiry_iso(agreement)
+                in_range = bool(expiry) and all(EXPIRY_OPERATORS[op](expiry, value) for op, value in filters["expiry"])
+                if not in_range and not (filters.get("include_missing_expiry") and not expiry):
+                    continue
+            rows.append((extract(agreement) if extract else seq, seq, agreement))
+
+        rows.sort(key=lambda row: (row[0], row[1]), reverse=descending)
+        if cursor is not None:
+            key = tuple(decode_query_cursor(cursor, sort, descending))
+            rows = [row for row in rows if ((row[0], row[1]) < key if descending else (row[0], row[1]) > key)]
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([sort, descending, page[-1][0], page[-1][1]])
+        return [agreement for _, _, agreement in page], next_cursor
+
+    def import_json(self, path):
+        """Load agreements from a JSON export, replacing the current contents."""
+        agreements = read_json_file(path, [])
+        self.replace_all(agreements)
+        logging.info(f"Imported {len(agreements)} agreements from {path}")
+        return len(agreements)
+
+    def export_json(self, path):
+        """Write all agreements to a JSON file."""
+        agreements = self.all()
+        write_json_file(path, agreements)
+        logging.info(f"Exported {len(agreements)} agreements to {path}")
+        return len(agreements)
+
+class JSONAgreementStore(AgreementStore):
+    """Legacy backend that keeps the whole collection in one JSON file.
+
+    Every mutation is a read-modify-write performed under file_lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def all(self):
+        return read_json_file(self.path, [])
+
+    def get(self, agreement_id):
+        for agreement in self.all():
+            if agreement.get("id") == agreement_id:
+                return agreement
+        return None
+
+    def insert(self, agreement):
+        with file_lock(self.path):
+            agreements = self.all()
+            agreements.append(agreement)
+            write_json_file(self.path, agreements)
+
+    def insert_many(self, agreements):
+        with file_lock(self.path):
+            write_json_file(self.path, self.all() + list(agreements))
+
+    def update(self, agreement):
+        with file_lock(self.path):
+            agreements = self.all()
+            for i, existing in enumerate(agreements):
+                if existing.get("id") == agreement.get("id"):
+                    agreements[i] = agreement
+                    write_json_file(self.path, agreements)
+                    return True
+        return False
+
+    def update_many(self, agreements):
+        updates = {agreement.get("id"): agreement for agreement in agreements}
+        with file_lock(self.path):
+            stored = self.all()
+            updated = 0
+            for i, existing in enumerate(stored):
+                if existing.get("id") in updates:
+                    stored[i] = updates[existing.get("id")]
+                    updated += 1
+            if updated:
+                write_json_file(self.path, stored)
+        return updated
+
+    def delete(self, agreement_id):
+        return self.pop(agreement_id) is not None
+
+    def pop(self, agreement_id):
+        with file_lock(self.path):
+            agreements = self.all()
+            for i, existing in enumerate(agreements):
+                if existing.get("id") == agreement_id:
+                    removed = agreements.pop(i)
+                    write_json_file(self.path, agreements)
+                    return removed
+        return None
+
+    def replace_all(self, agreements):
+        write_json_file(self.path, agreements)
+
+    def version(self):
+        return read_version(self.path)
+
+class SQLiteConnections:
+    """Per-thread connections to one SQLite database, shared by the SQLite-backed stores.
+
+    sqlite3 connections cannot be shared across threads, and must not be
+    carried over into a forked gunicorn worker, so one is cached per thread
+    and pid. Every connection is in autocommit mode with WAL journaling.
+    """
+
+    def __init__(self, db_path, row_factory=None):
+        self.db_path = db_path
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def write(self):
+        """Run a write transaction, rolled back if the block raises."""
+        conn = self.connect()
+        # IMMEDIATE takes the write lock up front, so a read inside the
+        # transaction cannot be invalidated by another worker's write
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+class SQLiteAgreementStore(AgreementStore):
+    """SQLite backend with one row per agreement.
+
+    Each agreement is stored as a JSON document, with the id and the values in
+    INDEXED_COLUMNS copied into indexed columns. SQLite's own locking makes the
+    writes safe across worker processes; every write transaction also bumps a
+    per-table version counter in the store_meta table.
+    """
+
+    def __init__(self, db_path, table="agreements"):
+        self.db_path = db_path
+        self.table = table
+        self._db = SQLiteConnections(db_path)
+        self._column_list = ", ".join(["id", *INDEXED_COLUMNS, "data"])
+        self._placeholders = ", ".join("?" * (len(INDEXED_COLUMNS) + 2))
+        self._create_schema()
+
+    def _connect(self):
+        return self._db.connect()
+
+    @contextmanager
+    def _write(self):
+        """Run a write transaction that also bumps the table version."""
+        with self._db.write() as conn:
+            changes_before = conn.total_changes
+            yield conn
+            if conn.total_changes != changes_before:
+                conn.execute(
+                    "UPDATE store_meta SET version = version + 1 WHERE name = ?", (self.table,)
+                )
+
+    def _create_schema(self):
+        with self._write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_meta ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("INSERT OR IGNORE INTO store_meta (name, version) VALUES (?, 0)", (self.table,))
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT NOT NULL UNIQUE, "
+                "data TEXT NOT NULL)"
+            )
+            # Databases created by older versions may lack newer columns;
+            # add them and backfill from the stored documents
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+            missing = [column for column in INDEXED_COLUMNS if column not in existing]
+            for column in missing:
+                conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {column} TEXT")
+            if missing:
+                rows = conn.execute(f"SELECT seq, data FROM {self.table}").fetchall()
+                conn.executemany(
+                    f"UPDATE {self.table} SET {', '.join(f'{c} = ?' for c in INDEXED_COLUMNS)} WHERE seq = ?",
+                    [(*self._column_values(json.loads(data)), seq) for seq, data in rows],
+                )
+            # The UNIQUE constraint already gives "id" its index. An index on a
+            # single column also orders ties by seq (the rowid), which is what
+            # keyset pagination needs.
+            for column in INDEXED_COLUMNS:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{column} "
+                    f"ON {self.table} ({column})"
+                )
+
+    def _column_values(self, agreement):
+        return [extract(agreement) for extract in INDEXED_COLUMNS.values()]
+
+    def _row_values(self, agreement):
+        return (
+            agreement.get("id", ""),
+            *self._column_values(agreement),
+            json.dumps(agreement, ensure_ascii=False),
+        )
+
+    def all(self):
+        rows = self._connect().execute(f"SELECT data FROM {self.table} ORDER BY seq")
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, agreement_id):
+        row = self._connect().execute(
+            f"SELECT data FROM {self.table} WHERE id = ?", (agreement_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def insert(self, agreement):
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT INTO {self.table} ({self._column_list}) VALUES ({self._placeholders})",
+                self._row_values(agreement),
+            )
+
+    def insert_many(self, agreements):
+        with self._write() as conn:
+            conn.executemany(
+                f"INSERT INTO {self.table} ({self._column_list}) VALUES ({self._placeholders})",
+                [self._row_values(a) for a in agreements],
+            )
+
+    def update(self, agreement):
+        agreement_id, *values = self._row_values(agreement)
+        assignments = ", ".join(f"{column} = ?" for column in [*INDEXED_COLUMNS, "data"])
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+                (*values, agreement_id),
+            )
+        return cursor.rowcount > 0
+
+    def update_many(self, agreements):
+        assignments = ", ".join(f"{column} = ?" for column in [*INDEXED_COLUMNS, "data"])
+        rows = []
+        for agreement in agreements:
+            agreement_id, *values = self._row_values(agreement)
+            rows.append((*values, agreement_id))
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany(f"UPDATE {self.table} SET {assignments} WHERE id = ?", rows)
+            updated = conn.total_changes - before
+        return updated
+
+    def delete(self, agreement_id):
+        with self._write() as conn:
+            cursor = conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (agreement_id,))
+        return cursor.rowcount > 0
+
+    def pop(self, agreement_id):
+        with self._write() as conn:
+            row = conn.execute(
+                f"SELECT data FROM {self.table} WHERE id = ?", (agreement_id,)
+            ).fetchone()
+            if row:
+                conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (agreement_id,))
+        return json.loads(row[0]) if row else None
+
+    def replace_all(self, agreements):
+        with self._write() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({self._column_list}) VALUES ({self._placeholders})",
+                [self._row_values(a) for a in agreements],
+            )
+
+    def count(self):
+        return self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def version(self):
+        row = self._connect().execute(
+            "SELECT version FROM store_meta WHERE name = ?", (self.table,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def query(self, filters=None, sort="upload", descending=False, limit=50, cursor=None):
+        filters = filters or {}
+        clauses, params = [], []
+        for field in ("building", "floor"):
+            if filters.get(field):
+                clauses.append(f"{field} = ?")
+                params.append(filters[field])
+        if filters.get("tenant_prefix"):
+            # A range on the lowercased name can use idx_<table>_tenant_key
+            prefix = filters["tenant_prefix"].strip().lower()
+            clauses.append("tenant_key >= ? AND tenant_key < ?")
+            params.extend([prefix, prefix + "\uffff"])
+        expiry_clauses = []
+        for op, value in filters.get("expiry", []):
+            if op not in EXPIRY_OPERATORS:
+                raise ValueError(f"Unsupported expiry operator: {op}")
+            expiry_clauses.append(f"expiry_iso {op} ?")
+            params.append(value)
+        if expiry_clauses:
+            expiry_sql = " AND ".join(["expiry_iso != ''", *expiry_clauses])
+            if filters.get("include_missing_expiry"):
+                expiry_sql = f"(({expiry_sql}) OR expiry_iso = '')"
+            clauses.append(expiry_sql)
+
+        column = SORT_KEYS[sort]
+        if cursor is not None:
+            value, seq = decode_query_cursor(cursor, sort, descending)
+            clauses.append(f"({column}, seq) {'<' if descending else '>'} (?, ?)")
+            params.extend([value, seq])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        rows = self._connect().execute(
+            f"SELECT {column}, seq, data FROM {self.table} {where} "
+            f"ORDER BY {column} {direction}, seq {direction} LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        agreements = [json.loads(data) for _, _, data in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last_value, last_seq, _ = rows[limit - 1]
+            next_cursor = encode_cursor([sort, descending, last_value, last_seq])
+        return agreements, next_cursor
+
+class SegmentedArchiveStore(AgreementStore):
+    """Append-mostly archive split into one JSON segment per archive month.
+
+    Layout of the archive directory:
+        manifest.json   segment names and record counts
+        ids.db          SQLite table mapping each agreement id to its segment
+        2025-08.json    agreements archived in August 2025
+        ...
+
+    Archiving or restoring an agreement rewrites only its segment and the
+    small manifest, get() reads only the agreement's segment, and page()
+    reads only the segments needed for one page.
+    """
+
+    MANIFEST = "manifest.json"
+    ID_INDEX = "ids.db"
+    UNDATED = "0000-00"  # Legacy records without archived_timestamp sort last
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, self.MANIFEST)
+        self._ids = SQLiteConnections(os.path.join(directory, self.ID_INDEX))
+        with self._ids.write() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS archive_ids (id TEXT PRIMARY KEY, segment TEXT NOT NULL)")
+        self._check_id_index()
+
+    def _check_id_index(self):
+        """Rebuild the id index if it disagrees with the segments.
+
+        That happens when upgrading from a manifest that held the id map
+        itself, or after a crash between a segment write and its index
+        update.
+        """
+        with file_lock(self.manifest_path):
+            manifest = self._read_manifest()
+            indexed = self._ids.connect().execute("SELECT COUNT(*) FROM archive_ids").fetchone()[0]
+            if "ids" not in manifest and indexed == sum(manifest["segments"].values()):
+                return
+            with self._ids.write() as conn:
+                conn.execute("DELETE FROM archive_ids")
+                for name in manifest["segments"]:
+                    self._index_ids(conn, name, self._read_segment(name))
+            manifest.pop("ids", None)
+            write_json_file(self.manifest_path, manifest)
+
+    def _segment_name(self, agreement):
+        return (agreement.get("archived_timestamp") or "")[:7] or self.UNDATED
+
+    def _segment_path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read_manifest(self):
+        return read_json_file(self.manifest_path, {"segments": {}})
+
+    def _read_segment(self, name):
+        return read_json_file(self._segment_path(name), [])
+
+    def _write_segment(self, manifest, name, records):
+        """Write one segment and record its size in the manifest."""
+        # Callers hold the manifest lock, which covers every segment
+        if records:
+            atomic_write_json(self._segment_path(name), records)
+            manifest["segments"][name] = len(records)
+        else:
+            manifest["segments"].pop(name, None)
+            if os.path.exists(self._segment_path(name)):
+                os.remove(self._segment_path(name))
+
+    @staticmethod
+    def _index_ids(conn, name, agreements):
+        conn.executemany(
+            "INSERT OR REPLACE INTO archive_ids (id, segment) VALUES (?, ?)",
+            [(agreement.get("id", ""), name) for agreement in agreements],
+        )
+
+    def _segment_of(self, agreement_id):
+        row = self._ids.connect().execute(
+            "SELECT segment FROM archive_ids WHERE id = ?", (agreement_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _sort_key(agreement):
+        return (agreement.get("archived_timestamp") or "", agreement.get("id") or "")
+
+    def all(self):
+        manifest = self._read_manifest()
+        agreements = []
+        for name in sorted(manifest["segments"]):
+            agreements.extend(self._read_segment(name))
+        agreements.sort(key=self._sort_key)
+        return agreements
+
+    def get(self, agreement_id):
+        name = self._segment_of(agreement_id)
+        if name is None:
+            return None
+        for agreement in self._read_segment(name):
+            if agreement.get("id") == agreement_id:
+                return agreement
+        return None
+
+    def insert(self, agreement):
+        self.insert_many([agreement])
+
+    def insert_many(self, agreements):
+        segments = {}
+        for agreement in agreements:
+            segments.setdefault(self._segment_name(agreement), []).append(agreement)
+        with file_lock(self.manifest_path):
+            manifest = self._read_manifest()
+            with self._ids.write() as conn:
+                for name, new_records in segments.items():
+                    self._write_segment(manifest, name, self._read_segment(name) + new_records)
+                    self._index_ids(conn, name, new_records)
+            write_json_file(self.manifest_path, manifest)
+
+    def update(self, agreement):
+        return self.update_many([agreement]) > 0
+
+    def update_many(self, agreements):
+        updates = {agreement.get("id"): agreement for agreement in agreements}
+        updated = 0
+        with file_lock(self.manifest_path):
+            manifest = self._read_manifest()
+            names = {self._segment_of(agreement_id) for agreement_id in updates} - {None}
+            for name in names:
+                records = self._read_segment(name)
+                for i, existing in enumerate(records):
+                    if existing.get("id") in updates:
+                        records[i] = updates[existing.get("id")]
+                        updated += 1
+                self._write_segment(manifest, name, records)
+            if names:
+                write_json_file(self.manifest_path, manifest)
+        return updated
+
+    def delete(self, agreement_id):
+        return self.pop(agreement_id) is not None
+
+    def pop(self, agreement_id):
+        with file_lock(self.manifest_path):
+            name = self._segment_of(agreement_id)
+            if name is None:
+                return None
+            manifest = self._read_manifest()
+            records = self._read_segment(name)
+            for i, existing in enumerate(records):
+                if existing.get("id") == agreement_id:
+                    removed = records.pop(i)
+                    with self._ids.write() as conn:
+                        self._write_segment(manifest, name, records)
+                        conn.execute("DELETE FROM archive_ids WHERE id = ?", (agreement_id,))
+                    write_json_file(self.manifest_path, manifest)
+                    return removed
+        return None
+
+    def replace_all(self, agreements):
+        segments = {}
+        for agreement in agreements:
+            segments.setdefault(self._segment_name(agreement), []).append(agreement)
+        with file_lock(self.manifest_path):
+            manifest = self._read_manifest()
+            with self._ids.write() as conn:
+                conn.execute("DELETE FROM archive_ids")
+                for name in set(manifest["segments"]) - set(segments):
+                    self._write_segment(manifest, name, [])
+                for name, records in segments.items():
+                    self._write_segment(manifest, name, records)
+                    self._index_ids(conn, name, records)
+            write_json_file(self.manifest_path, manifest)
+
+    def count(self):
+        return sum(self._read_manifest()["segments"].values())
+
+    def version(self):
+        return read_version(self.manifest_path)
+
+    def page(self, cursor=None, limit=25):
+        """Return (agreements, next_cursor), newest archived first.
+
+        The cursor is an opaque token for the last agreement on the previous
+        page; segments newer than it are never read.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        # The key is (archived_timestamp, id), both strings
+        if after is not None and (len(after) != 2 or not all(isinstance(part, str) for part in after)):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        results = []
+        for name in sorted(self._read_manifest()["segments"], reverse=True):
+            if after is not None and name > (after[0][:7] or self.UNDATED):
+                continue
+            records = sorted(self._read_segment(name), key=self._sort_key, reverse=True)
+            if after is not None:
+                records = [a for a in records if list(self._sort_key(a)) < after]
+            results.extend(records)
+            # One extra record tells us whether there is another page
+            if len(results) > limit:
+                break
+        page = results[:limit]
+        next_cursor = encode_cursor(self._sort_key(page[-1])) if len(results) > limit else None
+        return page, next_cursor
+
+def encode_cursor(key):
+    """Encode a sort key as an opaque, URL-safe pagination cursor."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(key, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
+
+def decode_query_cursor(cursor, sort, descending):
+    """Return the (value, seq) position stored in a query cursor."""
+    key = decode_cursor(cursor)
+    if len(key) != 4 or key[0] != sort or key[1] != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    # The position is a column value and a row seq, bound as query parameters
+    if not isinstance(key[2], (str, int, float, type(None))) or type(key[3]) is not int:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key[2], key[3]
+
+def create_agreement_store(backend, json_path, db_path, table="agreements"):
+    """Build the configured store.
+
+    A new SQLite store is seeded from json_path the first time it is opened, so
+    existing deployments keep their data when switching backends.
+    """
+    if backend == "json":
+        return JSONAgreementStore(json_path)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown agreement store backend: {backend}")
+
+    store = SQLiteAgreementStore(db_path, table=table)
+    if store.count() == 0 and os.path.exists(json_path):
+        try:
+            store.import_json(json_path)
+        except Exception as e:
+            logging.error(f"Error importing {json_path} into {db_path}: {e}")
+    return store
+
+def create_archive_store(directory, json_path):
+    """Build the segmented archive, seeding it from json_path on first use."""
+    store = SegmentedArchiveStore(directory)
+    if not os.path.exists(store.manifest_path) and os.path.exists(json_path):
+        try:
+            store.import_json(json_path)
+        except Exception as e:
+            logging.error(f"Error importing {json_path} into {directory}: {e}")
+    return store
+
+def main():
+    """Command line import/export between the JSON files and the stores."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import or export Tenant Dashboard agreements")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("json_path", help="JSON file to read from or write to")
+    parser.add_argument("--db", default=os.getenv("AGREEMENTS_DB", "agreements.db"))
+    parser.add_argument("--table", default="agreements")
+    parser.add_argument("--archive-dir", help="Use the segmented archive in this directory instead of the SQLite store")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.archive_dir:
+        store = SegmentedArchiveStore(args.archive_dir)
+    else:
+        store = SQLiteAgreementStore(args.db, table=args.table)
+    if args.action == "import":
+        store.import_json(args.json_path)
+    else:
+        store.export_json(args.json_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Tenant-name index for matching names that are written differently.
+
+Leases name the tenant as "M/S. MANA AND KIAS INFRASTRUCTURES LIMITED"
+while the Gmail settings say "Mana and Kias Infrastructures".
+normalize_tenant_name() folds both to the same key: lowercase, "&" as
+"and", punctuation as spaces, and no leading "M/s" / "Messrs" / "The" or
+trailing legal suffixes ("Pvt. Ltd.", "Private Limited", "LLP", ...).
+
+TenantIndex maps keys to values (Gmail addresses, agreement summaries):
+
+  exact  dict lookup of the normalized key, O(1)
+  fuzzy  Jaccard similarity of character trigrams; candidates come from
+         an inverted trigram index, reading only the postings of the
+         query's rarest trigrams that any name above the threshold must
+         share; matches below TENANT_MATCH_THRESHOLD are ignored
+"""
+
+import os
+import re
+import math
+
+TENANT_MATCH_THRESHOLD = float(os.getenv("TENANT_MATCH_THRESHOLD", "0.6"))
+
+# Fields that tell two agreements of the same tenant apart (another floor,
+# a renewal); a likely duplicate has no conflicting value in any of them
+DUPLICATE_FIELDS = ("building", "floor", "agreement_start_date")
+
+LEGAL_SUFFIXES = {
+    "limited", "ltd", "pvt", "private", "p", "llp", "llc", "plc", "inc", "incorporated", "opc",
+}
+_PREFIX = re.compile(r"^\s*(?:m\s*/\s*s|messrs|the)\b\.?\s*")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def normalize_tenant_name(name):
+    """Matching key of a tenant name ("" if nothing is left)."""
+    key = (name or "").lower().replace("&", " and ")
+    # "M/s. Messrs. The ..." may stack
+    while True:
+        stripped = _PREFIX.sub("", key, count=1)
+        if stripped == key:
+            break
+        key = stripped
+    words = _NON_WORD.sub(" ", key).split()
+    # Keep at least one word, so a company called "Private Ltd" still has a key
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+def trigrams(key):
+    """Character trigrams of a key, padded so word starts and ends count."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TenantIndex:
+    """Normalized tenant names -> values, with exact and trigram lookup."""
+
+    def __init__(self, entries=()):
+        self.values = {}
+        self._trigrams = {}
+        self._postings = {}
+        for name, value in entries:
+            self.add(name, value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, name, value):
+        key = normalize_tenant_name(name)
+        if not key:
+            return
+        if key not in self.values:
+            self.values[key] = []
+            grams = self._trigrams[key] = trigrams(key)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+        self.values[key].append(value)
+
+    def get(self, name):
+        """Values stored under exactly this name once normalized."""
+        return list(self.values.get(normalize_tenant_name(name), []))
+
+    def search(self, name, threshold=TENANT_MATCH_THRESHOLD, limit=5):
+        """[(score, key, values)] of names scoring at least `threshold`, best first.
+
+        An exact key match scores 1.0.
+        """
+        key = normalize_tenant_name(name)
+        if not key:
+            return []
+        matches = [(1.0, key, list(self.values[key]))] if key in self.values else []
+        grams = trigrams(key)
+        # A name scoring >= threshold shares at least ceil(threshold * |grams|)
+        # trigrams with the query, so it must contain one of the query's
+        # |grams| - that + 1 rarest trigrams; only their postings are read
+        rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        min_shared = max(1, math.ceil(threshold * len(grams)))
+        candidates = set()
+        for gram in rarest[:len(grams) - min_shared + 1]:
+            candidates.update(self._postings.get(gram, ()))
+        candidates.discard(key)
+        for candidate in candidates:
+            candidate_grams = self._trigrams[candidate]
+            shared = len(grams & candidate_grams)
+            score = shared / (len(grams) + len(candidate_grams) - shared)
+            if score >= threshold:
+                matches.append((round(score, 3), candidate, list(self.values[candidate])))
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches[:limit]
+
+    def match(self, name, threshold=TENANT_MATCH_THRESHOLD):
+        """(value, score) of the best-matching name, or (None, 0.0).
+
+        A fuzzy match is only returned when no other name scores the same,
+        so an ambiguous name is treated as unmatched.
+        """
+        exact = self.values.get(normalize_tenant_name(name))
+        if exact:
+            return exact[0], 1.0
+        matches = self.search(name, threshold, limit=2)
+        if not matches or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+            return None, 0.0
+        return matches[0][2][0], matches[0][0]
+
+def _conflicts(first, second, field):
+    a = str(first.get(field) or "").strip().lower()
+    b = str(second.get(field) or "").strip().lower()
+    return bool(a and b and a != b)
+
+def duplicate_summary(agreement):
+    """What a duplicate check needs to remember about a stored agreement."""
+    return {"id": agreement.get("id"), **{field: agreement.get(field, "") for field in DUPLICATE_FIELDS}}
+
+def likely_duplicates(agreement, indexes, threshold=TENANT_MATCH_THRESHOLD):
+    """Ids of agreements in `indexes` that are probably the same lease.
+
+    Indexes hold duplicate_summary() values. A candidate's tenant name must
+    match and none of DUPLICATE_FIELDS may differ.
+    """
+    found = []
+    for index in indexes:
+        for _, _, summaries in index.search(agreement.get("tenant_name", ""), threshold, limit=10):
+            for summary in summaries:
+                if summary["id"] == agreement.get("id") or summary["id"] in found:
+                    continue
+                if not any(_conflicts(agreement, summary, field) for field in DUPLICATE_FIELDS):
+                    found.append(summary["id"])
+    return found
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """app.py imported in an empty working directory.
+
+    Its stores, queue, caches and upload folder are created there, so tests
+    never touch the real data files.
+    """
+    workdir = tmp_path_factory.mktemp("app")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    os.makedirs("uploads")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("DEFAULT_ADMIN_PASSWORD", "test-password")
+        patch.setenv("OPENAI_API_KEY", "test")
+        import app
+        app.limiter.enabled = False
+        yield app
+    os.chdir(previous)
+
+@pytest.fixture
+def client(app_module):
+    client = app_module.app.test_client()
+    client.post("/login", data={"username": "admin", "password": "test-password"})
+    return client
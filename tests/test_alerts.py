@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import pytest
+
+from alerts import (
+    ALERT_STATUSES, AlertSnapshot, ExpiryIndex, agreement_alert_status, alert_expiry_filter, alert_thresholds,
+    alert_status_from_iso,
+)
+
+TODAY = date(2026, 1, 1)
+
+def expiring(agreement_id, days):
+    """An agreement expiring `days` after TODAY, with only the raw date stored."""
+    return {"id": agreement_id, "agreement_expiry_date": (TODAY + timedelta(days=days)).isoformat()}
+
+@pytest.mark.parametrize("days, status", [
+    (-5, "expired"),
+    (0, "expired"),
+    (1, "one_month"),
+    (30, "one_month"),
+    (31, "two_months"),
+    (60, "two_months"),
+    (61, "three_months"),
+    (90, "three_months"),
+    (91, ""),
+])
+def test_alert_status_windows(days, status):
+    thresholds = alert_thresholds(TODAY)
+    assert alert_status_from_iso((TODAY + timedelta(days=days)).isoformat(), thresholds) == status
+    assert agreement_alert_status(expiring("a", days), thresholds) == status
+
+def test_stored_parse_is_preferred():
+    agreement = {"agreement_expiry_date": "unparseable", "parsed_dates": {"agreement_expiry_date": "2025-12-01"}}
+    assert agreement_alert_status(agreement, alert_thresholds(TODAY)) == "expired"
+    assert agreement_alert_status({"id": "a"}, alert_thresholds(TODAY)) == ""
+
+def test_expiry_index_skips_missing_dates():
+    index = ExpiryIndex([expiring("a", 10), {"id": "b"}, {"agreement_expiry_date": "2026-01-02"}])
+    assert len(index) == 1
+
+def test_snapshot_matches_per_agreement_status():
+    agreements = [expiring(f"a{days}", days) for days in range(-3, 100, 7)] + [{"id": "undated"}]
+    snapshot = AlertSnapshot(agreements, TODAY)
+    thresholds = alert_thresholds(TODAY)
+    for agreement in agreements:
+        assert snapshot.status(agreement["id"]) == agreement_alert_status(agreement, thresholds)
+    assert set(snapshot.buckets) == set(ALERT_STATUSES)
+    assert snapshot.buckets["one_month"] == ["a4", "a11", "a18", "a25"]
+
+@pytest.mark.parametrize("status", ALERT_STATUSES)
+def test_expiry_filter_selects_the_bucket(status):
+    thresholds = alert_thresholds(TODAY)
+    constraints, include_missing = alert_expiry_filter(status, thresholds)
+    assert not include_missing
+    for days in range(-3, 100):
+        iso = (TODAY + timedelta(days=days)).isoformat()
+        selected = all(iso > bound if op == ">" else iso <= bound for op, bound in constraints)
+        assert selected == (alert_status_from_iso(iso, thresholds) == status)
+
+def test_unknown_status():
+    with pytest.raises(ValueError):
+        alert_expiry_filter("soon", alert_thresholds(TODAY))
+    with pytest.raises(ValueError):
+        ExpiryIndex([]).bucket("soon", TODAY)
@@ -0,0 +1,244 @@
+import io
+import os
+import zipfile
+from datetime import date, timedelta
+
+import pytest
+
+from tenants import TenantIndex
+
+def store_agreement(app_module, agreement_id, **fields):
+    agreement = {"id": agreement_id, "tenant_name": f"Tenant {agreement_id}", **fields}
+    app_module.normalize_agreement(agreement)
+    app_module.agreement_store.insert(agreement)
+    return agreement
+
+def test_archive_and_restore(app_module, client):
+    store_agreement(app_module, "move")
+    client.post("/delete_agreement/move")
+    assert app_module.agreement_store.get("move") is None
+    assert "archived_timestamp" in app_module.archive_store.get("move")
+    client.post("/restore_agreement/move")
+    assert app_module.archive_store.get("move") is None
+    assert "restored_timestamp" in app_module.agreement_store.get("move")
+
+def test_failed_archive_keeps_the_agreement(app_module, client, monkeypatch):
+    store_agreement(app_module, "keep")
+
+    def disk_full(agreement):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app_module.archive_store, "insert", disk_full)
+    client.post("/delete_agreement/keep")
+    agreement = app_module.agreement_store.get("keep")
+    assert agreement is not None and "archived_timestamp" not in agreement
+    assert "disk full" in client.get("/").get_data(as_text=True)
+
+def test_failed_restore_keeps_the_archived_agreement(app_module, client, monkeypatch):
+    store_agreement(app_module, "stay")
+    client.post("/delete_agreement/stay")
+
+    def duplicate(agreement):
+        raise ValueError("UNIQUE constraint failed")
+
+    monkeypatch.setattr(app_module.agreement_store, "insert", duplicate)
+    client.post("/restore_agreement/stay")
+    archived = app_module.archive_store.get("stay")
+    assert archived is not None and "archived_timestamp" in archived
+    assert app_module.agreement_store.get("stay") is None
+
+def test_archive_rejects_malformed_cursor(client):
+    response = client.get("/archive?cursor=WzFd")  # [1]
+    assert response.status_code == 302
+
+@pytest.fixture
+def pipeline(app_module, monkeypatch):
+    """Stub OCR and extraction; counts the PDFs run through the pipeline."""
+    calls = []
+
+    def extract_pages(filepath):
+        calls.append(filepath)
+        return [{"page": 1, "source": "ocr", "text": f"lease {filepath}", "words": [], "confidence": None}]
+
+    def extract_information(text):
+        return {"tenant_name": f"Tenant of {text}"}
+
+    async def pipeline_bulk_upload(filepaths, *args, **kwargs):
+        results = []
+        for filepath in filepaths:
+            pages = extract_pages(filepath)
+            results.append((pages, extract_information(pages[0]["text"])))
+        return results
+
+    monkeypatch.setattr(app_module, "extract_pages_from_pdf", extract_pages)
+    monkeypatch.setattr(app_module, "extract_information_with_gpt4o", extract_information)
+    monkeypatch.setattr(app_module, "pipeline_bulk_upload", pipeline_bulk_upload)
+    return calls
+
+def test_retried_upload_job_stores_one_agreement(app_module, pipeline, monkeypatch):
+    payload = {"filepath": "uploads/job1_lease.pdf", "filename": "lease.pdf"}
+    count = app_module.agreement_store.count()
+
+    def fail_after_insert(*args):
+        raise OSError("artifact write failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(app_module.ocr_artifacts, "put", fail_after_insert)
+        with pytest.raises(OSError):
+            app_module.process_upload_job(payload)
+    first = app_module.process_upload_job(payload)
+    second = app_module.process_upload_job(payload)
+    assert first["agreement_id"] == second["agreement_id"]
+    assert app_module.agreement_store.count() == count + 1
+    assert len(pipeline) == 1
+
+def test_retried_bulk_upload_job_stores_each_file_once(app_module, pipeline):
+    files = [{"filepath": f"uploads/bulk1_{n:03d}_lease.pdf", "filename": "lease.pdf"} for n in range(3)]
+    count = app_module.agreement_store.count()
+    first = app_module.process_bulk_upload_job({"files": files})
+    second = app_module.process_bulk_upload_job({"files": files})
+    assert first["stored"] == second["stored"] == 3
+    assert [f["agreement_id"] for f in first["files"]] == [f["agreement_id"] for f in second["files"]]
+    assert app_module.agreement_store.count() == count + 3
+    assert len(pipeline) == 3
+
+def make_zip(path, sizes):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for number, size in enumerate(sizes):
+            archive.writestr(f"lease{number}.pdf", b"%PDF" + b"0" * size)
+        archive.writestr("notes.txt", b"not a pdf")
+    return str(path)
+
+def test_save_zip_pdfs(app_module, tmp_path):
+    saved, skipped = app_module.save_zip_pdfs(make_zip(tmp_path / "ok.zip", [100, 100]), "zip1", 10)
+    assert [entry["filename"] for entry in saved] == ["lease0.pdf", "lease1.pdf"]
+    assert skipped == ["notes.txt"]
+
+@pytest.mark.parametrize("setting, sizes", [
+    ("BULK_MAX_PDF_MB", [100, 2 * 1024 * 1024]),
+    ("BULK_MAX_UNZIPPED_MB", [600 * 1024, 600 * 1024]),
+])
+def test_save_zip_pdfs_rejects_oversized_archives(app_module, tmp_path, monkeypatch, setting, sizes):
+    monkeypatch.setattr(app_module, setting, 1)
+    with pytest.raises(ValueError):
+        app_module.save_zip_pdfs(make_zip(tmp_path / "big.zip", sizes), "zip2", 10)
+    # Nothing extracted before the limit was hit is left behind
+    assert not any(name.startswith("zip2_") for name in os.listdir("uploads"))
+
+def test_bulk_upload_rejects_oversized_zip(app_module, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "BULK_MAX_PDF_MB", 1)
+    path = make_zip(tmp_path / "big.zip", [2 * 1024 * 1024])
+    with open(path, "rb") as upload:
+        response = client.post(
+            "/bulk_upload",
+            data={"files": [(upload, "big.zip")]},
+            headers={"Accept": "application/json"},
+            content_type="multipart/form-data",
+        )
+    assert response.status_code == 413
+    assert "larger than 1 MB" in response.get_json()["error"]
+
+def test_find_tenant_gmail_needs_an_exact_name(app_module):
+    index = TenantIndex([("ABC Technologies", "abc@gmail.com"), ("Infosys", "infosys@gmail.com")])
+    assert app_module.find_tenant_gmail("M/s. ABC Technologies Pvt. Ltd.", index) == "abc@gmail.com"
+    assert app_module.find_tenant_gmail("ABD Technologies", index) is None
+    assert app_module.find_tenant_gmail("Infosys BPM", index) is None
+    assert app_module.suggest_tenant_gmail("ABD Technologies", index) == ("abc technologies", 0.7)
+
+def test_email_alerts_skip_similar_names(app_module, client, monkeypatch):
+    app_module.save_settings({"tenant_gmail_pairs": [
+        {"tenant_name": "ABC Technologies", "gmail_address": "abc@gmail.com"},
+        {"tenant_name": "Zeta Corp", "gmail_address": "zeta@gmail.com"},
+    ]})
+    expiry = (date.today() + timedelta(days=20)).isoformat()
+    store_agreement(app_module, "abd", tenant_name="ABD Technologies", agreement_expiry_date=expiry)
+    store_agreement(app_module, "zeta", tenant_name="M/s Zeta Corp Pvt Ltd", agreement_expiry_date=expiry)
+    sent = []
+    monkeypatch.setattr(app_module, "send_email_notification", lambda to, subject, html: (sent.append(to), (True, None))[1])
+    page = client.post("/send_email_alerts", follow_redirects=True).get_data(as_text=True)
+    assert sent == ["zeta@gmail.com"]
+    assert "ABD Technologies (similar to abc technologies)" in page
+
+@pytest.mark.parametrize("setting, value", [("LOCAL_CONFIDENCE_THRESHOLD", 0.9), ("PROMPT_TOKEN_BUDGET", 99)])
+def test_fields_cache_key_changes_with_extraction_settings(app_module, monkeypatch, setting, value):
+    key = app_module.fields_cache_key("lease text")
+    monkeypatch.setattr(app_module, setting, value)
+    assert app_module.fields_cache_key("lease text") != key
+
+@pytest.mark.parametrize("path, field, limit_mb", [("/", "file", 16), ("/bulk_upload", "files", 1)])
+def test_too_large_reports_the_limit_that_applied(app_module, client, monkeypatch, path, field, limit_mb):
+    monkeypatch.setattr(app_module, "BULK_MAX_CONTENT_MB", 1)
+    response = client.post(
+        path,
+        data={field: [(io.BytesIO(b"%PDF" + b"0" * (17 * 1024 * 1024)), "lease.pdf")]},
+        headers={"Accept": "application/json"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 413
+    assert f"Maximum upload size is {limit_mb}MB" in response.get_json()["error"]
+
+@pytest.fixture
+def reextract(app_module, monkeypatch, tmp_path):
+    """Run `flask reextract` over uploads whose fields (or exceptions) are given by file name."""
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(app_module, "UPLOAD_FOLDER", str(uploads))
+    runs = []
+
+    def run(outcomes, *args):
+        for filename in outcomes:
+            (uploads / filename).write_bytes(b"%PDF")
+
+        async def pipeline_bulk_upload(filepaths, *args, **kwargs):
+            runs.append([os.path.basename(path) for path in filepaths])
+            results = []
+            for path in filepaths:
+                outcome = outcomes[os.path.basename(path)]
+                pages = [{"page": 1, "source": "ocr", "text": f"lease {path}", "words": [], "confidence": None}]
+                results.append(outcome if isinstance(outcome, Exception) else (pages, dict(outcome)))
+            return results
+
+        monkeypatch.setattr(app_module, "pipeline_bulk_upload", pipeline_bulk_upload)
+        result = app_module.app.test_cli_runner().invoke(
+            args=["reextract", "--checkpoint", str(tmp_path / "checkpoint.json"), *args])
+        assert result.exception is None, result.output
+        return result.output
+
+    run.runs = runs
+    return run
+
+def test_reextract_backfills_legacy_agreements_and_stores_no_alert_status(app_module, reextract):
+    store_agreement(app_module, "legacy", tenant_name="Legacy Traders", rent_amount="60")
+    fields = {"tenant_name": "Legacy Traders", "rent_amount": "70", "alert_status": "expired"}
+    output = reextract({"old_lease.pdf": fields}, "--apply")
+    assert "Stored OCR artifacts for 1 agreements" in output
+    assert "(matched by tenant_name)" in output
+    assert app_module.ocr_artifacts.pages("legacy", app_module.ocr_settings_key()) is not None
+    stored = app_module.agreement_store.get("legacy")
+    assert stored["rent_amount"] == "70" and stored["source_file"] == "old_lease.pdf"
+    assert "alert_status" not in stored
+
+def test_reextract_resumes_from_the_checkpoint(app_module, reextract):
+    store_agreement(app_module, "resume_a", source_file="resume_a.pdf")
+    store_agreement(app_module, "resume_b", source_file="resume_b.pdf")
+    fields = {"tenant_name": "Tenant resume", "rent_amount": "80"}
+    output = reextract({"resume_a.pdf": fields, "resume_b.pdf": OSError("tesseract crashed")}, "--batch-size", "1")
+    assert "1 changed, 0 unchanged, 0 unmatched, 1 failed" in output
+    # Only the failed upload runs again; the stored agreements are untouched without --apply
+    output = reextract({"resume_a.pdf": fields, "resume_b.pdf": fields})
+    assert "1 of 2 uploads already re-extracted, 1 to go" in output
+    assert reextract.runs == [["resume_a.pdf"], ["resume_b.pdf"], ["resume_b.pdf"]]
+    assert app_module.agreement_store.get("resume_a")["rent_amount"] != "80"
+
+def test_reextract_checkpoint_is_discarded_when_the_prompt_changes(app_module, reextract, monkeypatch):
+    fields = {"tenant_name": "Tenant prompt"}
+    reextract({"prompt.pdf": fields})
+    monkeypatch.setattr(app_module, "PROMPT_VERSION", app_module.PROMPT_VERSION + 1)
+    assert "0 of 1 uploads already re-extracted, 1 to go" in reextract({"prompt.pdf": fields})
+    assert reextract.runs == [["prompt.pdf"], ["prompt.pdf"]]
+
+def test_apply_removes_the_checkpoint(app_module, reextract, tmp_path):
+    store_agreement(app_module, "applied", source_file="applied.pdf")
+    reextract({"applied.pdf": {"tenant_name": "Tenant applied", "rent_amount": "90"}}, "--apply")
+    assert app_module.agreement_store.get("applied")["rent_amount"] == "90"
+    assert not (tmp_path / "checkpoint.json").exists()
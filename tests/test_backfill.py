@@ -0,0 +1,36 @@
+from backfill import AgreementMatcher, Checkpoint, diff_fields, match_upload
+
+def test_checkpoint_keeps_done_files_and_retries_failed_ones(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    progress = Checkpoint(path, {"prompt_version": 1})
+    progress.record("a.pdf", {"status": "done", "fields": {}})
+    progress.record("b.pdf", {"status": "failed", "error": "timeout"})
+    progress.save()
+    assert Checkpoint(path, {"prompt_version": 1}).pending(["a.pdf", "b.pdf", "c.pdf"]) == ["b.pdf", "c.pdf"]
+    assert Checkpoint(path, {"prompt_version": 2}).pending(["a.pdf", "b.pdf"]) == ["a.pdf", "b.pdf"]
+    assert Checkpoint(path, {"prompt_version": 1}, restart=True).files == {}
+
+def test_legacy_agreements_match_only_an_unambiguous_tenant_name():
+    matcher = AgreementMatcher([
+        {"id": "new", "tenant_name": "Acme", "source_file": "acme.pdf"},
+        {"id": "old", "tenant_name": "Zeta Corp"},
+        {"id": "twin1", "tenant_name": "Twin Ltd"},
+        {"id": "twin2", "tenant_name": "twin ltd "},
+    ])
+    assert matcher.match("acme.pdf", {"tenant_name": "Zeta Corp"})[0]["id"] == "new"
+    assert matcher.match("zeta.pdf", {"tenant_name": " ZETA CORP"}) == ({"id": "old", "tenant_name": "Zeta Corp"}, "tenant_name")
+    assert matcher.match("twin.pdf", {"tenant_name": "Twin Ltd"}) == (None, None)
+
+def test_match_upload_searches_the_collections_in_order():
+    matchers = [
+        ("active", AgreementMatcher([{"id": "a", "source_file": "lease.pdf"}])),
+        ("archived", AgreementMatcher([{"id": "b", "source_file": "lease.pdf"}, {"id": "c", "tenant_name": "Old"}])),
+    ]
+    assert match_upload(matchers, "lease.pdf", {})[:2] == ("active", {"id": "a", "source_file": "lease.pdf"})
+    assert match_upload(matchers, "other.pdf", {"tenant_name": "Old"})[0] == "archived"
+    assert match_upload(matchers, "other.pdf", {"tenant_name": "New"}) == (None, None, None)
+
+def test_diff_fields_treats_missing_and_empty_alike():
+    old = {"rent_amount": "60", "floor": ""}
+    new = {"rent_amount": "70", "maintenance": ""}
+    assert diff_fields(old, new, ["rent_amount", "floor", "maintenance"]) == {"rent_amount": ["60", "70"]}
@@ -0,0 +1,49 @@
+from datetime import date, datetime
+
+import pytest
+
+from dates import DATE_FORMATS, formats_for_shape, parse_agreement_dates, parse_date, to_iso
+
+@pytest.mark.parametrize("value, parsed", [
+    ("2026-03-01", date(2026, 3, 1)),
+    ("01/03/2026", date(2026, 3, 1)),
+    ("13/03/2026", date(2026, 3, 13)),
+    ("03/13/2026", date(2026, 3, 13)),
+    ("1.3.2026", date(2026, 3, 1)),
+    ("March 1, 2026", date(2026, 3, 1)),
+    ("1 Mar 2026", date(2026, 3, 1)),
+    ("  2026/03/01 ", date(2026, 3, 1)),
+    ("", None),
+    (None, None),
+    (20260301, None),
+    ("next year", None),
+    ("31/02/2026", None),
+])
+def test_parse_date(value, parsed):
+    assert parse_date(value) == parsed
+
+def plain_parse(value):
+    """Try every format in order, as parse_date did before shape lookup."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+@pytest.mark.parametrize("value", ["05/06/2026", "05-06-2026", "2026.06.05", "June 5, 2026", "5 June 2026", "Jun 5, 2026"])
+def test_parse_date_matches_trying_every_format(value):
+    assert parse_date(value) == plain_parse(value)
+
+def test_unusual_shapes_try_every_format():
+    assert formats_for_shape("99  aaa 9999") == tuple(DATE_FORMATS)
+
+def test_parse_agreement_dates():
+    parsed = parse_agreement_dates({"agreement_start_date": "01/04/2024", "agreement_expiry_date": "soon"})
+    assert parsed == {
+        "agreement_start_date": "2024-04-01",
+        "agreement_expiry_date": "",
+        "lock_in_period_end_date": "",
+        "next_rent_escalation": "",
+    }
+    assert to_iso("April 1, 2024") == "2024-04-01"
@@ -0,0 +1,124 @@
+import time
+import threading
+
+import pytest
+
+import jobs
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, run_worker
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+def test_claim_runs_jobs_oldest_first(queue):
+    first = queue.enqueue("upload", {"n": 1})
+    second = queue.enqueue("upload", {"n": 2})
+    job = queue.claim("w1")
+    assert job["id"] == first and job["status"] == RUNNING and job["attempts"] == 1
+    assert queue.claim("w2")["id"] == second
+    assert queue.claim("w3") is None
+
+def test_complete_stores_the_result(queue):
+    job_id = queue.enqueue("upload", {})
+    queue.claim("w1")
+    queue.complete(job_id, "w1", {"agreement_id": "a"})
+    job = queue.get(job_id)
+    assert job["status"] == DONE and job["result"] == {"agreement_id": "a"}
+    assert job["lease_expires_at"] is None
+
+def test_failed_job_is_retried_after_a_delay(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "boom")
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["error"] == "boom"
+    assert queue.claim("w1") is None
+    monkeypatch.setattr(jobs.time, "time", lambda: job["available_at"] + 1)
+    assert queue.claim("w1")["attempts"] == 2
+
+def test_job_fails_for_good_after_max_attempts(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    now = queue.get(job_id)["created_at"]
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        # Each retry is claimed once its delay has passed
+        monkeypatch.setattr(jobs.time, "time", lambda: now + 3600 * attempt)
+        assert queue.claim("w1")["attempts"] == attempt
+        queue.fail(job_id, "w1", "boom")
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and job["attempts"] == jobs.MAX_ATTEMPTS
+    assert queue.claim("w1") is None
+
+def test_expired_lease_is_reclaimed(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    job = queue.claim("w1", lease_seconds=60)
+    assert queue.claim("w2") is None
+    monkeypatch.setattr(jobs.time, "time", lambda: job["started_at"] + 61)
+    reclaimed = queue.claim("w2")
+    assert reclaimed["id"] == job_id and reclaimed["worker"] == "w2" and reclaimed["attempts"] == 2
+
+def test_expired_lease_fails_after_max_attempts(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    now = queue.get(job_id)["created_at"]
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        # The worker dies every time, so the lease always runs out
+        monkeypatch.setattr(jobs.time, "time", lambda: now + (jobs.LEASE_SECONDS + 1) * attempt)
+        assert queue.claim(f"w{attempt}")["attempts"] == attempt
+    monkeypatch.setattr(jobs.time, "time", lambda: now + (jobs.LEASE_SECONDS + 1) * (jobs.MAX_ATTEMPTS + 1))
+    assert queue.claim("w9") is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and "lease expired" in job["error"]
+
+def test_renew_extends_the_lease(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    job = queue.claim("w1", lease_seconds=60)
+    monkeypatch.setattr(jobs.time, "time", lambda: job["started_at"] + 50)
+    assert queue.renew(job_id, "w1", lease_seconds=60)
+    monkeypatch.setattr(jobs.time, "time", lambda: job["started_at"] + 100)
+    assert queue.claim("w2") is None
+    assert not queue.renew(job_id, "w2")
+
+def test_stale_worker_cannot_record_the_outcome(queue, monkeypatch):
+    job_id = queue.enqueue("upload", {})
+    job = queue.claim("w1", lease_seconds=60)
+    monkeypatch.setattr(jobs.time, "time", lambda: job["started_at"] + 61)
+    queue.claim("w2")
+    assert not queue.complete(job_id, "w1", {"agreement_id": "stale"})
+    assert not queue.fail(job_id, "w1", "boom")
+    job = queue.get(job_id)
+    assert job["status"] == RUNNING and job["worker"] == "w2" and job["error"] is None
+    assert queue.complete(job_id, "w2", {"agreement_id": "a"})
+    assert queue.get(job_id)["result"] == {"agreement_id": "a"}
+
+def test_run_worker_renews_the_lease_of_a_long_job(queue):
+    stop = threading.Event()
+    job_id = queue.enqueue("slow", {})
+    leases = []
+
+    def slow(payload):
+        for _ in range(3):
+            leases.append(queue.get(job_id)["lease_expires_at"])
+            time.sleep(0.05)
+        stop.set()
+        return {}
+
+    run_worker(queue, {"slow": slow}, "w1", poll_interval=0, stop=stop, lease_seconds=60, heartbeat_seconds=0.02)
+    assert leases == sorted(leases) and leases[-1] > leases[0]
+    assert queue.get(job_id)["status"] == DONE
+
+def test_run_worker_completes_and_fails_jobs(queue):
+    stop = threading.Event()
+    ok = queue.enqueue("ok", {"value": 1})
+    bad = queue.enqueue("bad", {})
+
+    def succeed(payload):
+        return {"value": payload["value"]}
+
+    def fail(payload):
+        # Both jobs have run once this one is claimed
+        stop.set()
+        raise RuntimeError("broken PDF")
+
+    run_worker(queue, {"ok": succeed, "bad": fail}, "w1", poll_interval=0, stop=stop)
+    assert queue.get(ok)["result"] == {"value": 1}
+    failed = queue.get(bad)
+    assert failed["status"] == QUEUED and failed["error"] == "RuntimeError: broken PDF"
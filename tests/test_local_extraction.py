@@ -0,0 +1,87 @@
+import pytest
+
+from local_extraction import LABELED, PHRASE, UNVALIDATED, extract_fields_locally
+
+THRESHOLD = 0.6
+
+LABELED_LEASE = """
+Tenant Name: Acme Software Pvt Ltd
+Carpet Area: 2,400 sq ft
+Floor: 3rd floor
+Building: JP Classic
+Rent Amount: Rs. 55 per sq ft per month
+Rent Escalation: 5% every year
+Agreement Start Date: 1st April 2024
+Agreement Expiry Date: 31/03/2029
+Lock-in Period: 3 years
+Lock-in Period End Date: 31.03.2027
+Period of Rent: 5 years
+"""
+
+def test_labeled_fields():
+    fields = extract_fields_locally(LABELED_LEASE)
+    assert fields["tenant_name"] == ("Acme Software Pvt Ltd", LABELED)
+    assert fields["floor"] == ("3rd floor", LABELED)
+    assert fields["agreement_start_date"] == ("2024-04-01", LABELED)
+    assert fields["agreement_expiry_date"] == ("2029-03-31", LABELED)
+    assert fields["lock_in_period_end_date"] == ("2027-03-31", LABELED)
+    assert fields["rental_period_greater_than_lock_in_period"] == ("True", PHRASE)
+
+def test_labeled_value_that_does_not_validate():
+    fields = extract_fields_locally("Agreement Expiry Date: as per schedule\n")
+    assert fields["agreement_expiry_date"] == ("as per schedule", UNVALIDATED)
+
+def test_stock_phrases():
+    fields = extract_fields_locally(
+        "The premises admeasuring about 1,850 sq. ft. is let at a monthly rent of Rs. 62 per sq. ft. per month, "
+        "with maintenance of Rs. 8/- per sqft per month. The rent shall be subject to escalation of 4.5% annually."
+    )
+    assert fields["area_sqft"] == ("1850", PHRASE)
+    assert fields["rent_amount"] == ("62", PHRASE)
+    assert fields["maintenance"] == ("8", PHRASE)
+    assert fields["rent_escalation"] == ("4.5%", PHRASE)
+
+PARTIES = (
+    "THIS DEED OF LEASE is made between M/s. Sunrise Estates Private Limited, having its registered office at "
+    "2nd floor, JP Classic, Bangalore (hereinafter called the LESSOR) of the one part AND "
+    "M/s. Mana and Kias Infrastructures Limited, a company incorporated under the Companies Act "
+    "(hereinafter called the LESSEE) of the other part.\n"
+)
+
+def test_tenant_is_the_lessee_not_the_lessor():
+    assert extract_fields_locally(PARTIES)["tenant_name"] == ("Mana and Kias Infrastructures Limited", PHRASE)
+
+def test_undesignated_party_is_left_to_the_model():
+    value, confidence = extract_fields_locally("Agreement with M/s. Sunrise Estates, Bangalore.")["tenant_name"]
+    assert value == "Sunrise Estates" and confidence < THRESHOLD
+
+def test_lessor_only_gives_no_tenant():
+    text = "M/s. Sunrise Estates Private Limited (hereinafter called the LESSOR) shall maintain the building."
+    assert extract_fields_locally(text)["tenant_name"] == ("", 0.0)
+
+@pytest.mark.parametrize("lock_in", [
+    "The lessee shall not vacate during the lock-in period of 12 months.",
+    "Lock-in: no termination for a period of 12 months.",
+])
+def test_rent_period_skips_the_lock_in_clause(lock_in):
+    fields = extract_fields_locally(f"{lock_in}\nThe lease is granted for a period of 36 (thirty six) months.")
+    assert fields["period_of_rent"] == ("36 months", PHRASE)
+    assert fields["lock_in_period"] == ("12 months", PHRASE)
+    assert fields["rental_period_greater_than_lock_in_period"] == ("True", PHRASE)
+
+def test_lock_in_alone_is_not_a_rent_period():
+    fields = extract_fields_locally("The lock-in period of 12 months starts on the commencement date.")
+    assert fields["period_of_rent"] == ("", 0.0)
+    assert fields["rental_period_greater_than_lock_in_period"] == ("", 0.0)
+
+def test_floor_and_building_come_from_the_demised_premises():
+    fields = extract_fields_locally(
+        PARTIES + "The demised premises situated on the ground floor of Silver Software Park, Whitefield."
+    )
+    assert fields["floor"] == ("ground floor", PHRASE)
+    assert fields["building"] == ("Silver Software", PHRASE)
+
+def test_floor_and_building_outside_the_premises_clause_are_left_to_the_model():
+    fields = extract_fields_locally(PARTIES)
+    assert fields["floor"][0] == "2nd floor" and fields["floor"][1] < THRESHOLD
+    assert fields["building"][0] == "JP Classic" and fields["building"][1] < THRESHOLD
@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+import model_client
+from model_client import AsyncModelClient, TokenBucket, is_retryable, retry_after
+
+def status_error(status, retry_after=None):
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = SimpleNamespace(status_code=status, headers=headers, request=None)
+    return openai.APIStatusError(f"HTTP {status}", response=response, body=None)
+
+class FakeCompletions:
+    """chat.completions of an SDK client; replies with `outcomes` in order."""
+
+    def __init__(self, outcomes=(), delay=0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, messages, max_tokens):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+            if isinstance(outcome, Exception):
+                raise outcome
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=outcome))])
+        finally:
+            self.in_flight -= 1
+
+def make_client(completions, **settings):
+    settings = {"rate": 0, "max_retries": 3, "timeout": 5, **settings}
+    return AsyncModelClient(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)), **settings)
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Record backoff delays instead of sleeping through them."""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def fast_sleep(seconds):
+        if seconds:
+            delays.append(seconds)
+        await sleep(0)
+
+    monkeypatch.setattr(model_client.asyncio, "sleep", fast_sleep)
+    return delays
+
+def chat(client, count=1):
+    async def run():
+        return await asyncio.gather(*(client.chat([{"role": "user", "content": "hi"}]) for _ in range(count)))
+    return asyncio.run(run())
+
+def test_is_retryable():
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(503))
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(openai.APIConnectionError(request=None))
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(ValueError("bad"))
+
+def test_retry_after():
+    assert retry_after(status_error(429, "2.5")) == 2.5
+    assert retry_after(status_error(429, "soon")) is None
+    assert retry_after(ValueError("no response")) is None
+
+def test_rate_limit_and_server_errors_are_retried(no_backoff):
+    completions = FakeCompletions([status_error(429, "7"), status_error(502), "fields"])
+    client = make_client(completions)
+    assert chat(client) == ["fields"]
+    assert completions.calls == 3
+    assert client.stats == {"requests": 1, "retries": 2, "failures": 0}
+    # Retry-After is honoured; otherwise the backoff is jittered within [base/2, base] * 2 ** attempt
+    assert len(no_backoff) == 2 and no_backoff[0] == 7
+    assert model_client.BACKOFF_BASE_SECONDS <= no_backoff[1] <= 2 * model_client.BACKOFF_BASE_SECONDS
+
+def test_client_errors_are_not_retried():
+    completions = FakeCompletions([status_error(400)])
+    client = make_client(completions)
+    with pytest.raises(openai.APIStatusError):
+        chat(client)
+    assert completions.calls == 1
+    assert client.stats["failures"] == 1
+
+def test_gives_up_after_max_retries():
+    completions = FakeCompletions([status_error(500)] * 5)
+    client = make_client(completions, max_retries=2)
+    with pytest.raises(openai.APIStatusError):
+        chat(client)
+    assert completions.calls == 3
+    assert client.stats == {"requests": 0, "retries": 2, "failures": 1}
+
+def test_concurrency_is_capped():
+    completions = FakeCompletions(delay=0.01)
+    client = make_client(completions, concurrency=3)
+    assert chat(client, count=10) == ["ok"] * 10
+    assert completions.max_in_flight == 3
+
+def test_token_bucket_spaces_requests_after_a_burst(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(model_client.time, "monotonic", lambda: clock[0])
+
+    async def advance(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(model_client.asyncio, "sleep", advance)
+
+    async def run():
+        bucket = TokenBucket(rate=2, capacity=3)
+        started = []
+        for _ in range(7):
+            await bucket.acquire()
+            started.append(clock[0] - 100.0)
+        return started
+
+    assert asyncio.run(run()) == [0, 0, 0, 0.5, 1.0, 1.5, 2.0]
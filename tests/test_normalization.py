@@ -0,0 +1,71 @@
+import pytest
+
+from normalization import (
+    SCHEMA_VERSION, is_current_schema, normalize_agreement, normalize_agreements, normalize_building,
+    normalize_floor, normalize_maintenance_amount, normalize_period_of_rent, normalize_rent_escalation,
+    normalize_rental_period_flag,
+)
+
+@pytest.mark.parametrize("value, months", [
+    ("5 years", "60"),
+    ("36 Months", "36"),
+    ("2 quarters", "6"),
+    ("11", "11"),
+    ("", ""),
+    (None, ""),
+    ("as agreed", ""),
+])
+def test_normalize_period_of_rent(value, months):
+    assert normalize_period_of_rent(value) == months
+
+@pytest.mark.parametrize("value, total", [
+    ("Rs.11 + Rs. 2", "13"),
+    ("4.5 per sqft", "4.5"),
+    ("", ""),
+])
+def test_normalize_maintenance_amount(value, total):
+    assert normalize_maintenance_amount(value) == total
+
+def test_normalize_rent_escalation():
+    assert normalize_rent_escalation("5 percent every year") == "5%"
+    assert normalize_rent_escalation("4.5%") == "4.5%"
+    assert normalize_rent_escalation("none") == ""
+
+@pytest.mark.parametrize("value, floor", [
+    ("Ground floor", "Ground Floor"),
+    ("G.F.", "Ground Floor"),
+    ("0", "Ground Floor"),
+    ("2nd floor, east wing", "2nd Floor"),
+    ("f3", "3rd Floor"),
+    ("Mezzanine", "Mezzanine"),
+])
+def test_normalize_floor(value, floor):
+    assert normalize_floor(value) == floor
+
+def test_normalize_building():
+    assert normalize_building("Unit 4, JP-Classic Towers") == "JP Classic"
+    assert normalize_building("Silver Software Park") == "Silver Software"
+    assert normalize_building(" Orbit Plaza ") == "Orbit Plaza"
+
+@pytest.mark.parametrize("value, flag", [(True, "True"), ("yes", "True"), ("1", "True"), (False, "False"), ("", "False")])
+def test_normalize_rental_period_flag(value, flag):
+    assert normalize_rental_period_flag(value) == flag
+
+def test_normalize_agreement_stamps_schema_and_dates():
+    agreement = normalize_agreement({
+        "id": "a",
+        "place_occupied": "1200 sqft, 1st floor, JP Classic",
+        "period_of_rent": "3 years",
+        "agreement_expiry_date": "31/12/2026",
+    })
+    assert agreement["area_sqft"] == "1200"
+    assert agreement["floor"] == "1st Floor"
+    assert agreement["building"] == "JP Classic"
+    assert agreement["period_of_rent"] == "36"
+    assert agreement["parsed_dates"]["agreement_expiry_date"] == "2026-12-31"
+    assert agreement["schema_version"] == SCHEMA_VERSION
+    assert is_current_schema(agreement)
+
+def test_normalize_agreement_is_idempotent():
+    agreement = normalize_agreement({"id": "a", "rent_amount": "Rs. 55/sqft", "lock_in_period": "1 year"})
+    assert normalize_agreements([dict(agreement)]) == [agreement]
@@ -0,0 +1,54 @@
+import sqlite3
+
+from ocr_artifacts import OCRArtifactStore
+
+WORDS = [["Rent", 10, 20, 40, 12, 91.0], ["Rs.", 55, 20, 20, 12, 85.0]]
+
+def scanned_lease():
+    return [
+        {"page": 1, "source": "text", "text": "Lease deed", "words": [], "confidence": None},
+        {"page": 2, "source": "ocr", "text": "Rent Rs.", "words": WORDS, "confidence": 88.0},
+    ]
+
+def test_pages_round_trip(tmp_path):
+    store = OCRArtifactStore(str(tmp_path / "ocr.db"))
+    store.put("a1", scanned_lease(), "psm6")
+    artifact = store.get("a1")
+    assert artifact["pages"] == scanned_lease()
+    assert artifact["ocr_settings"] == "psm6" and artifact["confidence"] == 88.0
+    assert [page["words"] for page in store.get("a1", words=False)["pages"]] == [[], []]
+    assert store.get("missing") is None
+
+def test_pages_from_other_ocr_settings_are_stale(tmp_path):
+    store = OCRArtifactStore(str(tmp_path / "ocr.db"))
+    store.put("a1", scanned_lease(), "psm6")
+    assert store.pages("a1", "psm6") == scanned_lease()
+    assert store.pages("a1", "psm4") is None
+    assert store.pages("a1") == scanned_lease()
+
+def test_put_replaces_every_page(tmp_path):
+    store = OCRArtifactStore(str(tmp_path / "ocr.db"))
+    store.put_many({"a1": scanned_lease(), "a2": scanned_lease()}, "psm6")
+    store.put("a1", scanned_lease()[:1], "psm4")
+    assert store.pages("a1", "psm4") == scanned_lease()[:1]
+    stats = store.stats()
+    assert stats["documents"] == 2 and stats["pages"] == 3
+    assert stats["text_bytes"] == len("Lease deed") * 2 + len("Rent Rs.")
+    assert stats["word_bytes"] > 0
+
+def test_pages_table_without_id_is_migrated(tmp_path):
+    path = str(tmp_path / "ocr.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE pages (agreement_id TEXT NOT NULL, page INTEGER NOT NULL, source TEXT NOT NULL, "
+        "text TEXT NOT NULL, confidence REAL, words BLOB, UNIQUE (agreement_id, page));"
+        "INSERT INTO pages VALUES ('old', 1, 'text', 'Legacy lease', NULL, NULL);"
+    )
+    conn.close()
+    store = OCRArtifactStore(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT id, agreement_id, text FROM pages").fetchall() == [(1, "old", "Legacy lease")]
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'pages_without_id'").fetchone() is None
+    conn.close()
+    store.put("new", scanned_lease(), "psm6")
+    assert store.stats()["pages"] == 3
@@ -0,0 +1,44 @@
+from passages import estimate_tokens, score_window, select_passages
+
+BOILERPLATE = "The parties agree that this clause is general boilerplate without any commercial terms."
+
+def lease(*terms, filler=40):
+    """Boilerplate lines with the given term lines spread through them."""
+    lines = [f"{BOILERPLATE} ({n})" for n in range(filler)]
+    step = filler // (len(terms) + 1)
+    for position, term in enumerate(terms, start=1):
+        lines.insert(position * step + position - 1, term)
+    return "\n".join(lines)
+
+RENT = "The monthly rent shall be Rs. 62 per sq. ft. per month."
+EXPIRY = "This lease shall expire on 31/03/2029 unless renewed."
+LOCK_IN = "The lock-in period is 36 months from commencement."
+
+def test_short_text_is_sent_unchanged():
+    text = "Rent: Rs. 50 per sq ft per month\n\nTenant: Acme"
+    assert select_passages(text, ["rent_amount"], token_budget=100) == text
+
+def test_keyword_next_to_a_value_scores_double():
+    assert score_window("rent is Rs. 50", "rent_amount") > score_window("rent is as agreed", "rent_amount")
+    assert score_window(RENT, "unknown_field") == 0
+
+def test_every_requested_field_gets_its_passage():
+    text = lease(RENT, EXPIRY, LOCK_IN)
+    selected = select_passages(text, ["rent_amount", "agreement_expiry_date", "lock_in_period"], token_budget=400)
+    for term in (RENT, EXPIRY, LOCK_IN):
+        assert term in selected
+    assert estimate_tokens(selected) < estimate_tokens(text)
+
+def test_selection_stays_within_budget_and_in_document_order():
+    text = lease(RENT, EXPIRY, LOCK_IN)
+    selected = select_passages(text, ["rent_amount", "agreement_expiry_date", "lock_in_period"], token_budget=400)
+    lines = [line for line in selected.splitlines() if line != "..."]
+    assert sum(estimate_tokens(line) for line in lines) <= 400
+    original = text.splitlines()
+    assert [original.index(line) for line in lines] == sorted(original.index(line) for line in lines)
+    assert "..." in selected.splitlines()
+
+def test_unrequested_fields_are_left_out_when_the_budget_is_tight():
+    selected = select_passages(lease(RENT, EXPIRY), ["agreement_expiry_date"], token_budget=120)
+    assert EXPIRY in selected
+    assert RENT not in selected
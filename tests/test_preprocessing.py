@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from preprocessing import PRESETS, get_preset, preprocess_image, preset_dpi, skew_angle
+
+def test_unknown_preset_names_the_valid_ones():
+    with pytest.raises(ValueError, match="none, gray, fast, scan"):
+        get_preset("Scan")
+    with pytest.raises(ValueError):
+        preset_dpi("Scan", 200)
+
+def test_preset_dpi():
+    assert preset_dpi("none", 250) == 250
+    assert preset_dpi("scan", 250) == PRESETS["scan"]["dpi"]
+
+def test_none_preset_returns_the_page_untouched():
+    image = Image.new("RGB", (50, 40), "white")
+    assert preprocess_image(image, "none") is image
+
+def lines_page(angle=0.0):
+    pixels = np.full((400, 600), 255, dtype=np.uint8)
+    for top in range(60, 340, 40):
+        pixels[top:top + 8, 80:520] = 0
+    return Image.fromarray(pixels).rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+
+def test_skew_angle_recovers_rotation():
+    gray = np.asarray(lines_page(2.5))
+    assert skew_angle(gray) == pytest.approx(2.5, abs=0.3)
+
+def test_scan_preset_deskews_and_crops():
+    result = np.asarray(preprocess_image(lines_page(2.0).convert("RGB"), "scan"))
+    assert result.ndim == 2
+    assert skew_angle(result) == pytest.approx(0.0, abs=0.3)
+    assert result.shape[0] < 400 and result.shape[1] < 600
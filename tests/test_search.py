@@ -0,0 +1,91 @@
+import pytest
+
+from ocr_artifacts import OCRArtifactStore
+from search import SearchIndex, fts_query, highlight
+
+@pytest.mark.parametrize("query, expected", [
+    ("canteen maintenance", '"canteen" "maintenance"'),
+    ('"subject to escalation" rent', '"subject to escalation" "rent"'),
+    ("escalat*", '"escalat"*'),
+    ("lock-in", '"lock in"'),
+    ("NOT OR AND", '"NOT" "OR" "AND"'),
+    ('rent" (', '"rent"'),
+    ("  ", ""),
+    ("*** ---", ""),
+])
+def test_fts_query(query, expected):
+    assert fts_query(query) == expected
+
+def test_highlight_escapes_html():
+    assert highlight("a <b> rent\n  due") == "a &lt;b&gt; <mark>rent</mark> due"
+
+def page(number, text):
+    return {"page": number, "source": "ocr", "text": text}
+
+@pytest.fixture
+def artifacts(tmp_path):
+    return OCRArtifactStore(str(tmp_path / "ocr_artifacts.db"))
+
+@pytest.fixture
+def index(artifacts):
+    index = SearchIndex(artifacts)
+    leases = {
+        "a": ["The lessee shall pay canteen charges.", "Rent is subject to escalation of 5% annually."],
+        "b": ["Maintenance charges of Rs 10 per sqft.", "Escalations are capped."],
+        "c": ["Arbitration and conciliation clause."],
+    }
+    for agreement_id, texts in leases.items():
+        artifacts.put(agreement_id, [page(n + 1, text) for n, text in enumerate(texts)], "settings")
+        index.add({"id": agreement_id, "tenant_name": f"Tenant {agreement_id}"})
+    return index
+
+def ids(results):
+    return [result["agreement_id"] for result in results]
+
+def test_search_finds_the_page_with_the_clause(index):
+    results = index.search("canteen")
+    assert ids(results) == ["a"]
+    assert results[0]["tenant_name"] == "Tenant a" and results[0]["status"] == "active"
+    assert results[0]["snippets"] == [{"page": 1, "snippet": "The lessee shall pay <mark>canteen</mark> charges."}]
+
+def test_search_phrase_and_prefix(index):
+    assert ids(index.search('"subject to escalation"')) == ["a"]
+    assert ids(index.search('"escalation subject"')) == []
+    assert sorted(ids(index.search("escalat*"))) == ["a", "b"]
+    assert ids(index.search("escalat")) == []
+
+def test_search_words_are_anded(index):
+    assert ids(index.search("maintenance charges")) == ["b"]
+    assert ids(index.search("arbitration canteen")) == []
+
+def test_search_limit(index):
+    assert len(index.search("escalat*", limit=1)) == 1
+
+def test_search_status_filter(index):
+    index.set_status("a", "archived")
+    assert ids(index.search("escalat*", status="archived")) == ["a"]
+    assert ids(index.search("escalat*", status="active")) == ["b"]
+    assert sorted(ids(index.search("escalat*"))) == ["a", "b"]
+
+def test_only_added_agreements_are_searchable(index, artifacts):
+    artifacts.put("d", [page(1, "canteen")], "settings")
+    assert ids(index.search("canteen")) == ["a"]
+
+def test_replaced_artifacts_are_reindexed(index, artifacts):
+    artifacts.put("a", [page(1, "Hazardous material is not allowed.")], "settings")
+    assert ids(index.search("canteen")) == []
+    assert ids(index.search("hazardous")) == ["a"]
+
+def test_clear_and_rebuild(index):
+    index.clear()
+    assert index.search("canteen") == []
+    assert index.stats() == {"documents": {}, "pages": 0}
+    index.add({"id": "a"}, status="archived")
+    assert ids(index.search("canteen")) == ["a"]
+    assert index.stats() == {"documents": {"archived": 1}, "pages": 2}
+
+def test_existing_artifacts_are_indexed_when_the_index_is_created(artifacts):
+    artifacts.put("a", [page(1, "canteen")], "settings")
+    index = SearchIndex(artifacts)
+    index.add({"id": "a"})
+    assert ids(index.search("canteen")) == ["a"]
@@ -0,0 +1,107 @@
+import os
+import json
+import sqlite3
+
+import pytest
+
+from storage import SegmentedArchiveStore, SQLiteAgreementStore, encode_cursor
+
+def agreement(agreement_id, **fields):
+    return {"id": agreement_id, "tenant_name": f"Tenant {agreement_id}", **fields}
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteAgreementStore(str(tmp_path / "agreements.db"))
+
+@pytest.fixture
+def archive(tmp_path):
+    return SegmentedArchiveStore(str(tmp_path / "archive"))
+
+def test_insert_many_is_all_or_nothing(store):
+    store.insert(agreement("a"))
+    version = store.version()
+    with pytest.raises(sqlite3.IntegrityError):
+        store.insert_many([agreement("b"), agreement("a")])
+    assert [a["id"] for a in store.all()] == ["a"]
+    assert store.version() == version
+
+def test_pop_returns_the_agreement_once(store):
+    store.insert(agreement("a"))
+    assert store.pop("a")["id"] == "a"
+    assert store.pop("a") is None
+    assert store.count() == 0
+
+def test_writes_bump_the_version_only_on_change(store):
+    version = store.version()
+    store.update(agreement("missing"))
+    assert store.version() == version
+    store.insert(agreement("a"))
+    assert store.version() > version
+
+def test_query_pages_through_every_agreement(store):
+    store.insert_many([agreement(f"a{i}") for i in range(5)])
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.query(limit=2, cursor=cursor)
+        seen.extend(a["id"] for a in page)
+        if cursor is None:
+            break
+    assert seen == [f"a{i}" for i in range(5)]
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 json",
+    encode_cursor(["expiry", False, "x", 1]),
+    encode_cursor(["upload", False, [1], 1]),
+    encode_cursor(["upload", False, "x", None]),
+    encode_cursor(["upload", False, "x", True]),
+])
+def test_query_rejects_malformed_cursors(store, cursor):
+    store.insert(agreement("a"))
+    with pytest.raises(ValueError):
+        store.query(cursor=cursor)
+
+def test_archive_pages_newest_first(archive):
+    archive.insert_many([
+        agreement(f"a{i}", archived_timestamp=f"2025-0{i + 1}-01T00:00:00") for i in range(5)
+    ])
+    first, cursor = archive.page(limit=3)
+    second, end = archive.page(cursor, limit=3)
+    assert [a["id"] for a in first] == ["a4", "a3", "a2"]
+    assert [a["id"] for a in second] == ["a1", "a0"]
+    assert end is None
+
+@pytest.mark.parametrize("key", [[1], [None, None], ["2025-01"], [1, 2], ["2025-01", "a", "b"]])
+def test_archive_page_rejects_malformed_cursors(archive, key):
+    archive.insert(agreement("a", archived_timestamp="2025-01-01T00:00:00"))
+    with pytest.raises(ValueError):
+        archive.page(encode_cursor(key))
+
+def test_archive_pop_removes_from_segment_and_manifest(archive):
+    archive.insert(agreement("a", archived_timestamp="2025-01-01T00:00:00"))
+    assert archive.pop("a")["id"] == "a"
+    assert archive.get("a") is None
+    assert archive.count() == 0
+
+def test_archive_manifest_lists_only_segments(archive):
+    archive.insert_many([agreement(f"a{i}", archived_timestamp=f"2025-0{i % 2 + 1}-01T00:00:00") for i in range(4)])
+    with open(archive.manifest_path) as f:
+        manifest = json.load(f)
+    assert manifest == {"segments": {"2025-01": 2, "2025-02": 2}}
+    assert archive.get("a3")["archived_timestamp"].startswith("2025-02")
+    assert archive.update(dict(archive.get("a3"), tenant_name="Renamed"))
+    assert archive.get("a3")["tenant_name"] == "Renamed"
+
+def test_archive_upgrades_a_manifest_with_an_id_map(tmp_path):
+    directory = tmp_path / "archive"
+    directory.mkdir()
+    (directory / "2025-01.json").write_text(json.dumps([agreement("a", archived_timestamp="2025-01-01T00:00:00")]))
+    (directory / "manifest.json").write_text(json.dumps({"segments": {"2025-01": 1}, "ids": {"a": "2025-01"}}))
+    archive = SegmentedArchiveStore(str(directory))
+    assert archive.get("a")["id"] == "a"
+    assert "ids" not in json.loads((directory / "manifest.json").read_text())
+
+def test_archive_rebuilds_a_stale_id_index(tmp_path):
+    directory = str(tmp_path / "archive")
+    SegmentedArchiveStore(directory).insert(agreement("a", archived_timestamp="2025-01-01T00:00:00"))
+    os.remove(os.path.join(directory, SegmentedArchiveStore.ID_INDEX))
+    assert SegmentedArchiveStore(directory).get("a")["id"] == "a"
@@ -0,0 +1,52 @@
+import pytest
+
+from tenants import TenantIndex, duplicate_summary, likely_duplicates, normalize_tenant_name
+
+@pytest.mark.parametrize("name, key", [
+    ("M/S. MANA AND KIAS INFRASTRUCTURES LIMITED", "mana and kias infrastructures"),
+    ("Mana & Kias Infrastructures Pvt. Ltd.", "mana and kias infrastructures"),
+    ("Messrs. The Acme Software Private Limited", "acme software"),
+    ("m / s acme, software llp", "acme software"),
+    ("Private Ltd", "private"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_tenant_name(name, key):
+    assert normalize_tenant_name(name) == key
+
+@pytest.fixture
+def index():
+    return TenantIndex([
+        ("Mana and Kias Infrastructures", "mana@example.com"),
+        ("ABC Technologies", "abc@example.com"),
+        ("Infosys", "infosys@example.com"),
+        ("Silver Orbit Software", "silver@example.com"),
+    ])
+
+def test_exact_match_after_normalizing(index):
+    assert index.get("M/S. MANA AND KIAS INFRASTRUCTURES LIMITED") == ["mana@example.com"]
+    assert index.match("Silver Orbit Software Pvt Ltd") == ("silver@example.com", 1.0)
+
+def test_similar_names_are_fuzzy_matches_only(index):
+    assert index.get("ABD Technologies") == []
+    assert index.match("ABD Technologies") == ("abc@example.com", 0.7)
+    assert index.get("Infosys BPM") == []
+
+def test_fuzzy_match_below_threshold(index):
+    assert index.match("Zenith Pharma") == (None, 0.0)
+    assert index.match("ABD Technologies", threshold=0.9) == (None, 0.0)
+
+def test_tied_fuzzy_match_is_no_match():
+    index = TenantIndex([("Acme Ltd One", "one@example.com"), ("Acme Ltd Two", "two@example.com")])
+    assert index.match("Acme Ltd") == (None, 0.0)
+
+def test_search_ranks_exact_first(index):
+    results = index.search("ABC Technologies")
+    assert results[0][:2] == (1.0, "abc technologies")
+
+def test_likely_duplicates():
+    stored = {"id": "a", "tenant_name": "Acme Software", "building": "JP Classic", "floor": "1st Floor"}
+    index = TenantIndex([(stored["tenant_name"], duplicate_summary(stored))])
+    assert likely_duplicates({"id": "b", "tenant_name": "M/s Acme Software Pvt Ltd", "floor": "1st Floor"}, [index]) == ["a"]
+    assert likely_duplicates({"id": "b", "tenant_name": "Acme Software", "floor": "2nd Floor"}, [index]) == []
+    assert likely_duplicates({"id": "a", "tenant_name": "Acme Software"}, [index]) == []
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Background job worker for Tenant Dashboard.
+
+Runs the upload pipeline (OCR, then GPT-4o extraction, then store insert)
+for jobs queued by the web application. gunicorn already runs job
+threads in every web worker (gunicorn.conf.py); on a server where this
+script shares gunicorn's disk it adds separate worker processes:
+
+    python worker.py [--workers 2] [--poll-interval 1.0]
+
+Each worker is a separate process, so a slow lease never blocks a web
+request. Stop with Ctrl+C or SIGTERM; a job interrupted mid-run is retried
+once its lease expires.
+"""
+
+import os
+import sys
+import signal
+import logging
+import argparse
+import multiprocessing
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from jobs import run_worker
+
+def work(index, poll_interval, stop):
+    """Entry point of one worker process."""
+    # Keep the parent in charge of shutdown; children stop via the event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    import app
+    run_worker(app.job_queue, app.JOB_HANDLERS, f"worker-{os.getpid()}-{index}", poll_interval, stop)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKERS", "2")))
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=work, args=(i, args.poll_interval, stop), name=f"worker-{i}")
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Started {len(processes)} job workers")
+
+    def shutdown(signum, frame):
+        logging.info("Stopping job workers after their current job")
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()